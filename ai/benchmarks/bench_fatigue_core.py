@@ -0,0 +1,105 @@
+"""
+카메라/MediaPipe 없이 깜빡임·시선 상태 머신의 프레임당 처리 비용과 검출 정확도를 측정합니다.
+헤드리스 CI에서 hot loop를 최적화할 때 회귀 검사용으로 사용합니다.
+
+    cd ai
+    python benchmarks/bench_fatigue_core.py --frames 3600000
+    python benchmarks/bench_fatigue_core.py --frames 1800000 --max-ns-per-frame 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fatigue_core import FatigueStateMachine  # noqa: E402
+from synthetic_stream import FRAME_SIZE, generate_stream, load_stream  # noqa: E402
+
+CYCLE_SECONDS = 60.0
+# 1분 주기 패턴: 깜빡임 15회, 시선 변화 4회 (CENTER -> LEFT -> CENTER -> RIGHT -> CENTER)
+BLINK_TIMES = [i * 4.0 + 1.0 for i in range(15)]
+GAZE_SEGMENTS = [("CENTER", 0.0), ("LEFT", 12.0), ("CENTER", 20.0), ("RIGHT", 33.0), ("CENTER", 47.0)]
+
+
+def run(frames_per_cycle, cycle_seconds, total_frames, expected_blinks, expected_changes):
+    tracker = FatigueStateMachine(start_time=0.0)
+    update = tracker.update
+    w = h = FRAME_SIZE
+    blinks = changes = 0
+    last_direction = tracker.last_gaze_direction
+    processed = 0
+    offset = 0.0
+
+    start = time.perf_counter_ns()
+    while processed < total_frames:
+        for t, landmarks in frames_per_cycle:
+            metrics = update(landmarks, w, h, offset + t)
+            blinks += metrics.blinked
+            if metrics.gaze_direction != last_direction:
+                changes += 1
+                last_direction = metrics.gaze_direction
+            processed += 1
+            if processed == total_frames:
+                break
+        offset += cycle_seconds
+    elapsed_ns = time.perf_counter_ns() - start
+
+    cycles = processed // len(frames_per_cycle)
+    return {
+        "frames": processed,
+        "ns_per_frame": elapsed_ns / processed,
+        "fps": processed / (elapsed_ns / 1e9),
+        "blinks": (blinks, expected_blinks * cycles),
+        "gaze_changes": (changes, expected_changes * cycles),
+        "complete_cycles": cycles,
+        "remainder": processed % len(frames_per_cycle),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=1_800_000)  # 1분(1800프레임) 주기의 배수
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--noise", type=float, default=0.02)
+    parser.add_argument("--recording", help="녹화한 랜드마크(JSON Lines)로 처리 비용만 측정")
+    parser.add_argument("--max-ns-per-frame", type=float, help="이 값을 넘으면 실패 (CI 회귀 검사)")
+    args = parser.parse_args()
+
+    if args.recording:
+        frames = load_stream(args.recording)
+        cycle_seconds = frames[-1][0] - frames[0][0] + 1.0 / args.fps
+        expected_blinks = expected_changes = None
+    else:
+        frames, truth = generate_stream(CYCLE_SECONDS, fps=args.fps, blink_times=BLINK_TIMES,
+                                        gaze_segments=GAZE_SEGMENTS, noise=args.noise)
+        cycle_seconds = CYCLE_SECONDS
+        expected_blinks, expected_changes = truth.blink_count, len(truth.gaze_changes)
+
+    result = run(frames, cycle_seconds, args.frames, expected_blinks or 0, expected_changes or 0)
+    print(f"frames          : {result['frames']:,}")
+    print(f"per frame       : {result['ns_per_frame']:,.0f} ns")
+    print(f"throughput      : {result['fps']:,.0f} frames/s")
+
+    failed = False
+    if expected_blinks is not None:
+        # 마지막 미완료 주기는 일부만 처리되므로 정확도는 완료된 주기까지만 비교합니다.
+        if result["remainder"] == 0:
+            for name in ("blinks", "gaze_changes"):
+                detected, expected = result[name]
+                status = "ok" if detected == expected else "MISMATCH"
+                failed |= detected != expected
+                print(f"{name:<16}: {detected:,} / expected {expected:,} [{status}]")
+        else:
+            print("accuracy        : skipped (use a multiple of the cycle length, "
+                  f"{len(frames)} frames, to check detection counts)")
+
+    if args.max_ns_per_frame is not None and result["ns_per_frame"] > args.max_ns_per_frame:
+        print(f"FAIL: {result['ns_per_frame']:,.0f} ns/frame > {args.max_ns_per_frame:,.0f}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+얼굴 랜드마크 추론 백엔드(legacy FaceMesh / FaceLandmarker video / live_stream)의
+프레임당 지연 시간과 CPU 사용량을 비교합니다. (CPU 전용 Linux 기준)
+
+    cd ai
+    python benchmarks/bench_inference_backends.py --video sample.mp4 --model face_landmarker.task
+    python benchmarks/bench_inference_backends.py --video sample.mp4 --threads 1 2 4 --pin-cpus
+    python benchmarks/bench_inference_backends.py --video sample.mp4 --backends legacy multiprocess --workers 2 3 4
+
+- latency: 프레임을 넣은 시각부터 결과가 나온 시각까지 (live_stream은 콜백 도착 시각 기준)
+- cpu/frame: 프로세스 전체(MediaPipe 내부 스레드, multiprocess 워커 포함) CPU 시간 / 입력 프레임 수
+- live_stream, multiprocess는 --fps 속도로 프레임을 넣으므로, 추론이 밀리면 건너뛴 프레임 수(dropped)가 늘어납니다.
+- --video가 없으면 얼굴이 없는 합성 프레임을 사용합니다. (매 프레임 얼굴 검출만 실행되므로 추적 비용은 측정되지 않습니다)
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from inference_backends import BACKENDS, DEFAULT_MODEL_PATH, create_backend  # noqa: E402
+
+
+def load_frames(video, count, size):
+    """비디오 파일의 앞 count 프레임(RGB)을 메모리에 읽어 둡니다. 디코딩 비용을 측정에서 빼기 위해서입니다."""
+    if not video:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8) for _ in range(count)]
+    cap = cv2.VideoCapture(video)
+    frames = []
+    while len(frames) < count:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+    if not frames:
+        sys.exit(f"비디오를 읽을 수 없습니다: {video}")
+    return frames
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def worker_cpu_seconds(backend):
+    """multiprocess 워커들의 CPU 시간 합 (Linux /proc 기준, 그 외 백엔드는 0)"""
+    total = 0
+    for pid in getattr(backend, "worker_pids", lambda: [])():
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            total += int(fields[11]) + int(fields[12])  # utime + stime (clock ticks)
+        except (OSError, IndexError, ValueError):
+            pass
+    return total / os.sysconf("SC_CLK_TCK")
+
+
+def run(backend, frames, fps, paced, warmup):
+    """프레임을 차례로 넣고 (지연 시간 목록 ms, 얼굴 검출 비율, 결과 수, CPU ms/frame, 벽시계 fps)를 반환합니다."""
+    interval_ms = 1000.0 / fps
+    for i in range(warmup):
+        backend.process(frames[i % len(frames)], int(i * interval_ms))
+    backend.flush()
+
+    submitted = {}
+    results = []
+    base_ms = int(warmup * interval_ms) + 1
+    cpu_start = time.process_time() + worker_cpu_seconds(backend)
+    wall_start = time.perf_counter()
+    for i, rgb in enumerate(frames):
+        if paced:
+            delay = wall_start + i / fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        timestamp_ms = base_ms + int(i * interval_ms)
+        submitted[timestamp_ms] = time.perf_counter_ns()
+        results += backend.process(rgb, timestamp_ms)
+    results += backend.flush()
+    wall = time.perf_counter() - wall_start
+    cpu_ms = (time.process_time() + worker_cpu_seconds(backend) - cpu_start) * 1000
+
+    latencies = [(r.completed_ns - submitted[r.timestamp_ms]) / 1e6 for r in results if r.timestamp_ms in submitted]
+    faces = sum(r.landmarks is not None for r in results)
+    return latencies, faces / max(1, len(results)), len(results), cpu_ms / len(frames), len(frames) / wall
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", help="얼굴이 나오는 녹화 영상 (없으면 합성 프레임)")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH, help="FaceLandmarker .task 모델 파일")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--threads", type=int, nargs="+", default=[0], help="0이면 제한 없음")
+    parser.add_argument("--pin-cpus", action="store_true", help="스레드 수만큼의 CPU에 프로세스를 고정")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2], help="multiprocess 워커 수")
+    parser.add_argument("--worker-backend", default="legacy", choices=("legacy", "video"))
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, (args.width, args.height))
+    original_cpus = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else None
+    print(f"frames={len(frames)} size={frames[0].shape[1]}x{frames[0].shape[0]} cpus={os.cpu_count()}")
+    print(f"{'backend':>12} {'threads':>7} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+          f"{'cpu/frame':>9} {'fps':>6} {'dropped':>7} {'face %':>6}")
+
+    configs = []
+    for threads in args.threads:
+        for name in args.backends:
+            if name == "multiprocess":
+                configs += [(f"mp x{workers}", name, threads, {"workers": workers, "worker_backend": args.worker_backend})
+                            for workers in args.workers]
+            else:
+                configs.append((name, name, threads, {}))
+
+    for label, name, threads, extra in configs:
+        if original_cpus is not None:
+            os.sched_setaffinity(0, original_cpus)
+        backend = None
+        try:
+            backend = create_backend(name, num_threads=threads or None, pin_cpus=args.pin_cpus,
+                                     model_path=args.model, **extra)
+            latencies, face_ratio, completed, cpu_ms, fps = run(
+                backend, frames, args.fps, paced=name in ("live_stream", "multiprocess"), warmup=args.warmup
+            )
+        except (RuntimeError, FileNotFoundError) as e:
+            print(f"{label:>12} {threads or '-':>7}  skipped: {e}")
+            continue
+        finally:
+            if backend is not None:
+                backend.close()
+        print(
+            f"{label:>12} {threads or '-':>7} {percentile(latencies, 50):>7.1f} "
+            f"{percentile(latencies, 95):>7.1f} {percentile(latencies, 99):>7.1f} "
+            f"{cpu_ms:>7.1f}ms {fps:>6.1f} {len(frames) - completed:>7} {face_ratio * 100:>5.0f}%"
+        )
+
+if __name__ == "__main__":
+    main()
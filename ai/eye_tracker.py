@@ -1,10 +1,16 @@
 import cv2
-import mediapipe as mp
 import time
-import math
 import json  # << JSON 라이브러리 추가
-from datetime import datetime  # << 시간 기록을 위한 라이브러리 추가
+from datetime import datetime, timezone  # << 시간 기록을 위한 라이브러리 추가
 import requests  # 👈 1. 통신 장비(requests) 불러오기
+from fatigue_core import (
+    ANALYSIS_PERIOD_SECONDS,
+    LIVE_WINDOW_SECONDS,
+    FatigueStateMachine,
+)
+from frame_profiler import FrameProfiler
+from inference_backends import create_backend
+from upload_codec import encode_payload
 
 
 # --- 2. 서버 정보 및 로그인 계정 설정 ---
@@ -18,33 +24,41 @@ TEST_USER_EMAIL = "test@example.com"  # << 본인 테스트용 이메일로 변
 TEST_USER_PASSWORD = "password123"
 
 
-# --- 설정값 (튜닝을 위해 이 값을 조정하세요) ---
-# EAR 임계값: 이 값보다 작아지면 눈을 감은 것으로 판단
-EAR_THRESHOLD = 0.30
-# 연속 프레임: EAR 임계값보다 낮은 상태가 이 프레임 수만큼 지속되어야 깜빡임으로 인정
-EAR_CONSEC_FRAMES = 3
-# 시선 임계값: 홍채의 상대적 위치가 이 값보다 작으면 왼쪽, 크면 오른쪽으로 판단
-GAZE_THRESHOLD_LEFT = 3.3   # << 기존 0.35에서 수정
-GAZE_THRESHOLD_RIGHT = 2.7  # << 기존 0.65에서 수정
-# 분석 주기 (초): 이 시간마다 피로도를 계산하고 출력
-ANALYSIS_PERIOD_SECONDS = 60
+# --- 설정값 ---
+# (EAR/시선 임계값, 분석 주기 등 튜닝 값은 fatigue_core.py에 있습니다)
 OUTPUT_FILENAME = "fatigue_log.json"
-
-# --- MediaPipe Face Mesh 초기화 ---
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(
-    static_image_mode=False,
-    max_num_faces=1,
-    refine_landmarks=True,  # 눈 주변 랜드마크 정밀도 향상
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5
-)
-
-# --- 눈, 홍채 랜드마크 인덱스 정의 ---
-LEFT_EYE = [33, 160, 158, 133, 153, 144]
-RIGHT_EYE = [362, 385, 387, 263, 373, 380]
-LEFT_IRIS_CENTER = 473
-RIGHT_IRIS_CENTER = 468
+# 프레임 단계별 처리 시간 측정 (실행 중 'p' 키로 켜고 끄기, 't' 키로 trace 저장)
+PROFILE_ENABLED = False
+PROFILE_TRACE_FILENAME = "frame_trace.json"
+# 서버 전송 본문 형식 ("msgpack" / "json")과 압축 ("zstd" / "gzip" / None)
+# 압축은 본문이 UPLOAD_COMPRESS_MIN_BYTES 이상일 때만 합니다. (기록 한 건은 압축하면 오히려 커집니다)
+UPLOAD_FORMAT = "msgpack"
+UPLOAD_COMPRESSION = "gzip"
+UPLOAD_COMPRESS_MIN_BYTES = 1024
+# 전송 실패(연결 오류, 429, 5xx) 시 같은 본문을 다시 보내는 횟수와 첫 대기 시간(초, 이후 2배씩)
+# 본문의 window_start가 같으므로 서버는 다시 보낸 기록을 한 번만 저장합니다.
+UPLOAD_RETRIES = 3
+UPLOAD_RETRY_BACKOFF_SECONDS = 0.5
+UPLOAD_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+UPLOAD_TIMEOUT_SECONDS = 5
+
+# --- 얼굴 랜드마크 추론 설정 ---
+# "auto": 설치된 MediaPipe에 맞춰 선택 (mp.solutions가 있으면 "legacy", 없으면 "video")
+# "legacy": 기존 FaceMesh (구버전 MediaPipe), "video": FaceLandmarker 동기 추론,
+# "live_stream": FaceLandmarker 비동기 추론 (추론이 밀리면 프레임을 건너뛰어 화면이 끊기지 않음)
+# "multiprocess": 여러 워커 프로세스가 INFERENCE_WORKER_BACKEND로 나눠 추론 (코어가 여러 개인 장비용)
+INFERENCE_BACKEND = "auto"
+INFERENCE_WORKERS = 3
+INFERENCE_WORKER_BACKEND = "auto"
+# FaceLandmarker 모델 파일 (video / live_stream 백엔드에서 사용, 받는 주소는 inference_backends.py 참고)
+FACE_LANDMARKER_MODEL = "face_landmarker.task"
+INFERENCE_DELEGATE = "cpu"  # "cpu" 또는 "gpu"
+# 추론에 사용할 CPU 스레드 수 (None이면 제한 없음), True이면 해당 개수의 CPU에 프로세스를 고정
+INFERENCE_THREADS = None
+INFERENCE_PIN_CPUS = False
+MIN_DETECTION_CONFIDENCE = 0.5
+MIN_PRESENCE_CONFIDENCE = 0.5
+MIN_TRACKING_CONFIDENCE = 0.5
 
 
 class EyeFatigueMonitor:
@@ -53,141 +67,116 @@ class EyeFatigueMonitor:
     - 눈 깜빡임, 초점 시간 등을 측정하여 피로도 점수를 계산합니다.
     """
 
-    def __init__(self):
+    def __init__(self, profile=PROFILE_ENABLED):
         """모니터 초기화"""
-        # 데이터 누적 변수
-        self.blink_count = 0
-        self.stable_gaze_durations = []
+        # 깜빡임/시선 상태 머신 (깜빡임 시각과 시선 고정 구간을 슬라이딩 윈도우로 보관)
+        self.tracker = FatigueStateMachine(start_time=time.time())
+        self.analyzer = self.tracker.analyzer
         
         # 상태 추적 변수
-        self.blink_frame_counter = 0
-        self.last_gaze_direction = "CENTER"
-        self.stable_gaze_start_time = time.time()
         self.analysis_start_time = time.time()
         self.jwt_token = None  # 👈 로그인 후 받은 JWT 토큰을 저장할 변수 추가
-
-    def _euclidean(self, p1, p2):
-        """두 점 사이의 유클리드 거리를 계산합니다."""
-        return math.hypot(p2[0] - p1[0], p2[1] - p1[1])
-
-    def _get_ear(self, eye_landmarks):
-        """눈 랜드마크로부터 EAR(Eye Aspect Ratio) 값을 계산합니다."""
-        A = self._euclidean(eye_landmarks[1], eye_landmarks[5])
-        B = self._euclidean(eye_landmarks[2], eye_landmarks[4])
-        C = self._euclidean(eye_landmarks[0], eye_landmarks[3])
-        return (A + B) / (2.0 * C)
+        self.profiler = FrameProfiler(enabled=profile)  # 단계별 처리 시간 측정기
+        self.backend = create_backend(
+            INFERENCE_BACKEND,
+            num_threads=INFERENCE_THREADS,
+            pin_cpus=INFERENCE_PIN_CPUS,
+            workers=INFERENCE_WORKERS,
+            worker_backend=INFERENCE_WORKER_BACKEND,
+            model_path=FACE_LANDMARKER_MODEL,
+            delegate=INFERENCE_DELEGATE,
+            min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+            min_presence_confidence=MIN_PRESENCE_CONFIDENCE,
+            min_tracking_confidence=MIN_TRACKING_CONFIDENCE,
+        )
+        self.last_metrics = None  # live_stream 모드에서 새 결과가 없는 프레임에는 마지막 결과를 표시
 
     def process_frame(self, frame):
         """입력된 프레임을 처리하여 눈 관련 지표를 업데이트하고 화면에 정보를 그립니다."""
+        profiler = self.profiler
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = face_mesh.process(rgb)
-        gaze_direction_latest = self.last_gaze_direction
-
-        if results.multi_face_landmarks:
-            for face_landmarks in results.multi_face_landmarks:
-                h, w, _ = frame.shape
-                
-                # --- 1. EAR 계산 및 깜빡임 감지 ---
-                left_eye = [(int(face_landmarks.landmark[i].x * w), int(face_landmarks.landmark[i].y * h)) for i in LEFT_EYE]
-                right_eye = [(int(face_landmarks.landmark[i].x * w), int(face_landmarks.landmark[i].y * h)) for i in RIGHT_EYE]
-                ear = (self._get_ear(left_eye) + self._get_ear(right_eye)) / 2.0
-                
-                if ear < EAR_THRESHOLD:
-                    self.blink_frame_counter += 1
-                else:
-                    if self.blink_frame_counter >= EAR_CONSEC_FRAMES:
-                        self.blink_count += 1
-                    self.blink_frame_counter = 0
-
-                # --- 2. 시선 방향 추정 ---
-                eye_left_lm = face_landmarks.landmark[LEFT_EYE[0]]
-                eye_right_lm = face_landmarks.landmark[LEFT_EYE[3]]
-                iris_center_lm = face_landmarks.landmark[LEFT_IRIS_CENTER]
-                eye_width = (eye_right_lm.x - eye_left_lm.x)
-                
-                relative_iris_pos = 0.5 # 기본값은 정면
-                if eye_width != 0:
-                    relative_iris_pos = (iris_center_lm.x - eye_left_lm.x) / eye_width
-
-                    # --- 수정된 시선 판단 로직 ---
-                    if relative_iris_pos > GAZE_THRESHOLD_LEFT:
-                        gaze_direction_latest = "LEFT"
-                    elif relative_iris_pos < GAZE_THRESHOLD_RIGHT:
-                        gaze_direction_latest = "RIGHT"
-                    else:
-                        gaze_direction_latest = "CENTER"
-                
-                # --- 3. 안정적 시선 유지 시간 측정 ---
-                if gaze_direction_latest != self.last_gaze_direction:
-                    duration = time.time() - self.stable_gaze_start_time
-                    self.stable_gaze_durations.append(duration)
-                    self.stable_gaze_start_time = time.time()
-                self.last_gaze_direction = gaze_direction_latest
-
-                # --- 4. 화면에 디버그 정보 그리기 ---
-                for (x, y) in left_eye + right_eye:
-                    cv2.circle(frame, (x, y), 2, (0, 255, 0), -1)
-                cv2.putText(frame, f"EAR: {ear:.2f}", (30, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-                cv2.putText(frame, f"Gaze Pos: {relative_iris_pos:.2f}", (30, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 255), 2)
-                cv2.putText(frame, f"Gaze: {gaze_direction_latest}", (30, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-        
+        profiler.lap("cvtColor")
+        results = self.backend.process(rgb, int(time.time() * 1000))
+        profiler.lap("face_mesh")
+
+        h, w, _ = frame.shape
+        for result in results:
+            if result.landmarks is None:
+                self.last_metrics = None  # 얼굴을 찾지 못한 프레임
+                continue
+            # --- 1~3. EAR/깜빡임, 시선 방향, 시선 유지 시간 (fatigue_core) ---
+            # live_stream 모드에서는 결과가 늦게 도착하므로 그 결과의 프레임 시각을 사용합니다.
+            self.last_metrics = self.tracker.update(result.landmarks, w, h, result.timestamp_ms / 1000)
+        profiler.lap("ear_gaze")
+
+        # --- 4. 화면에 디버그 정보 그리기 ---
+        if self.last_metrics is not None:
+            self._draw_metrics(frame, self.last_metrics)
+            profiler.lap("draw")
+
+        # 프로파일 표시 자체의 비용은 별도 단계로 재서 분석 시간에 섞이지 않게 합니다.
+        if profiler.enabled:
+            self._draw_profile(frame)
+            profiler.lap("profile")
 
-        
         # 주기적으로 피로도 분석 실행
         self._run_analysis()
+        profiler.lap("analysis")
     
                 
 
+    def _draw_metrics(self, frame, metrics):
+        """EAR, 시선 위치/방향, 최근 BPM을 화면에 표시합니다."""
+        for (x, y) in metrics.left_eye + metrics.right_eye:
+            cv2.circle(frame, (x, y), 2, (0, 255, 0), -1)
+        cv2.putText(frame, f"EAR: {metrics.ear:.2f}", (30, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+        cv2.putText(frame, f"Gaze Pos: {metrics.relative_iris_pos:.2f}", (30, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 255), 2)
+        cv2.putText(frame, f"Gaze: {metrics.gaze_direction}", (30, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        live_bpm = self.analyzer.bpm(LIVE_WINDOW_SECONDS, time.time())
+        cv2.putText(frame, f"BPM ({LIVE_WINDOW_SECONDS}s): {live_bpm:.0f}", (30, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 128, 255), 2)
+
+    def _draw_profile(self, frame):
+        """프로파일러의 단계별 p50/p95/p99를 화면 하단에 표시합니다."""
+        h = frame.shape[0]
+        lines = self.profiler.summary_lines()
+        for i, line in enumerate(lines):
+            y = h - 20 * (len(lines) - i)
+            cv2.putText(frame, line, (10, y), cv2.FONT_HERSHEY_PLAIN, 1.0, (255, 255, 255), 1)
+
     def _run_analysis(self):
         """설정된 분석 주기가 되면 피로도를 계산하고 결과를 출력 및 저장합니다."""
-        if time.time() - self.analysis_start_time >= ANALYSIS_PERIOD_SECONDS:
-            bpm = self.blink_count
-            
-            final_gaze_duration = time.time() - self.stable_gaze_start_time
-            self.stable_gaze_durations.append(final_gaze_duration)
-            max_stable_gaze_time = max(self.stable_gaze_durations) if self.stable_gaze_durations else 0
+        now = time.time()
+        if now - self.analysis_start_time >= ANALYSIS_PERIOD_SECONDS:
+            bpm, max_stable_gaze_time, total_health_score, fatigue_status = self.tracker.summary(now)
 
             print(f"\n--- [ {ANALYSIS_PERIOD_SECONDS}초 분석 결과 ] ---")
             print(f"분당 깜빡임 (BPM): {bpm} 회")
             print(f"최대 시선 고정 시간: {max_stable_gaze_time:.2f} 초")
+            for length, stats in self.analyzer.snapshot(now).items():
+                print(f"  [최근 {length}초] BPM {stats['bpm']:.1f} / 최대 시선 고정 {stats['max_stable_gaze_time']:.2f} 초")
 
-            # --- 1. 지표별 건강 점수 산출 ---
-            blink_score = (bpm / 30) * 100
-            if blink_score > 100:
-                blink_score = 100
-
-            gaze_score = (1 - (max_stable_gaze_time / 60)) * 100
-            if gaze_score < 0:
-                gaze_score = 0
-            
-            # --- 2. 최종 건강 점수 계산 ---
-            total_health_score = (blink_score * 0.6) + (gaze_score * 0.4)
-            
-            # --- 3. 결과 해석 ---
-            fatigue_status = "매우 나쁨 😵"
-            if total_health_score > 70:
-                fatigue_status = "양호함 😊"
-            elif total_health_score > 40:
-                fatigue_status = "주의 필요 😐"
-            
             print(f"눈 건강 점수: {total_health_score:.1f} / 100")
             print(f"현재 눈 상태: {fatigue_status}")
             print("--------------------------\n")
+            if self.profiler.enabled:
+                self.profiler.print_summary()
 
-            # --- 4. 전송할 데이터 준비 ---
+            # --- 1. 전송할 데이터 준비 ---
             # 👇 바로 이 부분이 빠져있었습니다!
             log_data = {
                 "bpm": bpm,
                 "max_stable_gaze_time": round(max_stable_gaze_time, 2),
                 "health_score": round(total_health_score, 1),
-                "status": fatigue_status
+                "status": fatigue_status,
+                # 같은 분석 구간을 다시 보내도 서버에 한 번만 저장되도록 구간 시작 시각을 함께 보냅니다.
+                "window_start": datetime.fromtimestamp(self.analysis_start_time, timezone.utc).isoformat(),
             }
 
-            # --- 5. 백엔드 서버로 데이터 전송 ---
+            # --- 2. 백엔드 서버로 데이터 전송 ---
             # (이제 _save_log는 사용하지 않습니다.)
             self._send_to_backend(log_data)
 
-            # --- 6. 다음 분석을 위해 변수 초기화 ---
+            # --- 3. 다음 분석 시점 갱신 (슬라이딩 윈도우라 누적 데이터는 지우지 않습니다) ---
             self._reset_analysis_variables()
 
 
@@ -211,29 +200,39 @@ class EyeFatigueMonitor:
             return False
 
     def _send_to_backend(self, data_to_send): 
-        """분석 결과를 백엔드 서버로 전송합니다."""
+        """
+        분석 결과를 백엔드 서버로 전송합니다. 연결 오류나 일시적인 서버 오류면 같은 본문을
+        UPLOAD_RETRIES 번까지 점점 길게 기다리며 다시 보냅니다. (성공 여부 반환)
+        """
         if not self.jwt_token:
             print(">> 경고: JWT 토큰이 없어 서버로 전송할 수 없습니다.")
-            return
+            return False
 
-        headers = {"Authorization": f"Bearer {self.jwt_token}"}
-        try:
-            # 👈 여기서 log_data 대신 data_to_send를 사용해야 합니다.
-            response = requests.post(FATIGUE_API_URL, json=data_to_send, headers=headers)
+        body, headers = encode_payload(data_to_send, UPLOAD_FORMAT, UPLOAD_COMPRESSION,
+                                       UPLOAD_COMPRESS_MIN_BYTES)
+        headers["Authorization"] = f"Bearer {self.jwt_token}"
+        for attempt in range(UPLOAD_RETRIES + 1):
+            if attempt:
+                delay = UPLOAD_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+                print(f">> {delay:.1f}초 후 다시 전송합니다. ({attempt}/{UPLOAD_RETRIES})")
+                time.sleep(delay)
+            try:
+                response = requests.post(FATIGUE_API_URL, data=body, headers=headers, timeout=UPLOAD_TIMEOUT_SECONDS)
+            except requests.exceptions.RequestException as e:
+                print(f">> 서버 연결 오류: {e}")
+                continue
 
             if response.status_code == 200:
                 print(">> 서버로 분석 결과 전송 성공!")
-            else:
-                print(f">> 서버 전송 실패: {response.status_code} - {response.text}")
-        except requests.exceptions.RequestException as e:
-            print(f">> 서버 연결 오류: {e}")
+                return True
+            print(f">> 서버 전송 실패: {response.status_code} - {response.text}")
+            if response.status_code not in UPLOAD_RETRY_STATUS_CODES:
+                return False  # 다시 보내도 같은 결과인 오류 (인증 만료, 잘못된 본문 등)
+        return False
 
     def _reset_analysis_variables(self):
-        """다음 분석을 위해 변수를 초기화합니다."""
+        """다음 분석 시점을 갱신합니다. 깜빡임/시선 기록은 윈도우 밖으로 밀려나며 자동으로 정리됩니다."""
         self.analysis_start_time = time.time()
-        self.blink_count = 0
-        self.stable_gaze_durations = []
-        self.stable_gaze_start_time = time.time() # 시선 유지 시간도 초기화
 
 if __name__ == "__main__":
     cap = cv2.VideoCapture(0)
@@ -244,20 +243,34 @@ if __name__ == "__main__":
 
     if login_successful:
         print("로그인 성공! 실시간 눈 피로 분석을 시작합니다. (종료: 'q' 키)")
+        print("('p': 처리 시간 측정 켜기/끄기, 't': trace 파일 저장)")
+        profiler = monitor.profiler
         while True:
+            profiler.begin_frame()
             ret, frame = cap.read()
             if not ret:
                 break
             frame = cv2.flip(frame, 1)
+            profiler.lap("capture")
 
             # 이 함수가 내부적으로 분석, 결과 출력, 서버 전송까지 모두 처리합니다.
             monitor.process_frame(frame)
 
             cv2.imshow("Eye Fatigue Monitor", frame)
-            if cv2.waitKey(1) & 0xFF == ord("q"):
+            key = cv2.waitKey(1) & 0xFF
+            profiler.lap("imshow")
+            profiler.end_frame()
+
+            if key == ord("q"):
                 break
+            elif key == ord("p"):
+                print(f">> 처리 시간 측정: {'켜짐' if profiler.toggle() else '꺼짐'}")
+            elif key == ord("t"):
+                count = profiler.dump_trace(PROFILE_TRACE_FILENAME)
+                print(f">> trace 저장 완료: {PROFILE_TRACE_FILENAME} ({count}개 구간)")
     else:
         print("로그인에 실패하여 프로그램을 종료합니다. 서버 주소와 계정 정보를 확인하세요.")
 
     cap.release()
+    monitor.backend.close()
     cv2.destroyAllWindows()
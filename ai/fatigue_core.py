@@ -0,0 +1,160 @@
+import math
+import time
+
+from sliding_window import SlidingFatigueAnalyzer
+
+# --- 설정값 (튜닝을 위해 이 값을 조정하세요) ---
+# EAR 임계값: 이 값보다 작아지면 눈을 감은 것으로 판단
+EAR_THRESHOLD = 0.30
+# 연속 프레임: EAR 임계값보다 낮은 상태가 이 프레임 수만큼 지속되어야 깜빡임으로 인정
+EAR_CONSEC_FRAMES = 3
+# 시선 임계값: 홍채의 상대적 위치가 이 값보다 작으면 왼쪽, 크면 오른쪽으로 판단
+GAZE_THRESHOLD_LEFT = 3.3   # << 기존 0.35에서 수정
+GAZE_THRESHOLD_RIGHT = 2.7  # << 기존 0.65에서 수정
+# 분석 주기 (초): 이 시간마다 피로도를 계산하고 출력
+ANALYSIS_PERIOD_SECONDS = 60
+# 슬라이딩 윈도우 길이 (초): 화면 표시와 분석에 사용. ANALYSIS_PERIOD_SECONDS를 반드시 포함해야 합니다.
+ANALYSIS_WINDOWS = (10, ANALYSIS_PERIOD_SECONDS, 600)
+# 화면에 실시간으로 표시할 짧은 윈도우 길이 (초)
+LIVE_WINDOW_SECONDS = 10
+
+# --- 눈, 홍채 랜드마크 인덱스 정의 ---
+LEFT_EYE = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+LEFT_IRIS_CENTER = 473
+RIGHT_IRIS_CENTER = 468
+# 상태 머신이 읽는 랜드마크 인덱스 (녹화 파일, 프로세스 간 전달 시 이 점들만 보냅니다)
+USED_LANDMARKS = sorted(set(LEFT_EYE + RIGHT_EYE + [LEFT_IRIS_CENTER, RIGHT_IRIS_CENTER]))
+
+
+def euclidean(p1, p2):
+    """두 점 사이의 유클리드 거리를 계산합니다."""
+    return math.hypot(p2[0] - p1[0], p2[1] - p1[1])
+
+
+def eye_aspect_ratio(eye_landmarks):
+    """눈 랜드마크로부터 EAR(Eye Aspect Ratio) 값을 계산합니다."""
+    A = euclidean(eye_landmarks[1], eye_landmarks[5])
+    B = euclidean(eye_landmarks[2], eye_landmarks[4])
+    C = euclidean(eye_landmarks[0], eye_landmarks[3])
+    return (A + B) / (2.0 * C)
+
+
+def classify_gaze(relative_iris_pos):
+    """홍채의 상대 위치로 시선 방향(LEFT / RIGHT / CENTER)을 판단합니다."""
+    if relative_iris_pos > GAZE_THRESHOLD_LEFT:
+        return "LEFT"
+    elif relative_iris_pos < GAZE_THRESHOLD_RIGHT:
+        return "RIGHT"
+    return "CENTER"
+
+
+def compute_health_score(bpm, max_stable_gaze_time):
+    """분당 깜빡임과 최대 시선 고정 시간으로 (눈 건강 점수, 상태 문구)를 계산합니다."""
+    # --- 1. 지표별 건강 점수 산출 ---
+    blink_score = min((bpm / 30) * 100, 100)
+    gaze_score = max((1 - (max_stable_gaze_time / ANALYSIS_PERIOD_SECONDS)) * 100, 0)
+
+    # --- 2. 최종 건강 점수 계산 ---
+    total_health_score = (blink_score * 0.6) + (gaze_score * 0.4)
+
+    # --- 3. 결과 해석 ---
+    fatigue_status = "매우 나쁨 😵"
+    if total_health_score > 70:
+        fatigue_status = "양호함 😊"
+    elif total_health_score > 40:
+        fatigue_status = "주의 필요 😐"
+    return total_health_score, fatigue_status
+
+
+class Point:
+    """MediaPipe NormalizedLandmark처럼 x, y 속성만 가진 점"""
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class LandmarkResult:
+    """
+    추론 결과 한 건: 프레임 시각(ms)과 첫 번째 얼굴의 랜드마크 (얼굴이 없으면 None)
+    completed_ns는 추론이 끝난 시각(time.perf_counter_ns)으로, 지연 시간 측정에 사용합니다.
+    """
+
+    __slots__ = ("timestamp_ms", "landmarks", "completed_ns")
+
+    def __init__(self, timestamp_ms, landmarks):
+        self.timestamp_ms = timestamp_ms
+        self.landmarks = landmarks
+        self.completed_ns = time.perf_counter_ns()
+
+
+class FrameMetrics:
+    """프레임 한 장의 분석 결과 (화면 표시용)"""
+
+    __slots__ = ("ear", "relative_iris_pos", "gaze_direction", "left_eye", "right_eye", "blinked")
+
+    def __init__(self, ear, relative_iris_pos, gaze_direction, left_eye, right_eye, blinked):
+        self.ear = ear
+        self.relative_iris_pos = relative_iris_pos
+        self.gaze_direction = gaze_direction
+        self.left_eye = left_eye
+        self.right_eye = right_eye
+        self.blinked = blinked
+
+
+class FatigueStateMachine:
+    """
+    얼굴 랜드마크만으로 깜빡임과 시선 변화를 추적하는 상태 머신.
+    카메라, OpenCV, MediaPipe 없이 동작하므로 합성/녹화된 랜드마크로 테스트할 수 있습니다.
+    landmarks는 landmarks[i].x, landmarks[i].y (0~1 정규화 좌표)를 제공하는 어떤 객체든 됩니다.
+    """
+
+    def __init__(self, start_time, windows=ANALYSIS_WINDOWS):
+        self.analyzer = SlidingFatigueAnalyzer(windows, start_time=start_time)
+        self.blink_frame_counter = 0
+        self.last_gaze_direction = "CENTER"
+
+    def update(self, landmarks, w, h, now):
+        """랜드마크 한 프레임을 반영하고 FrameMetrics를 반환합니다."""
+        # --- 1. EAR 계산 및 깜빡임 감지 ---
+        left_eye = [(int(landmarks[i].x * w), int(landmarks[i].y * h)) for i in LEFT_EYE]
+        right_eye = [(int(landmarks[i].x * w), int(landmarks[i].y * h)) for i in RIGHT_EYE]
+        ear = (eye_aspect_ratio(left_eye) + eye_aspect_ratio(right_eye)) / 2.0
+
+        blinked = False
+        if ear < EAR_THRESHOLD:
+            self.blink_frame_counter += 1
+        else:
+            if self.blink_frame_counter >= EAR_CONSEC_FRAMES:
+                self.analyzer.record_blink(now)
+                blinked = True
+            self.blink_frame_counter = 0
+
+        # --- 2. 시선 방향 추정 ---
+        gaze_direction = self.last_gaze_direction
+        eye_left_lm = landmarks[LEFT_EYE[0]]
+        eye_right_lm = landmarks[LEFT_EYE[3]]
+        iris_center_lm = landmarks[LEFT_IRIS_CENTER]
+        eye_width = (eye_right_lm.x - eye_left_lm.x)
+
+        relative_iris_pos = 0.5 # 기본값은 정면
+        if eye_width != 0:
+            relative_iris_pos = (iris_center_lm.x - eye_left_lm.x) / eye_width
+            gaze_direction = classify_gaze(relative_iris_pos)
+
+        # --- 3. 안정적 시선 유지 시간 측정 ---
+        if gaze_direction != self.last_gaze_direction:
+            self.analyzer.record_gaze_change(now)
+        self.last_gaze_direction = gaze_direction
+
+        return FrameMetrics(ear, relative_iris_pos, gaze_direction, left_eye, right_eye, blinked)
+
+    def summary(self, now, window=ANALYSIS_PERIOD_SECONDS):
+        """window 초 동안의 (BPM, 최대 시선 고정 시간, 눈 건강 점수, 상태 문구)"""
+        bpm = round(self.analyzer.bpm(window, now))
+        max_stable_gaze_time = self.analyzer.max_fixation(window, now)
+        score, status = compute_health_score(bpm, max_stable_gaze_time)
+        return bpm, max_stable_gaze_time, score, status
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+def _noop(*args, **kwargs):
+    """프로파일러가 꺼져 있을 때 사용하는 빈 함수"""
+    return None
+
+
+class FrameProfiler:
+    """
+    프레임 처리 단계별 소요 시간을 측정하는 경량 프로파일러.
+    - begin_frame() 이후 lap("단계명")을 호출할 때마다 직전 지점부터의 시간을 기록합니다.
+    - 단계별 최근 window 개 값으로 p50/p95/p99를 계산합니다.
+    - Chrome trace(JSON) 형식으로 저장할 수 있습니다. (chrome://tracing, Perfetto에서 열기)
+    - 꺼져 있을 때는 측정 함수가 빈 함수로 바뀌어 비용이 거의 없습니다.
+    """
+
+    def __init__(self, enabled=False, window=300, trace_capacity=20000):
+        self.window = window
+        self.samples = {}  # 단계명 -> 최근 소요 시간(ns) deque
+        self.trace_events = deque(maxlen=trace_capacity)  # (단계명, 시작 ns, 소요 ns)
+        self._frame_start = 0
+        self._mark = 0
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._tid = threading.get_ident()
+        self.enabled = False
+        self.set_enabled(enabled)
+
+    # --- 켜기 / 끄기 ---
+    def set_enabled(self, enabled):
+        """측정 함수를 실제 구현 또는 빈 함수로 교체합니다."""
+        self.enabled = bool(enabled)
+        if self.enabled:
+            self.begin_frame = self._begin_frame
+            self.lap = self._lap
+            self.end_frame = self._end_frame
+        else:
+            self.begin_frame = _noop
+            self.lap = _noop
+            self.end_frame = _noop
+
+    def toggle(self):
+        self.set_enabled(not self.enabled)
+        return self.enabled
+
+    def reset(self):
+        self.samples.clear()
+        self.trace_events.clear()
+
+    # --- 측정 ---
+    def _begin_frame(self):
+        now = time.perf_counter_ns()
+        self._frame_start = now
+        self._mark = now
+
+    def _lap(self, stage):
+        now = time.perf_counter_ns()
+        self._record(stage, self._mark, now - self._mark)
+        self._mark = now
+
+    def _end_frame(self):
+        now = time.perf_counter_ns()
+        self._record("frame", self._frame_start, now - self._frame_start)
+
+    def _record(self, stage, start_ns, duration_ns):
+        bucket = self.samples.get(stage)
+        if bucket is None:
+            bucket = self.samples[stage] = deque(maxlen=self.window)
+        bucket.append(duration_ns)
+        self.trace_events.append((stage, start_ns, duration_ns))
+
+    # --- 리포트 ---
+    def percentiles(self, stage, quantiles=(0.50, 0.95, 0.99)):
+        """단계별 최근 window 구간의 백분위수(ms)를 반환합니다."""
+        values = sorted(self.samples.get(stage, ()))
+        if not values:
+            return tuple(0.0 for _ in quantiles)
+        last = len(values) - 1
+        return tuple(values[min(last, int(q * len(values)))] / 1e6 for q in quantiles)
+
+    def summary_lines(self):
+        """"단계: p50 / p95 / p99 ms" 형식의 요약 문자열 목록"""
+        lines = []
+        for stage in self.samples:
+            p50, p95, p99 = self.percentiles(stage)
+            lines.append(f"{stage:<10} p50 {p50:6.2f} / p95 {p95:6.2f} / p99 {p99:6.2f} ms")
+        return lines
+
+    def print_summary(self):
+        print(f"--- [ 프레임 단계별 처리 시간 (최근 {self.window} 프레임) ] ---")
+        for line in self.summary_lines():
+            print(line)
+
+    def dump_trace(self, path):
+        """기록된 구간을 Chrome trace event 형식(JSON)으로 저장합니다."""
+        events = [
+            {
+                "name": stage,
+                "ph": "X",
+                "ts": (start_ns - self._origin) / 1000,
+                "dur": duration_ns / 1000,
+                "pid": self._pid,
+                "tid": self._tid,
+            }
+            for stage, start_ns, duration_ns in self.trace_events
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
@@ -0,0 +1,192 @@
+"""
+얼굴 랜드마크 추론 백엔드.
+
+- LegacyFaceMeshBackend: 기존 mp.solutions.face_mesh.FaceMesh (구버전 MediaPipe)
+- FaceLandmarkerBackend: MediaPipe Tasks API의 FaceLandmarker
+    - running_mode="video": 프레임마다 동기 추론 (detect_for_video)
+    - running_mode="live_stream": 비동기 추론 (detect_async + 결과 콜백). 추론이 밀리면 MediaPipe가 프레임을 건너뜁니다.
+- MultiProcessBackend (mp_inference.py): 여러 워커 프로세스가 위 동기 백엔드로 나눠 추론
+
+모든 백엔드는 process(rgb, timestamp_ms)로 프레임을 넣고, 그 사이 완료된 결과를 LandmarkResult 목록으로 돌려줍니다.
+(동기 백엔드는 0~1개, live_stream은 콜백으로 도착한 결과를 모두 반환합니다.)
+결과의 landmarks는 FatigueStateMachine.update()에 그대로 넘길 수 있습니다.
+
+FaceLandmarker 모델 파일은 아래 주소에서 받아 model_path로 지정합니다.
+    https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/latest/face_landmarker.task
+"""
+
+import os
+import threading
+from collections import deque
+
+import cv2
+
+from fatigue_core import LandmarkResult
+
+try:
+    import mediapipe as mp
+except ImportError:  # 추론 백엔드를 만들 때 알기 쉬운 오류로 알립니다.
+    mp = None
+
+DEFAULT_MODEL_PATH = "face_landmarker.task"
+BACKENDS = ("legacy", "video", "live_stream", "multiprocess")
+
+
+def _require_mediapipe():
+    if mp is None:
+        raise RuntimeError("mediapipe가 설치되어 있지 않습니다. (pip install mediapipe)")
+
+
+def resolve_backend_name(name):
+    """
+    "auto"를 설치된 MediaPipe에서 동작하는 동기 백엔드 이름으로 바꿉니다.
+    mp.solutions(FaceMesh)가 있으면 "legacy", 없으면(최신 MediaPipe) FaceLandmarker "video"를 사용합니다.
+    """
+    if name != "auto":
+        return name
+    _require_mediapipe()
+    return "legacy" if hasattr(mp, "solutions") else "video"
+
+
+def apply_thread_limit(num_threads=None, pin_cpus=False):
+    """
+    추론 프로세스가 사용할 CPU 스레드 수를 제한합니다.
+    MediaPipe Python API는 추론 스레드 수를 직접 받지 않으므로 OpenCV 스레드 수를 맞추고,
+    pin_cpus=True이면 (Linux) 프로세스를 앞쪽 num_threads 개 CPU에 고정해 MediaPipe 스레드도 그 안에서만 돌게 합니다.
+    """
+    if not num_threads:
+        return
+    cv2.setNumThreads(num_threads)
+    if pin_cpus and hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))[:num_threads]
+        os.sched_setaffinity(0, cpus)
+
+
+class LegacyFaceMeshBackend:
+    """기존 mp.solutions.face_mesh.FaceMesh 백엔드 (동기 처리)"""
+
+    name = "legacy"
+
+    def __init__(self, min_detection_confidence=0.5, min_tracking_confidence=0.5, **_):
+        _require_mediapipe()
+        if not hasattr(mp, "solutions"):
+            raise RuntimeError("이 MediaPipe 버전에는 mp.solutions(FaceMesh)가 없습니다. 'video' 또는 'live_stream' 백엔드를 사용하세요.")
+        self._face_mesh = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=False,
+            max_num_faces=1,
+            refine_landmarks=True,  # 눈 주변(홍채) 랜드마크 포함
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+
+    def process(self, rgb, timestamp_ms):
+        results = self._face_mesh.process(rgb)
+        landmarks = results.multi_face_landmarks[0].landmark if results.multi_face_landmarks else None
+        return [LandmarkResult(timestamp_ms, landmarks)]
+
+    def flush(self, timeout=1.0):
+        return []
+
+    def close(self):
+        self._face_mesh.close()
+
+
+class FaceLandmarkerBackend:
+    """
+    MediaPipe Tasks FaceLandmarker 백엔드.
+    timestamp_ms는 호출마다 반드시 증가해야 합니다. (같거나 작은 값은 건너뜁니다.)
+    """
+
+    def __init__(self, running_mode="video", model_path=DEFAULT_MODEL_PATH, delegate="cpu",
+                 min_detection_confidence=0.5, min_presence_confidence=0.5, min_tracking_confidence=0.5, **_):
+        _require_mediapipe()
+        from mediapipe.tasks.python import BaseOptions, vision
+
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"FaceLandmarker 모델 파일이 없습니다: {model_path} (모듈 설명의 주소에서 받으세요)")
+
+        self.name = running_mode
+        self._live = running_mode == "live_stream"
+        self._last_timestamp = -1
+        self._completed = deque()  # 콜백 스레드가 넣고, process()가 꺼냅니다.
+        self._last_result_timestamp = -1
+        self._result_arrived = threading.Condition()
+
+        mode = vision.RunningMode.LIVE_STREAM if self._live else vision.RunningMode.VIDEO
+        delegate = BaseOptions.Delegate.GPU if delegate == "gpu" else BaseOptions.Delegate.CPU
+        options = vision.FaceLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path, delegate=delegate),
+            running_mode=mode,
+            num_faces=1,
+            min_face_detection_confidence=min_detection_confidence,
+            min_face_presence_confidence=min_presence_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result if self._live else None,
+        )
+        self._landmarker = vision.FaceLandmarker.create_from_options(options)
+
+    @staticmethod
+    def _first_face(result):
+        return result.face_landmarks[0] if result.face_landmarks else None
+
+    def _on_result(self, result, image, timestamp_ms):
+        """live_stream 모드의 결과 콜백 (MediaPipe 내부 스레드에서 호출)"""
+        self._completed.append(LandmarkResult(timestamp_ms, self._first_face(result)))
+        with self._result_arrived:
+            self._last_result_timestamp = timestamp_ms
+            self._result_arrived.notify_all()
+
+    def _drain(self):
+        results = []
+        while self._completed:
+            results.append(self._completed.popleft())
+        return results
+
+    def process(self, rgb, timestamp_ms):
+        if timestamp_ms <= self._last_timestamp:
+            return self._drain()
+        self._last_timestamp = timestamp_ms
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+
+        if not self._live:
+            result = self._landmarker.detect_for_video(image, timestamp_ms)
+            return [LandmarkResult(timestamp_ms, self._first_face(result))]
+
+        self._landmarker.detect_async(image, timestamp_ms)
+        return self._drain()
+
+    def flush(self, timeout=1.0):
+        """
+        live_stream 모드에서 마지막으로 넣은 프레임의 결과를 기다렸다가 남은 결과를 모두 반환합니다.
+        (MediaPipe가 건너뛴 프레임은 결과가 오지 않으므로 timeout 초까지만 기다립니다.)
+        """
+        with self._result_arrived:
+            self._result_arrived.wait_for(lambda: self._last_result_timestamp >= self._last_timestamp, timeout)
+        return self._drain()
+
+    def close(self):
+        self._landmarker.close()
+
+
+def create_backend(name="auto", num_threads=None, pin_cpus=False, workers=2, worker_backend="auto", **options):
+    """
+    이름으로 추론 백엔드를 만듭니다.
+    - name: "auto" / "legacy" / "video" / "live_stream" / "multiprocess" ("auto"는 resolve_backend_name 참고)
+    - options: model_path, delegate("cpu"/"gpu"), min_detection_confidence,
+      min_presence_confidence, min_tracking_confidence
+    - multiprocess: workers 개의 프로세스가 각자 worker_backend 백엔드로 추론합니다. (mp_inference.py)
+      num_threads는 워커마다 적용됩니다.
+    """
+    if name == "multiprocess":
+        from mp_inference import MultiProcessBackend
+
+        worker_options = {"num_threads": num_threads, **options}
+        return MultiProcessBackend(workers, backend_name=resolve_backend_name(worker_backend),
+                                   backend_options=worker_options)
+    name = resolve_backend_name(name)
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 추론 백엔드: {name} (선택: auto, {', '.join(BACKENDS)})")
+    apply_thread_limit(num_threads, pin_cpus)
+    if name == "legacy":
+        return LegacyFaceMeshBackend(**options)
+    return FaceLandmarkerBackend(running_mode=name, **options)
@@ -0,0 +1,358 @@
+"""
+여러 프로세스로 얼굴 랜드마크를 추론하는 백엔드.
+
+FaceMesh 추론과 NumPy 연산은 GIL 때문에 한 프로세스에서는 코어 하나만 쓰므로,
+워커 프로세스마다 자체 추론 백엔드(FaceMesh 등)를 두고 프레임을 나눠 처리합니다.
+
+- 프레임: 캡처 프로세스가 multiprocessing.shared_memory 링 버퍼의 빈 칸(slot)에 직접 씁니다.
+  큐로는 (순번, 시각, 칸 번호)만 보내므로 프레임을 pickle로 복사하지 않습니다.
+- 결과: 워커는 상태 머신이 읽는 랜드마크(USED_LANDMARKS)의 (x, y)만 돌려보냅니다.
+- 순서: 워커마다 끝나는 시점이 달라 결과가 뒤섞이므로, ReorderBuffer로 프레임 순번(= 시각) 순서를 맞춘 뒤
+  FatigueStateMachine에 넣습니다.
+- 빈 칸이 없으면(워커가 모두 바쁘면) 그 프레임은 건너뜁니다. (dropped)
+- 워커마다 작업 큐와 결과 파이프를 따로 두고 어떤 프레임을 어느 워커에 맡겼는지 기억하므로,
+  워커가 죽으면(결과 파이프가 닫힘) 그 워커가 맡은 프레임만 건너뛰고 칸을 돌려받은 뒤 워커를 다시 띄웁니다.
+  (큐 하나를 함께 쓰면 쓰는 도중 죽은 워커가 큐의 잠금을 쥔 채 남아 다른 워커까지 멈춥니다)
+
+inference_backends의 백엔드와 같은 process(rgb, timestamp_ms) / flush() / close() 인터페이스를 제공합니다.
+"""
+
+import heapq
+import logging
+import multiprocessing as mp
+import time
+from multiprocessing import connection, resource_tracker, shared_memory
+
+import numpy as np
+
+from fatigue_core import USED_LANDMARKS, LandmarkResult, Point
+
+logger = logging.getLogger(__name__)
+
+_STOP = None
+_WORKER_FAILED = -1
+_WORKER_READY = -2
+
+
+def _attach(name):
+    """워커에서 기존 공유 메모리에 연결합니다. (정리는 만든 쪽에서 하므로 추적하지 않습니다)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    # Python 3.12 이하에는 track 인자가 없어, 연결만 해도 resource_tracker에 다시 등록됩니다.
+    # (추적기가 워커 종료 시 세그먼트를 지우거나, 만든 쪽의 unlink와 이중으로 정리하게 됩니다)
+    # 연결하는 동안만 등록을 막아 track=False와 같게 만듭니다. (워커는 이때 단일 스레드입니다)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _default_backend_factory(name, options):
+    from inference_backends import create_backend
+
+    return create_backend(name, **options)
+
+
+def _worker_main(index, shm_name, slots, shape, dtype, tasks, results, backend_factory, backend_name,
+                 backend_options):
+    """워커 프로세스: 칸 번호를 받아 공유 메모리의 프레임을 추론하고 작은 결과만 돌려보냅니다."""
+    shm = _attach(shm_name)
+    frames = np.ndarray((slots, *shape), dtype=dtype, buffer=shm.buf)
+    try:
+        backend = backend_factory(backend_name, backend_options)
+    except Exception as e:
+        # 백엔드를 만들 수 없으면(모델 파일 없음 등) 캡처 프로세스에 알리고 종료합니다.
+        results.send((_WORKER_FAILED, index, None, f"{type(e).__name__}: {e}"))
+        del frames
+        shm.close()
+        return
+    results.send((_WORKER_READY, index, None, None))
+    try:
+        while True:
+            task = tasks.get()
+            if task is _STOP:
+                break
+            seq, timestamp_ms, slot = task
+            points = None
+            for result in backend.process(frames[slot], timestamp_ms):
+                if result.landmarks is not None:
+                    points = [(result.landmarks[i].x, result.landmarks[i].y) for i in USED_LANDMARKS]
+            # 추론이 끝난 뒤에 보내므로, 결과를 받은 쪽은 이 칸을 다시 써도 됩니다.
+            results.send((seq, timestamp_ms, slot, points))
+    finally:
+        backend.close()
+        del frames
+        shm.close()
+
+
+class ReorderBuffer:
+    """
+    순서가 뒤섞여 도착한 결과를 순번(seq) 순서대로 내보냅니다.
+    빠진 순번(워커 오류 등)을 max_pending 개 넘게 기다리게 되면 그 순번은 건너뜁니다.
+    결과가 오지 않을 것을 아는 순번(죽은 워커가 맡았던 프레임)은 skip()으로 바로 건너뜁니다.
+    """
+
+    def __init__(self, max_pending=64):
+        self.max_pending = max_pending
+        self.next_seq = 0
+        self.skipped = 0
+        self._heap = []
+        self._missing = set()
+
+    def push(self, seq, item):
+        if seq < self.next_seq:
+            return  # 이미 건너뛴 순번이 늦게 도착한 경우
+        heapq.heappush(self._heap, (seq, item))
+
+    def skip(self, seq):
+        if seq >= self.next_seq:
+            self._missing.add(seq)
+
+    def pop_ready(self):
+        ready = []
+        heap = self._heap
+        while True:
+            if self.next_seq in self._missing:
+                self._missing.discard(self.next_seq)
+                self.skipped += 1
+                self.next_seq += 1
+            elif heap and heap[0][0] == self.next_seq:
+                ready.append(heapq.heappop(heap)[1])
+                self.next_seq += 1
+            elif len(heap) > self.max_pending:
+                self.skipped += heap[0][0] - self.next_seq
+                self.next_seq = heap[0][0]
+                self._missing = {seq for seq in self._missing if seq > self.next_seq}
+            else:
+                break
+        return ready
+
+    def __len__(self):
+        return len(self._heap)
+
+
+def _to_landmarks(points):
+    if points is None:
+        return None
+    return {i: Point(x, y) for i, (x, y) in zip(USED_LANDMARKS, points)}
+
+
+class MultiProcessBackend:
+    """
+    공유 메모리 링 버퍼 + 워커 프로세스 추론 백엔드.
+    - workers: 워커 프로세스 수 (코어 수보다 하나 적게 두는 것을 권장: 캡처/화면 표시용)
+    - slots: 링 버퍼 칸 수 (기본 workers * 2, 칸이 모두 쓰이는 중이면 새 프레임은 건너뜁니다)
+    - backend_name / backend_options: 워커가 만들 추론 백엔드 ("auto", "legacy" 또는 "video")
+    - backend_factory: 워커에서 백엔드를 만드는 함수 (pickle 가능해야 합니다. 테스트용)
+    - start_timeout: 첫 프레임에서 워커들이 백엔드(모델)를 모두 준비할 때까지 기다리는 최대 초
+    - max_restarts: 죽은 워커를 다시 띄우는 최대 횟수 (넘으면 RuntimeError)
+    링 버퍼는 첫 프레임의 크기로 만들어지며, 워커는 spawn 방식으로 시작합니다.
+    첫 프레임은 워커가 모두 준비된 뒤에 넘기므로, 모델을 읽는 동안 앞쪽 프레임이 버려지지 않습니다.
+    """
+
+    name = "multiprocess"
+
+    def __init__(self, workers=2, slots=None, backend_name="auto", backend_options=None,
+                 backend_factory=_default_backend_factory, max_pending=None, start_timeout=60.0, max_restarts=3):
+        if backend_name == "live_stream":
+            raise ValueError("워커에서는 동기 백엔드('legacy' 또는 'video')만 사용할 수 있습니다.")
+        self.workers = workers
+        self.slots = slots or workers * 2
+        self.backend_name = backend_name
+        self.backend_options = backend_options or {}
+        self.backend_factory = backend_factory
+        self.start_timeout = start_timeout
+        self.max_restarts = max_restarts
+        self._max_pending = max_pending or self.slots * 4
+        self.reorder = ReorderBuffer(self._max_pending)
+        self.dropped = 0
+        self.lost = 0  # 워커가 죽어 결과를 받지 못한 프레임 수
+        self.restarts = 0
+        self._ctx = mp.get_context("spawn")
+        self._shm = None
+        self._frames = None
+        self._free = []
+        self._assigned = {}  # 순번 -> (워커 번호, 칸 번호): 결과를 기다리는 프레임
+        self._outstanding = []  # 워커별 맡긴 프레임 수
+        self._ready = set()
+        self._seq = 0
+        self._tasks = []
+        self._conns = []  # 워커별 결과 파이프 (읽는 쪽), 워커가 죽어 닫히면 None
+        self._processes = []
+        self._worker_args = None
+
+    @property
+    def in_flight(self):
+        return len(self._assigned)
+
+    def _start(self, shape, dtype):
+        frame_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=frame_bytes * self.slots)
+        self._frames = np.ndarray((self.slots, *shape), dtype=dtype, buffer=self._shm.buf)
+        self._free = list(range(self.slots))
+        self._worker_args = (self._shm.name, self.slots, shape, np.dtype(dtype).str)
+        self._outstanding = [0] * self.workers
+        self._tasks = [None] * self.workers
+        self._conns = [None] * self.workers
+        self._processes = [None] * self.workers
+        for index in range(self.workers):
+            self._spawn(index)
+        self._wait_ready(time.monotonic() + self.start_timeout)
+
+    def _spawn(self, index):
+        self._tasks[index] = self._ctx.Queue()
+        reader, writer = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(index, *self._worker_args, self._tasks[index], writer,
+                  self.backend_factory, self.backend_name, self.backend_options),
+            daemon=True,
+        )
+        process.start()
+        writer.close()  # 워커만 쓰는 쪽을 갖고 있어야, 워커가 죽었을 때 읽는 쪽에서 EOF를 받습니다.
+        self._conns[index] = reader
+        self._processes[index] = process
+
+    def _wait_ready(self, deadline):
+        """모든 워커가 백엔드를 만들었다고 알려 올 때까지 기다립니다."""
+        while len(self._ready) < self.workers:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.close()
+                raise RuntimeError(f"추론 워커가 {self.start_timeout}초 안에 준비되지 않았습니다.")
+            self._receive(min(remaining, 0.1))
+            for index, conn in enumerate(self._conns):
+                if conn is None and index not in self._ready:
+                    exitcode = self._processes[index].exitcode
+                    self.close()
+                    raise RuntimeError(f"추론 워커가 준비 중에 종료되었습니다. (exitcode={exitcode})")
+
+    def _receive(self, timeout):
+        """결과 파이프에 도착한 메시지를 모두 처리합니다. (첫 메시지는 timeout 초까지 기다립니다)"""
+        for conn in connection.wait([conn for conn in self._conns if conn is not None], timeout):
+            index = self._conns.index(conn)
+            try:
+                while conn.poll():
+                    self._handle(conn.recv())
+            except (EOFError, OSError):
+                # 워커가 죽어 파이프가 닫혔습니다. 남은 정리는 _check_workers가 합니다.
+                conn.close()
+                self._conns[index] = None
+                self._processes[index].join(timeout=1)
+
+    def _handle(self, message):
+        seq, value, slot, points = message
+        if seq == _WORKER_FAILED:
+            self.close()
+            raise RuntimeError(f"추론 워커를 시작할 수 없습니다: {points}")
+        if seq == _WORKER_READY:
+            self._ready.add(value)
+            return
+        assigned = self._assigned.pop(seq, None)
+        if assigned is None:
+            return  # 워커가 죽은 것으로 처리한 뒤 늦게 도착한 결과 (칸은 이미 돌려받았습니다)
+        worker, slot = assigned
+        self._outstanding[worker] -= 1
+        self._free.append(slot)
+        self.reorder.push(seq, LandmarkResult(value, _to_landmarks(points)))
+
+    def _check_workers(self):
+        """죽은 워커가 맡았던 프레임을 건너뛰고 칸을 돌려받은 뒤, 워커를 다시 띄웁니다."""
+        for index, process in enumerate(self._processes):
+            if self._conns[index] is not None and process.is_alive():
+                continue
+            if self._conns[index] is not None:
+                self._conns[index].close()
+            if process.is_alive():  # 파이프가 닫혔는데 남아 있는 워커
+                process.terminate()
+                process.join(timeout=1)
+            # 죽은 워커에게 보낸 작업은 읽히지 않으므로, 종료 시 큐를 비우려고 기다리지 않게 합니다.
+            self._tasks[index].cancel_join_thread()
+            lost = [seq for seq, (worker, _) in self._assigned.items() if worker == index]
+            for seq in lost:
+                _, slot = self._assigned.pop(seq)
+                self._free.append(slot)
+                self.reorder.skip(seq)
+            self.lost += len(lost)
+            self._outstanding[index] = 0
+            self._ready.discard(index)
+            logger.warning("Inference worker %s exited (exitcode=%s); %s frames lost",
+                           process.pid, process.exitcode, len(lost))
+            if self.restarts >= self.max_restarts:
+                self.close()
+                raise RuntimeError(f"추론 워커가 {self.max_restarts}번 넘게 종료되었습니다. (exitcode={process.exitcode})")
+            self.restarts += 1
+            # 새 워커는 준비되었다고 알려 온 뒤부터 프레임을 받습니다. (그동안은 남은 워커가 처리)
+            self._spawn(index)
+
+    def _collect(self, timeout=0.0):
+        """도착한 결과를 받아 칸을 비우고, 순서가 맞춰진 결과를 반환합니다."""
+        self._receive(timeout)
+        self._check_workers()
+        return self.reorder.pop_ready()
+
+    def _pick_worker(self):
+        """준비된 워커 중 맡은 프레임이 가장 적은 워커"""
+        ready = [index for index in self._ready if self._conns[index] is not None]
+        if not ready:
+            return None
+        return min(ready, key=self._outstanding.__getitem__)
+
+    def process(self, rgb, timestamp_ms):
+        """프레임을 빈 칸에 복사해 워커에 넘기고, 그 사이 순서가 맞춰진 결과를 반환합니다."""
+        if self._shm is None:
+            self._start(rgb.shape, rgb.dtype)
+        ready = self._collect()
+        worker = self._pick_worker()
+        if not self._free or worker is None:
+            self.dropped += 1
+            return ready
+        slot = self._free.pop()
+        np.copyto(self._frames[slot], rgb)
+        self._tasks[worker].put((self._seq, timestamp_ms, slot))
+        self._assigned[self._seq] = (worker, slot)
+        self._outstanding[worker] += 1
+        self._seq += 1
+        return ready
+
+    def flush(self, timeout=5.0):
+        """처리 중인 프레임의 결과를 모두 기다렸다가 순서대로 반환합니다."""
+        deadline = time.monotonic() + timeout
+        ready = []
+        while self._assigned and time.monotonic() < deadline:
+            ready += self._collect(timeout=max(0.001, deadline - time.monotonic()))
+        # 기다려도 오지 않은 순번은 건너뛰고 남은 결과를 내보냅니다.
+        self.reorder.max_pending = 0
+        ready += self.reorder.pop_ready()
+        self.reorder.max_pending = self._max_pending
+        return ready
+
+    def worker_pids(self):
+        return [process.pid for process in self._processes]
+
+    def close(self):
+        if self._shm is None:
+            return
+        for tasks, process in zip(self._tasks, self._processes):
+            if process.is_alive():
+                tasks.put(_STOP)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            if conn is not None:
+                conn.close()
+        self._processes = []
+        self._tasks = []
+        self._conns = []
+        self._assigned = {}
+        self._ready = set()
+        self._frames = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
@@ -0,0 +1,165 @@
+import math
+from array import array
+
+
+class RingBuffer:
+    """
+    array('d') 기반의 양방향 링 버퍼.
+    가득 찬 상태에서 append하면 overwrite=True면 가장 오래된 값을 덮어쓰고,
+    overwrite=False면 용량을 두 배로 늘립니다. (앞쪽 값을 잃으면 안 되는 단조 큐용)
+    """
+
+    __slots__ = ("_data", "_capacity", "_head", "_size", "_overwrite")
+
+    def __init__(self, capacity, overwrite=True):
+        self._data = array("d", bytes(8 * capacity))
+        self._capacity = capacity
+        self._head = 0  # 가장 오래된 값의 위치
+        self._size = 0
+        self._overwrite = overwrite
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        """index번째(0 = 가장 오래된 값, -1 = 가장 최근 값) 값을 반환합니다."""
+        if index < 0:
+            index += self._size
+        return self._data[(self._head + index) % self._capacity]
+
+    def append(self, value):
+        if self._size == self._capacity and not self._overwrite:
+            self._grow()
+        if self._size == self._capacity:
+            self._data[self._head] = value
+            self._head = (self._head + 1) % self._capacity
+        else:
+            self._data[(self._head + self._size) % self._capacity] = value
+            self._size += 1
+
+    def popleft(self):
+        value = self._data[self._head]
+        self._head = (self._head + 1) % self._capacity
+        self._size -= 1
+        return value
+
+    def pop(self):
+        self._size -= 1
+        return self._data[(self._head + self._size) % self._capacity]
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    def _grow(self):
+        """값을 오래된 순서로 펼쳐 두 배 크기의 배열로 옮깁니다."""
+        data = array("d", (self[i] for i in range(self._size)))
+        data.extend(array("d", bytes(8 * self._capacity)))
+        self._data = data
+        self._capacity *= 2
+        self._head = 0
+
+
+class _Window:
+    """하나의 윈도우 길이에 대한 상태 (깜빡임 개수, 시선 고정 최댓값 단조 큐)"""
+
+    __slots__ = ("length", "blink_tail", "fix_ends", "fix_durations")
+
+    def __init__(self, length, fixation_capacity):
+        self.length = length
+        self.blink_tail = 0  # 윈도우 안에 있는 가장 오래된 깜빡임의 절대 번호
+        # 시선 고정 시간이 내림차순으로 유지되는 단조 큐 (끝난 시각, 지속 시간)
+        # 맨 앞이 현재 최댓값이므로 덮어쓰지 않고, 시선 변화가 예상보다 잦으면 버퍼를 늘립니다.
+        self.fix_ends = RingBuffer(fixation_capacity, overwrite=False)
+        self.fix_durations = RingBuffer(fixation_capacity, overwrite=False)
+
+
+class SlidingFatigueAnalyzer:
+    """
+    깜빡임 시각과 시선 고정 구간을 고정 크기 링 버퍼에 보관하고,
+    여러 길이의 슬라이딩 윈도우(예: 10초, 1분, 10분)에 대해
+    분당 깜빡임(BPM)과 최대 시선 고정 시간을 언제든 O(1) (분할 상환)으로 계산합니다.
+
+    - 깜빡임: 모든 윈도우가 하나의 타임스탬프 링 버퍼를 공유하고, 윈도우마다 꼬리 위치만 따로 둡니다.
+    - 시선 고정: 윈도우마다 단조 감소 큐(sliding window maximum)를 유지합니다.
+      윈도우 안에서 끝난 고정 구간과 현재 진행 중인 구간 중 가장 긴 값을 반환합니다.
+    """
+
+    def __init__(self, windows=(10, 60, 600), max_blinks_per_second=4, max_gaze_changes_per_second=30, start_time=0.0):
+        self.windows = {length: None for length in windows}
+        longest = max(windows)
+        self._blink_capacity = int(math.ceil(longest * max_blinks_per_second)) + 1
+        self._blinks = RingBuffer(self._blink_capacity)
+        self._blink_total = 0  # 지금까지 기록된 깜빡임 수 (절대 번호)
+        for length in windows:
+            self.windows[length] = _Window(length, int(math.ceil(length * max_gaze_changes_per_second)) + 1)
+        self.reset(start_time)
+
+    def reset(self, now):
+        """모든 기록을 지우고 now부터 다시 측정합니다."""
+        self.start_time = now
+        self.fixation_start = now
+        self._blinks.clear()
+        self._blink_total = 0
+        for window in self.windows.values():
+            window.blink_tail = 0
+            window.fix_ends.clear()
+            window.fix_durations.clear()
+
+    # --- 이벤트 기록 ---
+    def record_blink(self, now):
+        self._blinks.append(now)
+        self._blink_total += 1
+
+    def record_gaze_change(self, now):
+        """시선 방향이 바뀌면 이전 고정 구간을 마감하고 새 구간을 시작합니다."""
+        duration = now - self.fixation_start
+        for window in self.windows.values():
+            ends, durations = window.fix_ends, window.fix_durations
+            while len(durations) and durations[-1] <= duration:
+                ends.pop()
+                durations.pop()
+            ends.append(now)
+            durations.append(duration)
+        self.fixation_start = now
+
+    # --- 조회 ---
+    def _advance(self, window, now):
+        """윈도우 밖으로 밀려난 기록을 꼬리에서 제거합니다."""
+        horizon = now - window.length
+        oldest_kept = self._blink_total - len(self._blinks)
+        if window.blink_tail < oldest_kept:
+            window.blink_tail = oldest_kept
+        blinks = self._blinks
+        while window.blink_tail < self._blink_total and blinks[window.blink_tail - oldest_kept] < horizon:
+            window.blink_tail += 1
+
+        ends, durations = window.fix_ends, window.fix_durations
+        while len(ends) and ends[0] < horizon:
+            ends.popleft()
+            durations.popleft()
+
+    def blink_count(self, length, now):
+        window = self.windows[length]
+        self._advance(window, now)
+        return self._blink_total - window.blink_tail
+
+    def bpm(self, length, now):
+        """윈도우 안의 깜빡임 수를 분당 횟수로 환산합니다. (측정 시간이 윈도우보다 짧으면 경과 시간 기준)"""
+        elapsed = min(length, max(now - self.start_time, 1.0))
+        return self.blink_count(length, now) * 60.0 / elapsed
+
+    def max_fixation(self, length, now):
+        window = self.windows[length]
+        self._advance(window, now)
+        longest = now - self.fixation_start
+        if len(window.fix_durations):
+            longest = max(window.fix_durations[0], longest)
+        return min(longest, length)
+
+    def snapshot(self, now):
+        """모든 윈도우의 BPM과 최대 시선 고정 시간을 반환합니다."""
+        return {
+            length: {"bpm": self.bpm(length, now), "max_stable_gaze_time": self.max_fixation(length, now)}
+            for length in self.windows
+        }
@@ -0,0 +1,132 @@
+"""
+카메라 없이 FatigueStateMachine을 검증하기 위한 합성/녹화 랜드마크 스트림.
+
+- generate_stream(): 깜빡임 시각과 시선 변화 구간을 지정해 랜드마크 프레임을 만듭니다.
+- save_stream() / load_stream(): 실제 카메라에서 녹화한 랜드마크를 JSON Lines로 저장/재생합니다.
+"""
+
+import json
+import random
+
+from fatigue_core import (
+    GAZE_THRESHOLD_LEFT,
+    GAZE_THRESHOLD_RIGHT,
+    LEFT_EYE,
+    LEFT_IRIS_CENTER,
+    RIGHT_EYE,
+    RIGHT_IRIS_CENTER,
+    USED_LANDMARKS,
+    Point,
+)
+
+FRAME_SIZE = 1000  # 합성 프레임의 가로/세로 픽셀 수 (정규화 좌표 -> 픽셀 변환용)
+EYE_WIDTH = 0.06  # 정규화 좌표 기준 눈 가로 길이
+OPEN_EAR = 0.35
+CLOSED_EAR = 0.10
+GAZE_POSITIONS = {
+    "LEFT": GAZE_THRESHOLD_LEFT + 0.3,
+    "CENTER": (GAZE_THRESHOLD_LEFT + GAZE_THRESHOLD_RIGHT) / 2,
+    "RIGHT": GAZE_THRESHOLD_RIGHT - 0.3,
+}
+
+
+def _eye_points(indices, left_x, center_y, ear):
+    """EAR이 ear가 되도록 6개의 눈 랜드마크를 배치합니다. (세로 간격 / 가로 길이 = EAR)"""
+    half_height = ear * EYE_WIDTH / 2
+    p0, p1, p2, p3, p4, p5 = indices
+    return {
+        p0: Point(left_x, center_y),
+        p1: Point(left_x + EYE_WIDTH / 3, center_y - half_height),
+        p2: Point(left_x + 2 * EYE_WIDTH / 3, center_y - half_height),
+        p3: Point(left_x + EYE_WIDTH, center_y),
+        p4: Point(left_x + 2 * EYE_WIDTH / 3, center_y + half_height),
+        p5: Point(left_x + EYE_WIDTH / 3, center_y + half_height),
+    }
+
+
+def make_landmarks(ear, relative_iris_pos):
+    """주어진 EAR과 홍채 상대 위치를 갖는 랜드마크 한 프레임 ({인덱스: Point})"""
+    landmarks = _eye_points(LEFT_EYE, 0.40, 0.45, ear)
+    landmarks.update(_eye_points(RIGHT_EYE, 0.54, 0.45, ear))
+    left_corner = landmarks[LEFT_EYE[0]].x
+    landmarks[LEFT_IRIS_CENTER] = Point(left_corner + relative_iris_pos * EYE_WIDTH, 0.45)
+    landmarks[RIGHT_IRIS_CENTER] = Point(0.54 + EYE_WIDTH / 2, 0.45)
+    return landmarks
+
+
+class StreamTruth:
+    """합성 스트림의 정답 값 (깜빡임 수, 시선 변화 시각)"""
+
+    def __init__(self, blink_times, gaze_changes):
+        self.blink_times = blink_times
+        self.gaze_changes = gaze_changes
+
+    @property
+    def blink_count(self):
+        return len(self.blink_times)
+
+
+def generate_stream(duration, fps=30.0, blink_times=(), gaze_segments=(("CENTER", 0.0),),
+                    blink_frames=5, noise=0.01, seed=0):
+    """
+    (시각, 랜드마크) 프레임 목록과 StreamTruth를 만듭니다.
+    - blink_times: 눈을 감기 시작하는 시각 목록. 각 깜빡임은 blink_frames 프레임 동안 지속됩니다.
+    - gaze_segments: (방향, 시작 시각) 목록. 시각 순서대로 시선 방향이 바뀝니다.
+    - noise: EAR / 홍채 위치에 더하는 균등 잡음 크기 (임계값을 넘지 않는 범위로 사용하세요)
+    """
+    rng = random.Random(seed)
+    frame_count = int(duration * fps)
+    closed = set()
+    for start in blink_times:
+        first = int(round(start * fps))
+        closed.update(range(first, first + blink_frames))
+
+    segments = sorted(gaze_segments, key=lambda segment: segment[1])
+    frames = []
+    segment_index = 0
+    for frame_index in range(frame_count):
+        now = frame_index / fps
+        while segment_index + 1 < len(segments) and segments[segment_index + 1][1] <= now:
+            segment_index += 1
+        direction = segments[segment_index][0]
+        ear = (CLOSED_EAR if frame_index in closed else OPEN_EAR) + rng.uniform(-noise, noise)
+        iris = GAZE_POSITIONS[direction] + rng.uniform(-noise, noise)
+        frames.append((now, make_landmarks(ear, iris)))
+
+    # 상태 머신은 눈을 다시 뜬 프레임에서 깜빡임을 세고, 첫 방향이 CENTER가 아니면 시작하자마자 변화로 봅니다.
+    counted_blinks = [t for t in blink_times if int(round(t * fps)) + blink_frames < frame_count]
+    changes = []
+    previous = "CENTER"
+    for direction, start in segments:
+        if direction != previous:
+            changes.append(max(start, 0.0))
+        previous = direction
+    return frames, StreamTruth(counted_blinks, changes)
+
+
+def save_stream(path, frames):
+    """(시각, 랜드마크) 프레임을 JSON Lines로 저장합니다. 랜드마크는 USED_LANDMARKS만 기록합니다."""
+    with open(path, "w", encoding="utf-8") as f:
+        for now, landmarks in frames:
+            points = [[landmarks[i].x, landmarks[i].y] for i in USED_LANDMARKS]
+            f.write(json.dumps({"t": now, "points": points}) + "\n")
+
+
+def load_stream(path):
+    """save_stream()으로 저장한 파일을 (시각, {인덱스: Point}) 목록으로 읽어옵니다."""
+    frames = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            item = json.loads(line)
+            landmarks = {i: Point(x, y) for i, (x, y) in zip(USED_LANDMARKS, item["points"])}
+            frames.append((item["t"], landmarks))
+    return frames
+
+
+def replay(tracker, frames, w=FRAME_SIZE, h=FRAME_SIZE):
+    """프레임 목록을 상태 머신에 순서대로 넣고, 마지막 시각을 반환합니다."""
+    now = 0.0
+    update = tracker.update
+    for now, landmarks in frames:
+        update(landmarks, w, h, now)
+    return now
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# ai/ 폴더의 모듈(fatigue_core 등)을 스크립트와 같은 방식으로 임포트할 수 있게 합니다.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
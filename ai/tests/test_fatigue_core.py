@@ -0,0 +1,77 @@
+# tests/test_fatigue_core.py
+import pytest
+
+from fatigue_core import FatigueStateMachine, classify_gaze, compute_health_score
+from synthetic_stream import GAZE_POSITIONS, generate_stream, load_stream, make_landmarks, replay, save_stream
+
+
+def test_synthetic_landmarks_hit_requested_values():
+    """합성 랜드마크의 EAR과 시선 분류가 요청한 값과 일치합니다."""
+    tracker = FatigueStateMachine(start_time=0.0)
+    metrics = tracker.update(make_landmarks(0.35, GAZE_POSITIONS["LEFT"]), 1000, 1000, 0.0)
+    assert metrics.ear == pytest.approx(0.35, abs=0.02)
+    assert metrics.gaze_direction == "LEFT"
+    for direction, position in GAZE_POSITIONS.items():
+        assert classify_gaze(position) == direction
+
+
+def test_blinks_are_counted_exactly():
+    """잡음이 있어도 지정한 깜빡임 수만큼 정확히 셉니다."""
+    blink_times = [1.0, 4.5, 9.0, 15.2, 22.0, 30.3, 41.7, 50.0, 58.1]
+    frames, truth = generate_stream(60.0, blink_times=blink_times, noise=0.02, seed=1)
+    tracker = FatigueStateMachine(start_time=0.0)
+    now = replay(tracker, frames)
+    assert tracker.analyzer.blink_count(60, now) == truth.blink_count == len(blink_times)
+    assert tracker.analyzer.blink_count(10, now) == 2
+
+
+def test_short_eye_closures_are_not_blinks():
+    """EAR_CONSEC_FRAMES보다 짧게 감은 경우는 깜빡임으로 세지 않습니다."""
+    frames, _ = generate_stream(10.0, blink_times=[2.0, 5.0], blink_frames=2, seed=2)
+    tracker = FatigueStateMachine(start_time=0.0)
+    now = replay(tracker, frames)
+    assert tracker.analyzer.blink_count(10, now) == 0
+
+
+def test_gaze_shifts_and_max_fixation():
+    """시선 변화 시점으로부터 최대 시선 고정 시간을 계산합니다."""
+    segments = [("CENTER", 0.0), ("LEFT", 10.0), ("RIGHT", 35.0), ("CENTER", 40.0)]
+    frames, truth = generate_stream(50.0, gaze_segments=segments, seed=3)
+    tracker = FatigueStateMachine(start_time=0.0)
+    now = replay(tracker, frames)
+    assert truth.gaze_changes == [10.0, 35.0, 40.0]
+    assert tracker.last_gaze_direction == "CENTER"
+    assert tracker.analyzer.max_fixation(60, now) == pytest.approx(25.0, abs=0.1)
+    assert tracker.analyzer.max_fixation(10, now) == pytest.approx(10.0, abs=0.1)
+
+
+def test_summary_scores_a_minute():
+    """1분 스트림의 요약 점수가 깜빡임/시선 정답으로 계산한 점수와 같습니다."""
+    blink_times = [i * 3.0 + 0.5 for i in range(20)]
+    frames, truth = generate_stream(60.0, blink_times=blink_times, gaze_segments=[("CENTER", 0.0), ("LEFT", 20.0)])
+    tracker = FatigueStateMachine(start_time=0.0)
+    now = replay(tracker, frames)
+    bpm, max_gaze, score, status = tracker.summary(now)
+    assert bpm == truth.blink_count == 20
+    assert max_gaze == pytest.approx(40.0, abs=0.1)
+    assert (score, status) == pytest.approx(compute_health_score(20, max_gaze))
+
+
+@pytest.mark.parametrize("bpm, gaze, expected", [
+    (30, 0.0, "양호함 😊"),
+    (15, 30.0, "주의 필요 😐"),
+    (0, 60.0, "매우 나쁨 😵"),
+])
+def test_health_score_status(bpm, gaze, expected):
+    assert compute_health_score(bpm, gaze)[1] == expected
+
+
+def test_recorded_stream_round_trip(tmp_path):
+    """녹화 파일로 저장했다가 다시 재생해도 같은 결과가 나옵니다."""
+    frames, truth = generate_stream(20.0, blink_times=[3.0, 8.0, 12.0], seed=4)
+    path = tmp_path / "landmarks.jsonl"
+    save_stream(path, frames)
+
+    tracker = FatigueStateMachine(start_time=0.0)
+    now = replay(tracker, load_stream(path))
+    assert tracker.analyzer.blink_count(60, now) == truth.blink_count
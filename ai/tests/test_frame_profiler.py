@@ -0,0 +1,59 @@
+# tests/test_frame_profiler.py
+import json
+
+import pytest
+
+from frame_profiler import FrameProfiler, _noop
+
+
+def test_disabled_profiler_uses_noop():
+    """꺼져 있으면 측정 함수가 빈 함수이고 아무것도 기록하지 않습니다."""
+    profiler = FrameProfiler(enabled=False)
+    assert profiler.begin_frame is _noop and profiler.lap is _noop and profiler.end_frame is _noop
+    profiler.begin_frame()
+    profiler.lap("stage")
+    profiler.end_frame()
+    assert profiler.samples == {}
+    assert len(profiler.trace_events) == 0
+
+
+def test_toggle_switches_measurement():
+    """toggle()로 켜면 단계와 프레임 전체 시간이 기록되고, 다시 끄면 멈춥니다."""
+    profiler = FrameProfiler()
+    assert profiler.toggle() is True
+    profiler.begin_frame()
+    profiler.lap("a")
+    profiler.lap("b")
+    profiler.end_frame()
+    assert list(profiler.samples) == ["a", "b", "frame"]
+    assert profiler.samples["frame"][0] >= profiler.samples["a"][0] + profiler.samples["b"][0]
+
+    assert profiler.toggle() is False
+    profiler.lap("a")
+    assert len(profiler.samples["a"]) == 1
+
+
+def test_percentiles_over_window():
+    """최근 window 개 값만으로 백분위수(ms)를 계산합니다."""
+    profiler = FrameProfiler(enabled=True, window=100)
+    for ms in range(1, 201):  # 앞의 100개는 window 밖으로 밀려납니다.
+        profiler._record("stage", 0, ms * 1_000_000)
+    assert profiler.percentiles("stage") == pytest.approx((151.0, 196.0, 200.0))
+    assert profiler.percentiles("missing") == (0.0, 0.0, 0.0)
+    assert profiler.summary_lines()[0].startswith("stage")
+
+
+def test_dump_trace_writes_chrome_events(tmp_path):
+    """기록된 구간을 Chrome trace event(JSON)로 저장합니다."""
+    profiler = FrameProfiler(enabled=True, trace_capacity=2)
+    origin = profiler._origin
+    for i in range(3):  # trace_capacity를 넘으면 오래된 구간부터 버립니다.
+        profiler._record(f"s{i}", origin + i * 1000, 500)
+
+    path = tmp_path / "trace.json"
+    assert profiler.dump_trace(path) == 2
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    assert [(e["name"], e["ph"], e["ts"], e["dur"]) for e in trace["traceEvents"]] == [
+        ("s1", "X", 1.0, 0.5),
+        ("s2", "X", 2.0, 0.5),
+    ]
@@ -0,0 +1,59 @@
+# tests/test_inference_backends.py
+from types import SimpleNamespace
+
+import pytest
+
+import inference_backends
+from inference_backends import create_backend, resolve_backend_name
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="알 수 없는 추론 백엔드"):
+        create_backend("does-not-exist")
+
+
+@pytest.mark.parametrize("has_solutions, expected", [(True, "legacy"), (False, "video")])
+def test_auto_picks_backend_for_installed_mediapipe(monkeypatch, has_solutions, expected):
+    """"auto"는 mp.solutions가 있으면 FaceMesh, 없으면 FaceLandmarker(video)를 고릅니다."""
+    fake_mp = SimpleNamespace(solutions=object()) if has_solutions else SimpleNamespace()
+    monkeypatch.setattr(inference_backends, "mp", fake_mp)
+    assert resolve_backend_name("auto") == expected
+    assert resolve_backend_name("live_stream") == "live_stream"
+
+
+def test_auto_without_mediapipe_fails_clearly(monkeypatch):
+    monkeypatch.setattr(inference_backends, "mp", None)
+    with pytest.raises(RuntimeError, match="mediapipe"):
+        create_backend("auto")
+
+
+def test_multiprocess_resolves_worker_backend(monkeypatch):
+    """multiprocess는 워커 백엔드 이름을 미리 정하고, 워커는 첫 프레임 전까지 시작하지 않습니다."""
+    monkeypatch.setattr(inference_backends, "mp", SimpleNamespace())
+    backend = create_backend("multiprocess", workers=2, worker_backend="auto", num_threads=1)
+    try:
+        assert backend.backend_name == "video"
+        assert backend.backend_options["num_threads"] == 1
+        assert backend.worker_pids() == []
+    finally:
+        backend.close()
+
+
+def test_multiprocess_rejects_async_worker_backend():
+    with pytest.raises(ValueError):
+        create_backend("multiprocess", worker_backend="live_stream")
+
+
+def test_legacy_without_solutions_fails_clearly():
+    """설치된 MediaPipe에 mp.solutions가 없으면 다른 백엔드를 쓰라고 알립니다."""
+    mp = pytest.importorskip("mediapipe")
+    if hasattr(mp, "solutions"):
+        pytest.skip("이 MediaPipe에는 FaceMesh가 있습니다.")
+    with pytest.raises(RuntimeError, match="video"):
+        create_backend("legacy")
+
+
+def test_face_landmarker_requires_model_file(tmp_path):
+    pytest.importorskip("mediapipe.tasks.python")
+    with pytest.raises(FileNotFoundError, match="모델 파일"):
+        create_backend("video", model_path=str(tmp_path / "missing.task"))
@@ -0,0 +1,177 @@
+# tests/test_mp_inference.py
+import os
+import random
+import signal
+import time
+
+import numpy as np
+
+from fatigue_core import LEFT_EYE, LEFT_IRIS_CENTER, FatigueStateMachine, LandmarkResult, eye_aspect_ratio
+from mp_inference import MultiProcessBackend, ReorderBuffer
+from synthetic_stream import FRAME_SIZE, generate_stream, make_landmarks
+
+EAR_SCALE = 255.0
+IRIS_SCALE = 255.0 / 4.0
+
+
+class PixelBackend:
+    """프레임 픽셀에 적힌 (EAR, 홍채 위치)로 랜드마크를 만드는 가짜 백엔드. 처리 시간을 무작위로 늘려 순서를 뒤섞습니다."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def process(self, rgb, timestamp_ms):
+        time.sleep(self.rng.uniform(0, 0.004))
+        ear = rgb[0, 0, 0] / EAR_SCALE
+        iris = rgb[0, 0, 1] / IRIS_SCALE
+        return [LandmarkResult(timestamp_ms, make_landmarks(ear, iris))]
+
+    def close(self):
+        pass
+
+
+def pixel_backend_factory(name, options):
+    return PixelBackend(seed=options["seed"])
+
+
+class SlowBackend:
+    """프레임마다 delay 초씩 걸리는 가짜 백엔드. 랜드마크 없이 시각만 돌려줍니다."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def process(self, rgb, timestamp_ms):
+        time.sleep(self.delay)
+        return [LandmarkResult(timestamp_ms, None)]
+
+    def close(self):
+        pass
+
+
+def slow_backend_factory(name, options):
+    return SlowBackend(options["delay"])
+
+
+def _encode(landmarks):
+    """합성 랜드마크의 EAR / 홍채 위치를 4x4 프레임 픽셀에 기록합니다."""
+    eye = [(landmarks[i].x, landmarks[i].y) for i in LEFT_EYE]
+    relative = (landmarks[LEFT_IRIS_CENTER].x - eye[0][0]) / (eye[3][0] - eye[0][0])
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    frame[..., 0] = round(eye_aspect_ratio(eye) * EAR_SCALE)
+    frame[..., 1] = round(relative * IRIS_SCALE)
+    return frame
+
+
+def test_reorder_buffer_restores_order_and_skips_gaps():
+    buffer = ReorderBuffer(max_pending=2)
+    for seq in (2, 0, 1):
+        buffer.push(seq, seq)
+    assert buffer.pop_ready() == [0, 1, 2]
+
+    for seq in (4, 5, 6):  # 3번이 오지 않음
+        buffer.push(seq, seq)
+    assert buffer.pop_ready() == [4, 5, 6]
+    assert buffer.skipped == 1
+    buffer.push(3, 3)  # 늦게 도착한 순번은 버립니다.
+    assert buffer.pop_ready() == [] and len(buffer) == 0
+
+    buffer.skip(8)  # 결과가 오지 않을 순번은 기다리지 않습니다.
+    for seq in (7, 9):
+        buffer.push(seq, seq)
+    assert buffer.pop_ready() == [7, 9]
+    assert buffer.skipped == 2
+
+
+def test_multiprocess_results_feed_state_machine_in_order():
+    """여러 워커가 뒤섞인 순서로 끝내도, 상태 머신은 프레임 순서대로 받아 깜빡임/시선 변화를 정확히 셉니다."""
+    blink_times = [1.0, 3.0, 5.5, 8.0]
+    segments = [("CENTER", 0.0), ("LEFT", 2.0), ("CENTER", 4.0), ("RIGHT", 7.0)]
+    frames, truth = generate_stream(10.0, blink_times=blink_times, gaze_segments=segments, noise=0.0)
+
+    backend = MultiProcessBackend(
+        workers=3, slots=len(frames), backend_factory=pixel_backend_factory, backend_options={"seed": 7}
+    )
+    tracker = FatigueStateMachine(start_time=0.0)
+    timestamps = []
+    try:
+        results = []
+        for now, landmarks in frames:
+            results += backend.process(_encode(landmarks), int(now * 1000))
+        results += backend.flush(timeout=30)
+    finally:
+        backend.close()
+
+    assert backend.dropped == 0
+    changes = []
+    for result in results:
+        timestamps.append(result.timestamp_ms)
+        previous = tracker.last_gaze_direction
+        metrics = tracker.update(result.landmarks, FRAME_SIZE, FRAME_SIZE, result.timestamp_ms / 1000)
+        if metrics.gaze_direction != previous:
+            changes.append(result.timestamp_ms / 1000)
+    assert timestamps == sorted(timestamps) and len(timestamps) == len(frames)
+    assert tracker.analyzer.blink_count(60, 10.0) == truth.blink_count
+    assert changes == truth.gaze_changes
+
+
+def _frame(value):
+    return np.full((4, 4, 3), value, dtype=np.uint8)
+
+
+def test_few_slots_reuse_and_drop_frames_in_order():
+    """칸이 워커 수보다 조금 많을 때: 칸을 돌려 쓰고, 빈 칸이 없으면 건너뛰며, 첫 프레임은 버리지 않습니다."""
+    backend = MultiProcessBackend(
+        workers=2, slots=3, backend_factory=slow_backend_factory, backend_options={"delay": 0.02}
+    )
+    results = []
+    try:
+        for i in range(60):
+            results += backend.process(_frame(i), i * 5)
+            time.sleep(0.005)
+        results += backend.flush(timeout=10)
+        free = sorted(backend._free)
+    finally:
+        backend.close()
+
+    timestamps = [result.timestamp_ms for result in results]
+    assert timestamps[0] == 0  # 워커가 준비된 뒤 첫 프레임을 넘깁니다.
+    assert timestamps == sorted(timestamps)
+    assert backend.dropped > 0
+    assert len(timestamps) + backend.dropped == 60  # 칸을 돌려 써서 3칸보다 많은 프레임을 처리합니다.
+    assert free == [0, 1, 2] and backend.in_flight == 0
+
+
+def test_killed_worker_is_respawned_and_slots_released():
+    """워커가 죽어도 맡은 프레임만 건너뛰고 칸을 돌려받으며, 다시 띄운 워커로 계속 처리합니다."""
+    backend = MultiProcessBackend(
+        workers=2, slots=4, backend_factory=slow_backend_factory, backend_options={"delay": 0.05}
+    )
+    results = []
+    try:
+        for i in range(4):
+            results += backend.process(_frame(i), i * 10)
+        victim = backend.worker_pids()[0]
+        os.kill(victim, signal.SIGKILL)
+        started = time.monotonic()
+        results += backend.flush(timeout=30)
+        elapsed = time.monotonic() - started
+        assert elapsed < 5  # timeout까지 기다리지 않습니다.
+        assert backend.restarts == 1 and victim not in backend.worker_pids()
+        assert sorted(backend._free) == [0, 1, 2, 3] and backend.in_flight == 0
+
+        deadline = time.monotonic() + 30
+        while len(backend._ready) < 2 and time.monotonic() < deadline:
+            results += backend.process(_frame(0), 1000 + len(results))
+            time.sleep(0.05)
+        before = len(results)
+        for i in range(4):
+            results += backend.process(_frame(i), 5000 + i * 10)
+            time.sleep(0.06)
+        results += backend.flush(timeout=10)
+    finally:
+        backend.close()
+
+    timestamps = [result.timestamp_ms for result in results]
+    assert timestamps == sorted(timestamps)
+    assert backend.lost > 0
+    assert [t for t in timestamps[before:] if t >= 5000] == [5000, 5010, 5020, 5030]
@@ -0,0 +1,68 @@
+# tests/test_sliding_window.py
+import random
+
+import pytest
+
+from sliding_window import RingBuffer, SlidingFatigueAnalyzer
+
+
+def _brute_force(blinks, fixations, fixation_start, length, now):
+    """전체 기록을 매번 훑어서 윈도우 값을 계산합니다. (비교 기준)"""
+    horizon = now - length
+    count = sum(1 for t in blinks if t >= horizon)
+    longest = max([d for end, d in fixations if end >= horizon] + [now - fixation_start])
+    return count, min(longest, length)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_windows_match_brute_force(seed):
+    """임의의 깜빡임·시선 변화 순서에서도 단조 큐 결과가 전수 계산과 같습니다."""
+    rng = random.Random(seed)
+    windows = (2, 5, 30)
+    # 용량을 일부러 작게 잡아, 시선 변화가 몰릴 때 단조 큐가 늘어나는 경로도 확인합니다.
+    analyzer = SlidingFatigueAnalyzer(windows, max_gaze_changes_per_second=1, start_time=0.0)
+    blinks, fixations = [], []
+    fixation_start = now = 0.0
+
+    for _ in range(3000):
+        now += rng.choice((0.0, 0.01, 0.05, 0.3, 1.0, rng.uniform(0, 4)))
+        event = rng.random()
+        if event < 0.1:
+            analyzer.record_blink(now)
+            blinks.append(now)
+        elif event < 0.5:
+            analyzer.record_gaze_change(now)
+            fixations.append((now, now - fixation_start))
+            fixation_start = now
+        for length in windows:
+            expected_count, expected_fixation = _brute_force(blinks, fixations, fixation_start, length, now)
+            assert analyzer.blink_count(length, now) == expected_count
+            assert analyzer.max_fixation(length, now) == pytest.approx(expected_fixation)
+
+
+def test_monotonic_queue_keeps_max_when_full():
+    """줄어드는 고정 시간이 용량보다 많이 쌓여도 맨 앞의 최댓값을 잃지 않습니다."""
+    analyzer = SlidingFatigueAnalyzer((10,), max_gaze_changes_per_second=0.2, start_time=0.0)
+    now, step = 0.0, 4.0
+    for _ in range(8):  # 4, 2, 1, 0.5, ... 초씩 고정 (용량 3칸)
+        now += step
+        analyzer.record_gaze_change(now)
+        step /= 2
+    assert analyzer.max_fixation(10, now) == 4.0
+
+
+def test_ring_buffer_overwrite_and_grow():
+    """overwrite 버퍼는 가장 오래된 값을 덮어쓰고, 그렇지 않으면 순서를 유지한 채 늘어납니다."""
+    ring = RingBuffer(3)
+    for value in range(5):
+        ring.append(value)
+    assert [ring[i] for i in range(len(ring))] == [2.0, 3.0, 4.0]
+
+    growing = RingBuffer(3, overwrite=False)
+    for value in range(3):
+        growing.append(value)
+    growing.popleft()
+    for value in range(3, 7):
+        growing.append(value)
+    assert [growing[i] for i in range(len(growing))] == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    assert growing.pop() == 6.0 and growing.popleft() == 1.0
@@ -0,0 +1,23 @@
+# tests/test_upload_codec.py
+import gzip
+
+import msgpack
+
+from upload_codec import encode_payload
+
+RECORD = {"bpm": 12, "max_stable_gaze_time": 4.5, "health_score": 72.0, "status": "양호함 😊"}
+
+
+def test_small_body_is_sent_uncompressed():
+    """기록 한 건은 압축하면 오히려 커지므로 그대로 보냅니다."""
+    body, headers = encode_payload(RECORD, "msgpack", "gzip")
+    assert "Content-Encoding" not in headers
+    assert msgpack.unpackb(body) == RECORD
+
+
+def test_large_body_is_compressed():
+    records = [RECORD] * 100
+    body, headers = encode_payload(records, "msgpack", "gzip")
+    assert headers["Content-Encoding"] == "gzip"
+    assert len(body) < len(msgpack.packb(records))
+    assert msgpack.unpackb(gzip.decompress(body)) == records
@@ -0,0 +1,51 @@
+"""
+분석 결과를 서버로 보낼 때의 본문 인코딩(JSON / MessagePack)과 압축(gzip / zstd).
+
+서버의 /api/eye-fatigue 라우트는 Content-Type과 Content-Encoding 헤더를 보고 본문을 해석합니다.
+msgpack, zstandard 패키지가 설치되어 있지 않으면 JSON / gzip으로 대신 보냅니다.
+"""
+
+import gzip
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+JSON_CONTENT_TYPE = "application/json"
+# 이보다 작은 본문은 압축하지 않습니다. (기록 한 건 ~100바이트는 gzip 헤더 때문에 오히려 커집니다)
+COMPRESS_MIN_BYTES = 1024
+
+
+def encode_payload(data, fmt="msgpack", compression="gzip", min_size=COMPRESS_MIN_BYTES):
+    """
+    data(dict 또는 dict 목록)를 (본문 bytes, 헤더 dict)로 인코딩합니다.
+    - fmt: "msgpack" 또는 "json"
+    - compression: "zstd", "gzip" 또는 None
+    - min_size: 인코딩한 본문이 이보다 작으면 압축하지 않습니다.
+    """
+    if fmt == "msgpack" and msgpack is not None:
+        body = msgpack.packb(data, datetime=True)
+        headers = {"Content-Type": MSGPACK_CONTENT_TYPE}
+    else:
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        headers = {"Content-Type": JSON_CONTENT_TYPE}
+
+    if len(body) < min_size:
+        compression = None
+    if compression == "zstd" and zstandard is None:
+        compression = "gzip"
+    if compression == "zstd":
+        body = zstandard.ZstdCompressor().compress(body)
+        headers["Content-Encoding"] = "zstd"
+    elif compression == "gzip":
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
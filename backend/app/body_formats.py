@@ -0,0 +1,180 @@
+# app/body_formats.py
+"""
+진단 기록 업로드 요청 본문의 형식/압축 협상(content negotiation).
+
+- Content-Type: application/json (기본) 또는 application/msgpack (application/x-msgpack)
+- Content-Encoding: identity (기본), gzip, zstd
+
+FastAPI 문서의 "Custom Request and APIRoute class" 방식으로, 라우터의 route_class에
+CompactRoute를 지정하면 엔드포인트 코드는 그대로 둔 채 압축 해제와 MessagePack 해석을 처리합니다.
+"""
+
+import zlib
+from email.message import Message
+from typing import Callable
+
+import msgpack
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+from .config import settings
+
+try:
+    import zstandard
+except ImportError:  # zstd는 선택 사항: 설치되어 있지 않으면 415로 거절합니다.
+    zstandard = None
+
+MSGPACK_MEDIA_TYPES = {"application/msgpack", "application/x-msgpack", "application/vnd.msgpack"}
+BODY_FORMAT_SCOPE_KEY = "onnoon.body_format"
+
+
+def _media_type(content_type: str) -> str:
+    message = Message()
+    message["content-type"] = content_type
+    return message.get_content_type()
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail="요청 본문이 너무 큽니다.",
+    )
+
+
+def _corrupt() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="압축된 요청 본문이 손상되었거나 잘렸습니다.",
+    )
+
+
+# zstd 블록은 풀었을 때 최대 128KiB이고, 블록 하나에 입력이 적어도 3바이트 필요합니다.
+_ZSTD_MAX_BLOCK = 128 * 1024
+_ZSTD_MIN_BLOCK_INPUT = 3
+_DECOMPRESS_ERRORS = (zlib.error, zstandard.ZstdError) if zstandard is not None else (zlib.error,)
+
+
+class BodyDecoder:
+    """
+    Content-Encoding에 맞춰 본문을 조각(chunk)마다 풀고, 압축 폭탄을 막기 위해 limit 바이트까지만 허용합니다.
+    압축하지 않은 본문에도 같은 크기 제한을 적용하고, 잘리거나 손상된 압축 본문은 400으로 거절합니다.
+    """
+
+    def __init__(self, encoding: str, limit: int):
+        encoding = encoding.strip().lower()
+        if encoding in ("", "identity"):
+            self._decompressor = None
+        elif encoding == "gzip":
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "zstd" and zstandard is not None:
+            self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"지원하지 않는 Content-Encoding 입니다: {encoding}",
+            )
+        self.encoding = encoding
+        self.limit = limit
+        self.size = 0
+
+    def _count(self, data: bytes) -> bytes:
+        self.size += len(data)
+        if self.size > self.limit:
+            raise _too_large()
+        return data
+
+    def feed(self, chunk: bytes) -> bytes:
+        """받은 조각을 풀어 반환합니다."""
+        decompressor = self._decompressor
+        if decompressor is None:
+            return self._count(chunk)
+        if chunk and decompressor.eof:
+            raise _corrupt()  # 압축 스트림 뒤에 붙은 데이터
+        try:
+            if self.encoding == "gzip":
+                # 남은 허용량 + 1 바이트까지만 풀어, 넘치면 바로 거절합니다.
+                return self._count(decompressor.decompress(chunk, self.limit - self.size + 1))
+            return self._feed_zstd(chunk)
+        except _DECOMPRESS_ERRORS:
+            raise _corrupt() from None
+
+    def _feed_zstd(self, chunk: bytes) -> bytes:
+        """
+        zstd decompressobj는 출력 크기를 제한할 수 없으므로, 한 번에 넣는 입력을 남은 허용량에 맞춰 잘라
+        한 번 호출의 출력이 허용량을 크게 넘지 않게 합니다. (한 번만 풀면서 크기를 셉니다)
+        """
+        parts = []
+        view = memoryview(chunk)
+        while view:
+            step = max(_ZSTD_MIN_BLOCK_INPUT, _ZSTD_MIN_BLOCK_INPUT * (self.limit - self.size) // _ZSTD_MAX_BLOCK)
+            parts.append(self._count(self._decompressor.decompress(view[:step])))
+            view = view[step:]
+        return b"".join(parts)
+
+    def finish(self) -> None:
+        """압축 스트림이 끝까지 왔는지(잘린 본문이 아닌지), 뒤에 남은 데이터가 없는지 확인합니다."""
+        decompressor = self._decompressor
+        if decompressor is not None and (not decompressor.eof or decompressor.unused_data):
+            raise _corrupt()
+
+
+def decompress(body: bytes, encoding: str, limit: int) -> bytes:
+    """이미 받은 본문 전체를 BodyDecoder로 풉니다."""
+    decoder = BodyDecoder(encoding, limit)
+    data = decoder.feed(body)
+    decoder.finish()
+    return data
+
+
+def _content_length(headers) -> int | None:
+    value = headers.get("content-length", "")
+    return int(value) if value.isdigit() else None
+
+
+class CompactRequest(Request):
+    """압축된 본문과 MessagePack 본문을 JSON 본문처럼 읽을 수 있게 하는 Request"""
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            # 본문 전체를 메모리에 올리기 전에, 받는 만큼 풀면서 원본/압축 해제 크기를 모두 제한합니다.
+            limit = settings.max_decompressed_body_bytes
+            length = _content_length(self.headers)
+            if length is not None and length > limit:
+                raise _too_large()
+            decoder = BodyDecoder(self.headers.get("content-encoding", ""), limit)
+            parts = []
+            received = 0
+            async for chunk in self.stream():
+                received += len(chunk)
+                if received > limit:
+                    raise _too_large()
+                parts.append(decoder.feed(chunk))
+            decoder.finish()
+            self._body = b"".join(parts)
+        return self._body
+
+    async def json(self):
+        if self.scope.get(BODY_FORMAT_SCOPE_KEY) == "msgpack":
+            if not hasattr(self, "_json"):
+                # timestamp=3: MessagePack Timestamp 확장 타입을 datetime(UTC)으로 변환
+                self._json = msgpack.unpackb(await self.body(), timestamp=3)
+            return self._json
+        return await super().json()
+
+
+class CompactRoute(APIRoute):
+    """요청 본문 형식/압축을 협상하는 라우트 클래스 (APIRouter(route_class=CompactRoute))"""
+
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def custom_route_handler(request: Request) -> Response:
+            scope = request.scope
+            if _media_type(request.headers.get("content-type", "")) in MSGPACK_MEDIA_TYPES:
+                # FastAPI는 JSON 본문일 때만 request.json()을 호출하므로, 본문 형식은 scope에 따로 기록합니다.
+                headers = [(k, v) for k, v in scope["headers"] if k != b"content-type"]
+                headers.append((b"content-type", b"application/json"))
+                scope = {**scope, "headers": headers, BODY_FORMAT_SCOPE_KEY: "msgpack"}
+            return await original_route_handler(CompactRequest(scope, request.receive))
+
+        return custom_route_handler
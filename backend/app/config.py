@@ -8,8 +8,79 @@ class Settings(BaseSettings):
     secret_key: str
     algorithm: str
 
+    # --- 내보내기(export) 설정 ---
+    # 전체 사용자 데이터를 내보낼 수 있는 관리자 이메일 목록 (쉼표로 구분)
+    admin_emails: str = ""
+    # 서버 측 커서에서 한 번에 가져올 행 수
+    export_chunk_size: int = 1000
+
+    # --- 파티션 / 보존 기간 설정 ---
+    # 원본 기록을 보관할 개월 수 (이보다 오래된 기록은 일 단위 요약으로 대체)
+    record_retention_months: int = 12
+    # 미리 만들어 둘 미래 월 파티션 수 (Postgres 전용)
+    partition_premake_months: int = 2
+    # 최근 결과 조회 시 우선 확인할 개월 수
+    hot_query_months: int = 1
+
+    # --- 로깅 설정 ---
+    log_level: str = "INFO"
+    # True이면 JSON 한 줄 로그, False이면 사람이 읽기 쉬운 텍스트 로그
+    log_json: bool = True
+    # 로거 이름별 INFO 이하 로그 샘플링 비율 (예: {"app.main": 0.1})
+    log_sample_rates: dict[str, float] = {}
+    # 같은 메시지 템플릿의 초당 최대 로그 수 (0이면 제한 없음)
+    log_rate_limit_per_second: float = 0.0
+    log_rate_limit_burst: int = 20
+
+    # --- 피로도 점수 백분위 스케치 설정 ---
+    # 0~100 점수 구간을 나누는 칸 수 (1000이면 0.1점 단위)
+    sketch_bins: int = 1000
+    # 이만큼 새 점수가 쌓이거나 sketch_flush_seconds가 지나면 DB에 저장
+    sketch_flush_every: int = 100
+    sketch_flush_seconds: float = 30.0
+    # 일별 스케치("day:YYYY-MM-DD") 행을 DB에 남겨 두는 일수 (보존 작업에서 정리)
+    sketch_day_retention_days: int = 35
+
+    # --- 업로드 본문 설정 ---
+    # 요청 본문의 최대 크기 (바이트, gzip/zstd 본문은 풀었을 때 기준)
+    max_decompressed_body_bytes: int = 10 * 1024 * 1024
+
+    # --- 읽기 복제본 설정 ---
+    # 조회 요청에 사용할 읽기 전용 DB 주소 (없으면 database_url 사용)
+    database_read_url: str | None = None
+    # 사용자가 기록을 쓴 뒤 이 시간(초) 동안은 그 사용자의 조회를 기본 DB에서 처리
+    read_your_writes_seconds: float = 5.0
+    # 여러 워커가 "최근에 쓴 사용자" 표시를 공유할 Redis 주소 (없으면 워커 프로세스 안에서만 기억)
+    read_your_writes_redis_url: str | None = None
+    # 복제본 연결 실패 후 기본 DB만 사용할 시간 (초)
+    replica_retry_seconds: float = 30.0
+
+    # --- 요청 속도 제한 / 과부하 차단 설정 ---
+    rate_limit_enabled: bool = True
+    # 사용자(토큰)별: 초당 요청 수와 한 번에 허용하는 최대 요청 수(burst)
+    rate_limit_user_per_second: float = 5.0
+    rate_limit_user_burst: int = 30
+    # IP별 (여러 사용자가 같은 IP를 쓸 수 있으므로 사용자별보다 넉넉하게)
+    rate_limit_ip_per_second: float = 20.0
+    rate_limit_ip_burst: int = 100
+    # 로그인/회원가입 IP별 (비밀번호 대입 방지)
+    rate_limit_auth_per_second: float = 0.2
+    rate_limit_auth_burst: int = 10
+    # 여러 워커가 버킷을 공유할 Redis 주소 (없으면 워커별 메모리)
+    rate_limit_redis_url: str | None = None
+    # 프록시(Render 등) 뒤에서 X-Forwarded-For 헤더의 클라이언트 IP를 신뢰할지 여부
+    trust_forwarded_for: bool = False
+    # 워커당 동시에 처리할 최대 요청 수 (넘으면 503, 0이면 제한 없음)
+    max_concurrent_requests: int = 50
+    shed_retry_after_seconds: float = 1.0
+
     class Config:
         env_file = ".env"
 
+    @property
+    def admin_email_set(self) -> set[str]:
+        """admin_emails 문자열을 이메일 집합으로 변환합니다."""
+        return {email.strip().lower() for email in self.admin_emails.split(",") if email.strip()}
+
 # 👇 이 부분이 settings 변수를 실제로 만드는 가장 중요한 코드입니다.
-settings = Settings()
\ No newline at end of file
+settings = Settings()
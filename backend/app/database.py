@@ -1,20 +1,214 @@
 # app/database.py
 
+import logging
+import threading
+import time
+
+from fastapi import Request
+from jose import JWTError, jwt
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from .config import settings # 👈 이 줄을 맨 위에 추가
 
+logger = logging.getLogger(__name__)
+
 SQLALCHEMY_DATABASE_URL = settings.database_url # 👈 이렇게 수정
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# --- 읽기 전용 복제본(replica) ---
+class ReplicaSession(Session):
+    """
+    복제본용 세션. 조회 중에 복제본 연결이 끊기거나 복제본이 조회를 취소하면(OperationalError 등)
+    복제본을 잠시 쓰지 않도록 표시하고, 같은 조회를 기본 DB에서 다시 실행합니다. (조회 전용이므로 안전)
+    ReadRouter.session()이 info["read_router"]를 채운 세션에서만 동작합니다.
+    """
+
+    def _with_fallback(self, run, *args, **kwargs):
+        try:
+            return run(*args, **kwargs)
+        except DBAPIError as error:
+            router = self.info.get("read_router")
+            if router is None or self.info.get("on_primary") or not _is_replica_failure(error):
+                raise
+            self.rollback()
+            router.mark_unhealthy(error)
+            self.bind = router.primary_factory.kw["bind"]
+            self.info["on_primary"] = True
+            return run(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self._with_fallback(super().execute, *args, **kwargs)
+
+    def scalars(self, *args, **kwargs):
+        return self._with_fallback(super().scalars, *args, **kwargs)
+
+    def scalar(self, *args, **kwargs):
+        return self._with_fallback(super().scalar, *args, **kwargs)
+
+
+def _is_replica_failure(error: DBAPIError) -> bool:
+    return error.connection_invalidated or isinstance(error, (OperationalError, InterfaceError))
+
+
+# DATABASE_READ_URL이 없으면 조회도 기본(primary) DB를 사용합니다.
+# pool_pre_ping: 복제본이 재시작된 뒤 끊어진 연결을 꺼내 쓰지 않도록 확인합니다.
+read_engine = create_engine(settings.database_read_url, pool_pre_ping=True) if settings.database_read_url else None
+ReadSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=read_engine, class_=ReplicaSession)
+    if read_engine is not None else None
+)
+
+
+class MemoryWriteMarks:
+    """최근에 쓴 사용자를 워커 프로세스 메모리에 기억합니다. (워커가 하나일 때 / 테스트용)"""
+
+    def __init__(self, clock=time.monotonic, max_keys: int = 10000):
+        self.clock = clock
+        self.max_keys = max_keys
+        self._until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, subject: str, seconds: float) -> None:
+        now = self.clock()
+        with self._lock:
+            self._until[subject] = now + seconds
+            if len(self._until) > self.max_keys:
+                self._until = {k: until for k, until in self._until.items() if until > now}
+
+    def recent(self, subject: str) -> bool:
+        until = self._until.get(subject)
+        return until is not None and self.clock() < until
+
+
+class RedisWriteMarks:
+    """
+    여러 워커가 공유하는 Redis에 만료 시간이 있는 키로 기억합니다. (어느 워커가 조회를 받아도 같은 결과)
+    Redis에 접근할 수 없으면 쓰기는 워커 메모리에 기억하고, 조회는 안전하게 기본 DB로 보냅니다.
+    """
+
+    def __init__(self, url: str, prefix: str = "ryw:", fallback: MemoryWriteMarks | None = None):
+        import redis  # 선택 의존성: Redis 저장소를 쓸 때만 필요합니다.
+
+        self.prefix = prefix
+        self.fallback = fallback or MemoryWriteMarks()
+        self._client = redis.from_url(url)
+        self._error_logged_at = 0.0
+
+    def _log_error(self) -> None:
+        now = time.monotonic()
+        if now - self._error_logged_at > 60:
+            logger.exception("Read-your-writes store unavailable; reading from primary")
+            self._error_logged_at = now
+
+    def mark(self, subject: str, seconds: float) -> None:
+        try:
+            self._client.set(self.prefix + subject, 1, px=max(1, int(seconds * 1000)))
+        except Exception:
+            self._log_error()
+            self.fallback.mark(subject, seconds)
+
+    def recent(self, subject: str) -> bool:
+        try:
+            return bool(self._client.exists(self.prefix + subject))
+        except Exception:
+            self._log_error()
+            return True
+
+
+class ReadRouter:
+    """
+    조회 요청을 복제본과 기본 DB 중 어디로 보낼지 정합니다.
+    - read-your-writes: 사용자가 방금 쓴 직후(read_your_writes_seconds 동안)에는 기본 DB에서 읽습니다.
+      (복제 지연 때문에 방금 저장한 기록이 안 보이는 일을 막습니다.)
+      marks 저장소에 기억하며, 워커가 여러 개면 read_your_writes_redis_url로 공유합니다.
+    - 장애 대응: 복제본 연결에 실패하면 replica_retry_seconds 동안 기본 DB만 사용합니다.
+      조회 도중에 실패해도 ReplicaSession이 기본 DB로 다시 실행합니다.
+    """
+
+    def __init__(self, read_factory: sessionmaker | None, primary_factory: sessionmaker = SessionLocal,
+                 clock=time.monotonic, marks=None):
+        self.read_factory = read_factory
+        self.primary_factory = primary_factory
+        self.clock = clock
+        self.marks = marks or MemoryWriteMarks(clock)
+        self._down_until = 0.0
+
+    def mark_write(self, subject: str) -> None:
+        """subject(토큰의 sub = 이메일) 사용자가 방금 기본 DB에 썼음을 기록합니다."""
+        self.marks.mark(subject, settings.read_your_writes_seconds)
+
+    def recently_wrote(self, subject: str | None) -> bool:
+        return subject is not None and self.marks.recent(subject)
+
+    def replica_available(self) -> bool:
+        return self.read_factory is not None and self.clock() >= self._down_until
+
+    def mark_unhealthy(self, error: Exception) -> None:
+        logger.warning("Read replica unavailable, using primary for %ss: %s", settings.replica_retry_seconds, error)
+        self._down_until = self.clock() + settings.replica_retry_seconds
+
+    def session(self, subject: str | None = None) -> Session:
+        """조회용 세션을 엽니다. 복제본을 쓸 수 없으면 기본 DB 세션을 반환합니다."""
+        if self.replica_available() and not self.recently_wrote(subject):
+            db = self.read_factory()
+            db.info["read_router"] = self
+            try:
+                db.connection()  # 연결을 미리 맺어 장애를 요청 처리 전에 감지합니다.
+                return db
+            except DBAPIError as error:
+                db.close()
+                self.mark_unhealthy(error)
+        return self.primary_factory()
+
+
+def _build_write_marks():
+    if settings.read_your_writes_redis_url:
+        return RedisWriteMarks(settings.read_your_writes_redis_url)
+    return None
+
+
+read_router = ReadRouter(ReadSessionLocal, marks=_build_write_marks())
+
+_UNSET = object()
+
+
+def token_subject(request: Request) -> str | None:
+    """
+    Authorization 헤더의 토큰에서 sub(이메일)를 꺼냅니다. 라우팅에만 쓰므로 DB를 조회하지 않습니다.
+    검증한 결과는 request.state에 남겨, 같은 요청에서 미들웨어와 의존성이 토큰을 다시 해석하지 않게 합니다.
+    """
+    subject = getattr(request.state, "token_subject", _UNSET)
+    if subject is _UNSET:
+        subject = request.state.token_subject = _decode_subject(request)
+    return subject
+
+
+def _decode_subject(request: Request) -> str | None:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm]).get("sub")
+    except JWTError:
+        return None
+
 def get_db():
     """데이터베이스 세션을 생성하고 반환하는 의존성 함수"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db(request: Request):
+    """조회(GET) 전용 세션 의존성 함수. 가능하면 읽기 복제본을 사용합니다."""
+    db = read_router.session(token_subject(request))
+    try:
+        yield db
+    finally:
+        db.close()
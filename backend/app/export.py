@@ -0,0 +1,108 @@
+# app/export.py
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Callable, Iterator, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import database, models
+
+# 내보내기 파일에 포함되는 컬럼 (순서가 곧 CSV 헤더 순서입니다)
+EXPORT_COLUMNS = (
+    "id",
+    "user_id",
+    "fatigue_score",
+    "status",
+    "blink_speed",
+    "iris_dilation",
+    "eye_movement_pattern",
+    "created_at",
+)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _format_value(value):
+    """datetime은 ISO 8601 문자열로, 나머지 값은 그대로 반환합니다."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_record_chunks(
+    user_id: int | None, chunk_size: int, session_factory: Callable[[], Session] = database.SessionLocal
+) -> Iterator[Sequence]:
+    """
+    서버 측 커서(yield_per)로 진단 기록을 chunk_size 개씩 읽어옵니다.
+    user_id가 None이면 전체 사용자의 기록을 내보냅니다.
+
+    StreamingResponse는 요청 의존성(get_db)이 정리된 뒤에 본문을 보내므로,
+    스트리밍 동안 사용할 세션을 session_factory로 직접 열고 닫습니다.
+    """
+    table = models.EyeFatigueRecord.__table__
+    stmt = select(*[table.c[name] for name in EXPORT_COLUMNS]).order_by(table.c.id)
+    if user_id is not None:
+        stmt = stmt.where(table.c.user_id == user_id)
+
+    db = session_factory()
+    try:
+        result = db.execute(stmt, execution_options={"yield_per": chunk_size})
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def _encode_ndjson(rows: Sequence) -> bytes:
+    lines = [
+        json.dumps(dict(zip(EXPORT_COLUMNS, map(_format_value, row))), ensure_ascii=False)
+        for row in rows
+    ]
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+def _encode_csv(rows: Sequence) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_format_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_COLUMNS)
+    return buffer.getvalue().encode("utf-8")
+
+
+def stream_export(chunks: Iterator[Sequence], fmt: str, compress: bool = False) -> Iterator[bytes]:
+    """
+    chunk 단위로 NDJSON/CSV 바이트를 만들어 흘려보냅니다.
+    compress가 True이면 gzip 스트림으로 압축하며, 메모리 사용량은 chunk 하나 크기로 유지됩니다.
+    """
+    encode = _encode_ndjson if fmt == "ndjson" else _encode_csv
+
+    def raw() -> Iterator[bytes]:
+        if fmt == "csv":
+            yield _csv_header()
+        for rows in chunks:
+            yield encode(rows)
+
+    if not compress:
+        yield from raw()
+        return
+
+    # wbits=16+MAX_WBITS -> gzip 헤더/트레일러를 포함한 스트림
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for data in raw():
+        block = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if block:
+            yield block
+    yield compressor.flush()
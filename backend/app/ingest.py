@@ -0,0 +1,161 @@
+# app/ingest.py
+"""
+진단 기록 저장(ingestion)과 멱등성 키 처리.
+
+클라이언트가 보낸 idempotency_key(또는 window_start로 만든 자연 키)를
+fatigue_ingest_keys 테이블에 INSERT ... ON CONFLICT DO NOTHING 으로 먼저 선점합니다.
+선점에 성공한 요청만 기록을 저장하므로, 재시도나 병렬 재전송을 해도
+미리 조회(read-before-write)하지 않고 중복 저장을 막을 수 있습니다.
+"""
+
+import hashlib
+from datetime import timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import models, schemas
+
+KEY_MAX_LENGTH = models.FatigueIngestKey.__table__.c.key.type.length
+
+_INSERT_BY_DIALECT = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def dialect_insert(bind):
+    """ON CONFLICT 절을 쓸 수 있는 DB별 insert() 함수"""
+    return _INSERT_BY_DIALECT[bind.dialect.name]
+
+
+def _client_key(key: str) -> str:
+    """
+    클라이언트가 정한 키는 "client:" 접두사를 붙여, 서버가 만드는 "window:" 키와 겹치지 않게 합니다.
+    접두사를 붙이면 키 컬럼 길이를 넘는 긴 키는 해시로 줄입니다. (접두사가 달라 짧은 키와 겹치지 않습니다)
+    """
+    prefixed = f"client:{key}"
+    if len(prefixed) <= KEY_MAX_LENGTH:
+        return prefixed
+    return f"client-sha256:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+
+
+def dedupe_key(data: schemas.FatigueDataInput, header_key: str | None = None) -> str | None:
+    """요청 헤더 > 본문 idempotency_key > window_start 순서로 중복 판별 키를 정합니다."""
+    if header_key:
+        return _client_key(header_key)
+    if data.idempotency_key:
+        return _client_key(data.idempotency_key)
+    if data.window_start is not None:
+        # 같은 시각을 다른 시간대로 보내도 같은 키가 되도록 UTC로 맞춥니다. (시간대가 없으면 UTC로 간주)
+        start = data.window_start
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        return f"window:{start.astimezone(timezone.utc).isoformat()}"
+    return None
+
+
+def build_record(user_id: int, data: schemas.FatigueDataInput) -> models.EyeFatigueRecord:
+    """AI가 보낸 값을 DB 컬럼에 맞춰 기록 객체로 변환합니다."""
+    return models.EyeFatigueRecord(
+        user_id=user_id,
+
+        fatigue_score=data.health_score,  # AI의 health_score -> DB의 fatigue_score
+        status=data.status,             # AI의 status -> DB의 status
+        blink_speed=data.bpm,           # AI의 bpm -> DB의 blink_speed
+
+        # AI가 보내는 max_stable_gaze_time을 eye_movement_pattern 칸에 저장
+        eye_movement_pattern=f"Gaze_Time: {data.max_stable_gaze_time}",
+
+        # AI가 안 보내는 값 (기본값 0.0으로 채움)
+        iris_dilation=0.0
+    )
+
+
+def claim_keys(db: Session, user_id: int, keys: list[str]) -> set[str]:
+    """
+    키를 한 번의 INSERT ... ON CONFLICT DO NOTHING RETURNING 으로 선점하고,
+    이번 요청이 새로 선점한 키만 반환합니다. (이미 있던 키는 중복 요청)
+    """
+    if not keys:
+        return set()
+    insert = dialect_insert(db.bind)
+    table = models.FatigueIngestKey
+    stmt = (
+        insert(table)
+        .values([{"user_id": user_id, "key": key} for key in keys])
+        .on_conflict_do_nothing(index_elements=["user_id", "key"])
+        .returning(table.key)
+    )
+    return set(db.execute(stmt).scalars())
+
+
+def link_keys(db: Session, user_id: int, key_to_record: dict[str, int]) -> None:
+    """선점한 키에 저장된 기록 id를 연결합니다. (같은 트랜잭션 안에서 실행)"""
+    if key_to_record:
+        db.execute(
+            update(models.FatigueIngestKey),
+            [{"user_id": user_id, "key": key, "record_id": record_id} for key, record_id in key_to_record.items()],
+        )
+
+
+def find_existing(db: Session, user_id: int, key: str) -> models.EyeFatigueRecord | None:
+    """중복 요청일 때, 처음 요청으로 저장된 기록을 찾습니다."""
+    return db.execute(
+        select(models.EyeFatigueRecord)
+        .join(models.FatigueIngestKey, models.FatigueIngestKey.record_id == models.EyeFatigueRecord.id)
+        .where(models.FatigueIngestKey.user_id == user_id, models.FatigueIngestKey.key == key)
+    ).scalar_one_or_none()
+
+
+def ingest_one(db: Session, user_id: int, data: schemas.FatigueDataInput, header_key: str | None = None):
+    """
+    기록 1건을 저장합니다.
+    (기록, 새로 저장했는지 여부)를 반환하며, 중복 요청이면 처음 저장된 기록을 돌려줍니다.
+    """
+    key = dedupe_key(data, header_key)
+    if key is not None and not claim_keys(db, user_id, [key]):
+        db.rollback()
+        return find_existing(db, user_id, key), False
+
+    record = build_record(user_id, data)
+    db.add(record)
+    db.flush()
+    if key is not None:
+        link_keys(db, user_id, {key: record.id})
+    db.commit()
+    db.refresh(record)
+    return record, True
+
+
+def ingest_many(db: Session, user_id: int, items: list[schemas.FatigueDataInput]):
+    """
+    여러 기록을 한 트랜잭션으로 저장합니다. 키 선점도 한 번의 INSERT로 처리합니다.
+    ([(새 기록 id, 점수), ...], 중복으로 건너뛴 개수)를 반환합니다.
+    """
+    # (키, 항목)을 요청 순서대로 모읍니다. 반환하는 기록 id도 이 순서를 따릅니다.
+    entries: list[tuple[str | None, schemas.FatigueDataInput]] = []
+    seen: set[str] = set()
+    duplicates = 0
+    for item in items:
+        key = dedupe_key(item)
+        if key is not None:
+            if key in seen:
+                duplicates += 1  # 같은 요청 안에서 반복된 키
+                continue
+            seen.add(key)
+        entries.append((key, item))
+
+    claimed = claim_keys(db, user_id, [key for key, _ in entries if key is not None])
+    duplicates += len(seen) - len(claimed)
+
+    entries = [(key, item) for key, item in entries if key is None or key in claimed]
+    records = [build_record(user_id, item) for _, item in entries]
+    db.add_all(records)
+    db.flush()
+    link_keys(db, user_id, {key: record.id for (key, _), record in zip(entries, records) if key is not None})
+    # commit 후에는 속성이 만료되어 다시 조회되므로, 필요한 값은 미리 꺼내 둡니다.
+    created = [(record.id, record.fatigue_score) for record in records]
+    db.commit()
+    return created, duplicates
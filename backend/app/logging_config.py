@@ -1,16 +1,153 @@
 
+import atexit
 import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+
+from pythonjsonlogger.json import JsonFormatter
+
+from .config import settings
+
+# 요청마다 미들웨어가 설정하는 요청 ID (로그 상관관계 추적용)
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - [%(request_id)s] - %(message)s"
+JSON_LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s %(request_id)s %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 자체 핸들러를 가진 uvicorn 로거 ("uvicorn.error"는 "uvicorn"으로 전달됩니다)
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.access")
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class RequestIdFilter(logging.Filter):
+    """현재 요청의 ID를 로그 레코드에 붙입니다. (큐에 넣기 전, 요청 스레드에서 실행)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """INFO 이하 로그를 rate 비율만큼만 남깁니다. WARNING 이상은 항상 통과합니다."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    (로거 이름, 메시지 템플릿)별 토큰 버킷으로 초당 로그 수를 제한합니다.
+    WARNING 이상과 exempt 로거(모든 요청이 같은 템플릿을 쓰는 접근 로그 등)는 항상 통과합니다.
+    버킷은 최대 max_keys 개까지만 보관합니다. (f-string 메시지처럼 템플릿이 매번 달라도 메모리가 늘지 않도록)
+    """
+
+    def __init__(self, per_second: float, burst: int, clock=time.monotonic, max_keys: int = 10_000,
+                 exempt: tuple[str, ...] = ()):
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst
+        self.clock = clock
+        self.max_keys = max_keys
+        self.exempt = exempt
+        self._buckets: dict[tuple[str, str], tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or record.name in self.exempt:
+            return True
+        key = (record.name, str(record.msg))
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.per_second)
+            allowed = tokens >= 1
+            if len(self._buckets) >= self.max_keys and key not in self._buckets:
+                self._evict(now)
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+    def _evict(self, now: float) -> None:
+        """다시 가득 찬(= 처음 만든 것과 같은) 버킷을 지우고, 그래도 많으면 오래된 것부터 지웁니다."""
+        refill = self.burst / self.per_second
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items() if bucket[1] + refill > now
+        }
+        while len(self._buckets) >= self.max_keys:
+            del self._buckets[next(iter(self._buckets))]
+
+
+def _build_output_handler(json_logs: bool) -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    if json_logs:
+        handler.setFormatter(JsonFormatter(JSON_LOG_FORMAT, datefmt=DATE_FORMAT))
+    else:
+        handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT))
+    return handler
+
+
+def stop_logging():
+    """백그라운드 로그 스레드를 멈추고 큐에 남은 로그를 모두 출력합니다."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def setup_logging():
     """
     애플리케이션 전체의 로깅을 설정합니다.
+    요청 스레드는 로그를 큐에 넣기만 하고, 실제 출력(I/O)은 QueueListener 스레드가 처리합니다.
     """
-    # 기본 로거 설정
-    logging.basicConfig(
-        level=logging.INFO,  # INFO 레벨 이상의 로그만 출력
-        format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
+    global _listener
+    stop_logging()
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    if settings.log_rate_limit_per_second > 0:
+        queue_handler.addFilter(RateLimitFilter(
+            settings.log_rate_limit_per_second, settings.log_rate_limit_burst, exempt=("uvicorn.access",)
+        ))
+
+    # 기본 로거 설정: 기존 핸들러를 큐 핸들러 하나로 교체
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.log_level)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, _build_output_handler(settings.log_json), respect_handler_level=True
     )
+    _listener.start()
+    atexit.register(stop_logging)
+
+    # 로거별 샘플링 (해당 로거에서 직접 남긴 로그에만 적용됩니다)
+    for name, rate in settings.log_sample_rates.items():
+        logger = logging.getLogger(name)
+        for existing in [f for f in logger.filters if isinstance(f, SamplingFilter)]:
+            logger.removeFilter(existing)
+        logger.addFilter(SamplingFilter(rate))
+
+    # uvicorn은 자체 StreamHandler를 달고 propagate=False로 설정하므로,
+    # 핸들러를 떼고 루트(큐 핸들러)로 전달하게 해서 출력이 요청 처리를 막지 않도록 합니다.
+    for name in UVICORN_LOGGERS:
+        logger = logging.getLogger(name)
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+        logger.propagate = True
+
     # uvicorn과 fastapi 로거 가져오기
     uvicorn_logger = logging.getLogger("uvicorn.access")
     fastapi_logger = logging.getLogger("fastapi")
@@ -1,14 +1,20 @@
 import logging
-from fastapi import FastAPI
+import re
+import uuid
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 # 프로젝트 모듈 임포트
+from . import percentiles, ratelimit
 from .database import engine, Base
-from .logging_config import setup_logging
+from .logging_config import request_id_var, setup_logging, stop_logging
+from .partitions import prepare_database
 from .routers import auth, users, fatigue 
 
 
 # 서버 시작 시 데이터베이스에 테이블 생성
+# (Postgres에서는 기록 테이블을 월 단위 파티션 테이블로 먼저 준비합니다)
+prepare_database(engine)
 Base.metadata.create_all(bind=engine)
 
 # --- FastAPI 앱 설정 ---
@@ -24,6 +30,13 @@ async def startup_event():
     """애플리케이션이 시작될 때 실행됩니다."""
     logger.info("Application startup...")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """애플리케이션이 종료될 때 큐에 남은 로그를 모두 출력합니다."""
+    logger.info("Application shutdown...")
+    percentiles.flush_if_due(force=True)
+    stop_logging()
+
 # --- 미들웨어 설정 ---
 origins = [
     "http://localhost:3000",
@@ -31,6 +44,28 @@ origins = [
     # (나중에 여기에 프론트엔드 '라이브 주소'도 추가)
 ]
 
+REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._:-]{1,64}")
+
+# 속도 제한 / 과부하 차단 (아래 요청 ID 미들웨어 안쪽에서 실행되어 거절 응답에도 요청 ID가 붙습니다)
+app.add_middleware(ratelimit.RateLimitMiddleware)
+
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """요청마다 ID를 부여해 로그에 남기고, 응답 헤더(X-Request-ID)로 돌려줍니다."""
+    request_id = request.headers.get("X-Request-ID")
+    # 클라이언트가 보낸 값은 로그와 응답 헤더에 그대로 쓰이므로, 짧은 안전한 문자열만 받아들입니다.
+    if not request_id or not REQUEST_ID_PATTERN.fullmatch(request_id):
+        request_id = uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+# CORS는 가장 바깥에 둡니다. (나중에 추가한 미들웨어가 바깥쪽)
+# preflight 요청은 속도 제한 전에 응답하고, 429/503 거절 응답에도 CORS 헤더가 붙습니다.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
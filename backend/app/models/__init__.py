@@ -1,6 +1,6 @@
 # app/models/__init__.py
 
 from ..database import Base
-from .users import User, EyeFatigueRecord
+from .users import User, EyeFatigueRecord, EyeFatigueDailySummary, FatigueScoreSketch, FatigueIngestKey
 
-__all__ = ["Base", "User", "EyeFatigueRecord"]
\ No newline at end of file
+__all__ = ["Base", "User", "EyeFatigueRecord", "EyeFatigueDailySummary", "FatigueScoreSketch", "FatigueIngestKey"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 # 👇 1. 'func'를 임포트합니다.
@@ -32,4 +32,52 @@ class EyeFatigueRecord(Base):
     eye_movement_pattern = Column(String(50), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    owner = relationship("User", back_populates="records")
\ No newline at end of file
+    owner = relationship("User", back_populates="records")
+
+    # 최근 기록 조회(/result, /history)용 복합 인덱스
+    __table_args__ = (
+        Index("ix_eye_fatigue_records_user_created", "user_id", "created_at"),
+    )
+
+
+class EyeFatigueDailySummary(Base):
+    """보존 기간이 지난 원본 기록을 사용자별 하루 단위로 요약한 테이블"""
+    __tablename__ = "eye_fatigue_daily_summaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)
+
+    record_count = Column(Integer, nullable=False)
+    avg_fatigue_score = Column(Float, nullable=True)
+    min_fatigue_score = Column(Float, nullable=True)
+    max_fatigue_score = Column(Float, nullable=True)
+    avg_blink_speed = Column(Float, nullable=True)
+
+    # 사용자·날짜마다 요약은 한 줄입니다. (보존 작업이 ON CONFLICT로 기존 요약과 합칩니다)
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_eye_fatigue_daily_summaries_user_day"),
+    )
+
+
+class FatigueScoreSketch(Base):
+    """피로도 점수 분포 스케치 (전체 / 일별 백분위 계산용)"""
+    __tablename__ = "fatigue_score_sketches"
+
+    scope = Column(String(20), primary_key=True)  # "all" 또는 "day:YYYY-MM-DD"
+    counts = Column(LargeBinary, nullable=False)  # 구간별 개수 (int64 배열)
+    total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class FatigueIngestKey(Base):
+    """
+    진단 기록 중복 저장 방지용 멱등성 키.
+    (user_id, key) 기본 키가 유니크 인덱스 역할을 하며, 처음 키를 선점한 요청만 기록을 저장합니다.
+    """
+    __tablename__ = "fatigue_ingest_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    record_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
\ No newline at end of file
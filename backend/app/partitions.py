@@ -0,0 +1,434 @@
+# app/partitions.py
+"""
+eye_fatigue_records 월 단위 파티션 관리와 보존 기간(retention) 작업.
+
+- Postgres: eye_fatigue_records 를 created_at 기준 RANGE 파티션 테이블로 만들고,
+  월별 파티션을 미리 생성합니다. 보존 기간이 지난 파티션은 DETACH PARTITION ... CONCURRENTLY 로
+  떼어낸 뒤 DROP TABLE 로 한 번에 지웁니다. (부모 테이블을 ACCESS EXCLUSIVE로 잠그지 않습니다)
+- SQLite 등 그 외 DB: 일반 테이블을 그대로 사용하고, 보존 작업은 DELETE 로 대체합니다.
+
+보존 작업은 아래처럼 주기적으로(예: 매일 한 번) 실행합니다.
+
+    python -m app.partitions
+
+이미 일반 테이블로 만들어진 eye_fatigue_records 는 아래 명령으로 한 번 파티션 테이블로 옮깁니다.
+(기존 테이블 이름 변경 → 파티션 부모 생성 → 배치 복사 → 기존 테이블 삭제, 중간에 멈추면 다시 실행하면 됩니다)
+
+    python -m app.partitions migrate
+"""
+
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import (
+    MetaData, PrimaryKeyConstraint, Table, case, column, delete, func, inspect, select, table, text, union_all,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from . import models
+from .config import settings
+from .ingest import dialect_insert
+from .percentiles import prune_day_sketches
+
+logger = logging.getLogger(__name__)
+
+RECORDS_TABLE = models.EyeFatigueRecord.__table__
+PARTITION_PREFIX = f"{RECORDS_TABLE.name}_p"
+DEFAULT_PARTITION = f"{RECORDS_TABLE.name}_default"
+LEGACY_TABLE = f"{RECORDS_TABLE.name}_legacy"
+MIGRATION_BATCH_SIZE = 10_000
+
+
+def is_postgres(bind) -> bool:
+    return bind.dialect.name == "postgresql"
+
+
+def month_start(moment: datetime) -> datetime:
+    """주어진 시각이 속한 달의 1일 0시(UTC)를 반환합니다."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    """달의 1일 기준 시각에 months 개월을 더합니다 (음수 가능)."""
+    index = moment.year * 12 + (moment.month - 1) + months
+    return moment.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARTITION_PREFIX}{month.year:04d}_{month.month:02d}"
+
+
+def recent_cutoff(now: datetime | None = None) -> datetime:
+    """최근 조회(hot path)가 확인할 가장 오래된 시각. 최근 파티션만 읽도록 조건에 사용합니다."""
+    now = now or datetime.now(timezone.utc)
+    return add_months(month_start(now), -settings.hot_query_months)
+
+
+def _is_partitioned(conn: Connection) -> bool:
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind IN ('r', 'p')"),
+        {"name": RECORDS_TABLE.name},
+    ).scalar()
+    return relkind == "p"
+
+
+def partitioned_table() -> Table:
+    """
+    ORM 테이블 정의를 복사해, 파티션 키(created_at)를 기본 키에 포함시킨 RANGE 파티션 부모 테이블을 만듭니다.
+    (Postgres는 파티션 키가 PK에 포함되어야 합니다. 복합 PK에서도 id는 SERIAL로 유지합니다)
+    """
+    metadata = MetaData()
+    models.User.__table__.to_metadata(metadata)  # 외래 키 대상
+    parent = RECORDS_TABLE.to_metadata(metadata)
+    parent.c.created_at.primary_key = True
+    parent.c.id.autoincrement = True
+    parent.append_constraint(PrimaryKeyConstraint(parent.c.id, parent.c.created_at))
+    parent.dialect_options["postgresql"]["partition_by"] = "RANGE (created_at)"
+    return parent
+
+
+def _create_partitioned_table(conn: Connection) -> None:
+    partitioned_table().create(conn)  # 인덱스도 함께 만들어집니다.
+    logger.info("Created partitioned table %s", RECORDS_TABLE.name)
+
+
+def _ensure_indexes(conn: Connection) -> None:
+    """
+    기존 테이블에는 create_all이 인덱스를 추가하지 않으므로, 나중에 추가된 인덱스
+    (ix_eye_fatigue_records_user_created 등)를 직접 만듭니다.
+    """
+    for index in RECORDS_TABLE.indexes:
+        conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _partition_exists(conn: Connection, name: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def _default_has_rows(conn: Connection, lower: datetime, upper: datetime) -> bool:
+    return conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= :lower AND created_at < :upper)"),
+        {"lower": lower, "upper": upper},
+    ).scalar()
+
+
+def _create_partition(conn: Connection, name: str, lower: datetime, upper: datetime) -> None:
+    """
+    월 파티션을 만듭니다.
+    DEFAULT 파티션에 이미 그 달의 기록이 있으면 CREATE ... PARTITION OF 가 실패하므로,
+    DEFAULT를 떼어낸 뒤 파티션을 만들고 해당 기록을 옮긴 다음 DEFAULT를 다시 붙입니다.
+    """
+    bounds = f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+    if not (_partition_exists(conn, DEFAULT_PARTITION) and _default_has_rows(conn, lower, upper)):
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {RECORDS_TABLE.name} {bounds}"))
+        return
+
+    in_range = "created_at >= :lower AND created_at < :upper"
+    params = {"lower": lower, "upper": upper}
+    conn.execute(text(f"ALTER TABLE {RECORDS_TABLE.name} DETACH PARTITION {DEFAULT_PARTITION}"))
+    conn.execute(text(f"CREATE TABLE {name} PARTITION OF {RECORDS_TABLE.name} {bounds}"))
+    moved = conn.execute(
+        text(f"INSERT INTO {RECORDS_TABLE.name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"), params
+    ).rowcount
+    conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), params)
+    conn.execute(text(f"ALTER TABLE {RECORDS_TABLE.name} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    logger.info("Moved %s rows from %s into %s", moved, DEFAULT_PARTITION, name)
+
+
+def ensure_partitions(conn: Connection, now: datetime | None = None, months_ahead: int | None = None,
+                      since: datetime | None = None) -> list[str]:
+    """
+    이번 달(since가 있으면 그 달)부터 months_ahead 개월 뒤까지의 월 파티션을 만들어 둡니다.
+    DEFAULT 파티션은 만들지 않습니다. DEFAULT 파티션이 있으면 DETACH PARTITION ... CONCURRENTLY 를 쓸 수 없고,
+    created_at은 서버 시각(now())이라 보존 작업이 미리 만들어 두는 파티션 범위를 벗어나지 않습니다.
+    """
+    now = now or datetime.now(timezone.utc)
+    months_ahead = settings.partition_premake_months if months_ahead is None else months_ahead
+    created = []
+
+    lower = month_start(since or now)
+    last = add_months(month_start(now), months_ahead)
+    while lower <= last:
+        upper = add_months(lower, 1)
+        name = partition_name(lower)
+        if not _partition_exists(conn, name):
+            _create_partition(conn, name, lower, upper)
+        created.append(name)
+        lower = upper
+    return created
+
+
+def prepare_database(engine: Engine) -> bool:
+    """
+    서버 시작 시 create_all 전에 호출합니다.
+    Postgres에서 기록 테이블이 아직 없으면 파티션 테이블로 만들고, 월 파티션을 준비합니다.
+    이미 일반 테이블이 있으면 새로 추가된 인덱스만 만듭니다. (파티션 전환은 migrate_to_partitioned)
+    파티션을 사용하면 True, 일반 테이블로 동작하면 False를 반환합니다.
+    """
+    with engine.begin() as conn:
+        if not is_postgres(engine):
+            if inspect(conn).has_table(RECORDS_TABLE.name):
+                _ensure_indexes(conn)
+            return False
+        if not inspect(conn).has_table(RECORDS_TABLE.name):
+            models.User.__table__.create(conn, checkfirst=True)
+            _create_partitioned_table(conn)
+        elif not _is_partitioned(conn):
+            _ensure_indexes(conn)
+            logger.warning(
+                "%s already exists as a regular table; retention falls back to DELETE until it is migrated "
+                "with `python -m app.partitions migrate`.",
+                RECORDS_TABLE.name,
+            )
+            return False
+        ensure_partitions(conn)
+    return True
+
+
+def _legacy_indexes(conn: Connection) -> list[str]:
+    return conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :name"), {"name": RECORDS_TABLE.name}
+    ).scalars().all()
+
+
+def _start_migration(conn: Connection, now: datetime) -> None:
+    """
+    기존 테이블을 LEGACY_TABLE로 바꾸고 같은 이름의 파티션 부모를 만듭니다.
+    기존 PK/인덱스 이름은 새 테이블과 겹치므로 함께 바꾸고, 새 id 시퀀스는 기존 최댓값 다음부터 시작시켜
+    복사하는 동안 들어오는 새 기록과 id가 겹치지 않게 합니다.
+    """
+    conn.execute(text(f"LOCK TABLE {RECORDS_TABLE.name} IN ACCESS EXCLUSIVE MODE"))
+    for index in _legacy_indexes(conn):
+        conn.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index}_legacy"'))
+    conn.execute(text(f"ALTER TABLE {RECORDS_TABLE.name} RENAME TO {LEGACY_TABLE}"))
+
+    _create_partitioned_table(conn)
+    oldest = conn.execute(text(f"SELECT MIN(created_at) FROM {LEGACY_TABLE}")).scalar()
+    ensure_partitions(conn, now, since=oldest)
+    conn.execute(
+        text(
+            f"SELECT setval(pg_get_serial_sequence('{RECORDS_TABLE.name}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {LEGACY_TABLE}), false)"
+        )
+    )
+    logger.info("Renamed %s to %s and created the partitioned table", RECORDS_TABLE.name, LEGACY_TABLE)
+
+
+def migrate_to_partitioned(engine: Engine, batch_size: int = MIGRATION_BATCH_SIZE,
+                           now: datetime | None = None) -> int:
+    """
+    일반 테이블로 만들어진 eye_fatigue_records 를 파티션 테이블로 옮기고, 복사한 행 수를 반환합니다.
+    배치마다 커밋하므로 큰 테이블도 긴 트랜잭션 없이 옮길 수 있고, 중간에 멈추면 다시 실행해 이어서 복사합니다.
+    (이미 복사한 행은 ON CONFLICT DO NOTHING 으로 건너뜁니다)
+    """
+    if not is_postgres(engine):
+        raise RuntimeError("파티션 테이블 전환은 Postgres에서만 지원합니다.")
+    now = now or datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        if not _partition_exists(conn, LEGACY_TABLE):
+            if _is_partitioned(conn):
+                logger.info("%s is already partitioned", RECORDS_TABLE.name)
+                return 0
+            _start_migration(conn, now)
+
+    columns = ", ".join(column.name for column in RECORDS_TABLE.columns)
+    # 파티션 키가 NULL인 행은 어느 월 파티션에도 들어가지 못하므로 복사 시각으로 채웁니다.
+    values = columns.replace("created_at", "COALESCE(created_at, now())")
+    copy = text(
+        f"WITH batch AS (SELECT {columns} FROM {LEGACY_TABLE} WHERE id > :last ORDER BY id LIMIT :limit), "
+        f"copied AS (INSERT INTO {RECORDS_TABLE.name} ({columns}) SELECT {values} FROM batch "
+        f"ON CONFLICT DO NOTHING) "
+        f"SELECT MAX(id), COUNT(*) FROM batch"
+    )
+    last, copied = 0, 0
+    while True:
+        with engine.begin() as conn:
+            last_id, count = conn.execute(copy, {"last": last, "limit": batch_size}).one()
+        if not count:
+            break
+        last, copied = last_id, copied + count
+        logger.info("Copied %s rows into %s (last id %s)", copied, RECORDS_TABLE.name, last)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))  # 기존 id 시퀀스도 함께 삭제됩니다.
+    logger.info("Migrated %s rows into partitioned %s", copied, RECORDS_TABLE.name)
+    return copied
+
+
+def _is_expired(name: str, cutoff: datetime) -> bool:
+    """상한(다음 달 1일)이 cutoff 이하인, 즉 전부 보존 기간이 지난 월 파티션인지"""
+    if not name.startswith(PARTITION_PREFIX):
+        return False
+    year, month = name[len(PARTITION_PREFIX):].split("_")
+    lower = datetime(int(year), int(month), 1, tzinfo=timezone.utc)
+    return add_months(lower, 1) <= cutoff
+
+
+def _expired_partitions(conn: Connection, cutoff: datetime) -> list[tuple[str, bool]]:
+    """보존 기간이 지난 월 파티션의 (이름, 이전 DETACH ... CONCURRENTLY 가 중단되어 분리 대기 중인지) 목록"""
+    rows = conn.execute(
+        text(
+            "SELECT child.relname, pg_inherits.inhdetachpending FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :parent"
+        ),
+        {"parent": RECORDS_TABLE.name},
+    ).all()
+    return sorted((name, pending) for name, pending in rows if _is_expired(name, cutoff))
+
+
+def _detached_partitions(conn: Connection, cutoff: datetime) -> list[str]:
+    """떼어냈지만 아직 요약·삭제되지 않은(이전 보존 작업이 중간에 멈춘) 월 파티션 테이블 이름 목록"""
+    names = conn.execute(
+        text(
+            "SELECT relname FROM pg_class "
+            "WHERE relkind = 'r' AND NOT relispartition AND left(relname, length(:prefix)) = :prefix"
+        ),
+        {"prefix": PARTITION_PREFIX},
+    ).scalars()
+    return sorted(name for name in names if _is_expired(name, cutoff))
+
+
+def _detach_expired_partitions(engine: Engine, cutoff: datetime) -> list[str]:
+    """
+    보존 기간이 지난 파티션을 DETACH PARTITION ... CONCURRENTLY 로 떼어내고, 떼어낸 테이블 이름을 반환합니다.
+    CONCURRENTLY는 트랜잭션 안에서 실행할 수 없으므로 autocommit 연결을 사용합니다.
+    (오래된 DEFAULT 파티션이 남아 있으면 CONCURRENTLY를 쓸 수 없어 일반 DETACH로 떼어냅니다)
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if not _is_partitioned(conn):
+            return []
+        mode = "CONCURRENTLY"
+        if _partition_exists(conn, DEFAULT_PARTITION):
+            logger.warning("%s exists; detaching expired partitions without CONCURRENTLY", DEFAULT_PARTITION)
+            mode = ""
+        for name, pending in _expired_partitions(conn, cutoff):
+            conn.execute(text(f"ALTER TABLE {RECORDS_TABLE.name} DETACH PARTITION {name} {'FINALIZE' if pending else mode}"))
+        return _detached_partitions(conn, cutoff)
+
+
+def _utc_day(bind, column):
+    """세션 시간대와 관계없이 UTC 기준 날짜로 묶습니다. (SQLite는 UTC 문자열로 저장되므로 그대로 사용)"""
+    if is_postgres(bind):
+        return func.date(func.timezone("UTC", column))
+    return func.date(column)
+
+
+def _merge_summary(summary, excluded) -> dict:
+    """
+    이미 요약된 날짜에 기록이 더 들어온 경우(늦게 도착한 기록 등) 기존 요약과 합칩니다.
+    평균은 기록 수로 가중 평균하고, NULL인 쪽은 다른 쪽 값을 그대로 씁니다.
+    """
+    count = summary.record_count + excluded.record_count
+
+    def weighted(column):
+        old, new = getattr(summary, column), getattr(excluded, column)
+        merged = (old * summary.record_count + new * excluded.record_count) / count
+        return func.coalesce(merged, new, old)
+
+    def pick(column, newer_wins):
+        old, new = getattr(summary, column), getattr(excluded, column)
+        return func.coalesce(case((newer_wins(new, old), new), else_=old), new)
+
+    return {
+        "record_count": count,
+        "avg_fatigue_score": weighted("avg_fatigue_score"),
+        "min_fatigue_score": pick("min_fatigue_score", lambda new, old: new < old),
+        "max_fatigue_score": pick("max_fatigue_score", lambda new, old: new > old),
+        "avg_blink_speed": weighted("avg_blink_speed"),
+    }
+
+
+def run_retention(db: Session, now: datetime | None = None, retention_months: int | None = None) -> dict:
+    """
+    보존 기간이 지난 원본 기록을 사용자별·일별 요약으로 옮긴 뒤 삭제합니다.
+    Postgres 파티션 테이블에서는 먼저 지난 파티션을 떼어내고(부모를 오래 잠그지 않도록), 떼어낸 테이블의 기록도
+    같은 트랜잭션에서 요약한 뒤 DROP TABLE 합니다. 요약과 삭제는 같은 트랜잭션에서 처리되므로,
+    다시 실행해도 같은 기록이 두 번 요약되지 않습니다. (떼어낸 뒤 멈춘 테이블은 다음 실행에서 처리합니다)
+    떼어내기는 별도 연결에서 다른 트랜잭션이 끝나길 기다리므로, db 세션에 열린 트랜잭션이 없을 때 호출합니다.
+    """
+    now = now or datetime.now(timezone.utc)
+    retention_months = settings.record_retention_months if retention_months is None else retention_months
+    cutoff = add_months(month_start(now), -retention_months)
+
+    detached = _detach_expired_partitions(db.get_bind(), cutoff) if is_postgres(db.get_bind()) else []
+
+    record = models.EyeFatigueRecord
+    summary = models.EyeFatigueDailySummary
+    names = ("user_id", "created_at", "fatigue_score", "blink_speed")
+    sources = [select(*(getattr(record, name) for name in names)).where(record.created_at < cutoff)]
+    for table_name in detached:
+        partition = table(table_name, *(column(name) for name in names))
+        sources.append(select(*(partition.c[name] for name in names)))
+    rows = union_all(*sources).subquery() if len(sources) > 1 else sources[0].subquery()
+    day = _utc_day(db.bind, rows.c.created_at)
+    downsample = select(
+        rows.c.user_id,
+        day,
+        func.count(),
+        func.avg(rows.c.fatigue_score),
+        func.min(rows.c.fatigue_score),
+        func.max(rows.c.fatigue_score),
+        func.avg(rows.c.blink_speed),
+    ).group_by(rows.c.user_id, day)
+
+    stmt = dialect_insert(db.bind)(summary).from_select(
+        ["user_id", "day", "record_count", "avg_fatigue_score",
+         "min_fatigue_score", "max_fatigue_score", "avg_blink_speed"],
+        downsample,
+    )
+    summarized = db.execute(
+        stmt.on_conflict_do_update(index_elements=["user_id", "day"], set_=_merge_summary(summary, stmt.excluded))
+    ).rowcount
+
+    # 떼어낸 테이블은 더 이상 부모에 속하지 않으므로, 지워도 부모 테이블을 잠그지 않습니다.
+    for name in detached:
+        db.execute(text(f"DROP TABLE {name}"))
+    if is_postgres(db.bind) and _is_partitioned(db.connection()):
+        ensure_partitions(db.connection(), now)
+
+    # 파티션이 없거나 DEFAULT 파티션에 남은 오래된 기록은 DELETE로 정리합니다.
+    deleted = db.execute(
+        delete(record).where(record.created_at < cutoff),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    # 삭제된 기록을 가리키던 멱등성 키도 함께 정리합니다.
+    db.execute(
+        delete(models.FatigueIngestKey).where(models.FatigueIngestKey.created_at < cutoff),
+        execution_options={"synchronize_session": False},
+    )
+    # 오래된 일별 백분위 스케치도 정리합니다. (오늘/어제 조회에만 쓰입니다)
+    pruned = prune_day_sketches(db, now.date() - timedelta(days=settings.sketch_day_retention_days))
+    db.commit()
+
+    result = {
+        "cutoff": cutoff.isoformat(),
+        "summarized_days": summarized,
+        "dropped_partitions": detached,
+        "deleted_rows": deleted,
+        "pruned_day_sketches": pruned,
+    }
+    logger.info("Retention finished: %s", result)
+    return result
+
+
+if __name__ == "__main__":
+    from .database import SessionLocal, engine
+    from .logging_config import setup_logging
+
+    setup_logging()
+    if sys.argv[1:] == ["migrate"]:
+        print(migrate_to_partitioned(engine))
+        sys.exit()
+    prepare_database(engine)
+    session = SessionLocal()
+    try:
+        print(run_retention(session))
+    finally:
+        session.close()
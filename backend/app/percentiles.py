@@ -0,0 +1,349 @@
+# app/percentiles.py
+"""
+피로도 점수(fatigue_score)의 전체/일별 분포를 스케치로 유지하고 백분위를 계산합니다.
+
+점수는 0~100 범위로 제한되므로, 고정 폭 히스토그램을 스케치로 사용합니다.
+- 갱신: O(log B) (B = 구간 수, 기본 1000 -> 최대 10단계)
+- 조회: O(log B), 기록 수와 무관
+- 오차: 점수 기준 최대 구간 폭의 절반, 백분위 기준 최대 한 구간에 속한 비율의 절반
+- 서로 더해서(merge) 합칠 수 있으므로, 워커별 변경분을 DB의 값에 누적해 저장합니다.
+
+기존 기록으로 스케치를 다시 만들려면 아래 명령을 실행합니다. (서버가 실행 중이어도 됩니다)
+
+    python -m app.percentiles
+
+재구성은 스케치 행을 통째로 바꾸고 재구성 시각을 REBUILT_SCOPE 행에 남깁니다. 워커는 저장할 때 그 시각보다
+먼저 관측한 미저장 변경분을 버리므로(재구성에 이미 포함된 기록), 같은 점수가 두 번 반영되지 않습니다.
+"""
+
+import logging
+import threading
+import time
+from array import array
+from datetime import date, datetime, timezone
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import database, models
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+SCOPE_ALL = "all"
+# 마지막 재구성 시각을 updated_at에 담는 행 (counts / total은 쓰지 않습니다)
+REBUILT_SCOPE = "meta:rebuilt"
+SCORE_MIN = 0.0
+SCORE_MAX = 100.0
+
+
+def day_scope(day: date) -> str:
+    return f"day:{day.isoformat()}"
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """시간대가 없는 시각(SQLite)은 UTC로 간주합니다. (partitions._utc_day와 같은 기준)"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+class ScoreHistogram:
+    """
+    [SCORE_MIN, SCORE_MAX] 구간을 bins 개로 나눈 히스토그램.
+    누적 개수는 펜윅 트리(Fenwick tree)로 관리해 갱신과 순위 조회를 빠르게 처리합니다.
+    """
+
+    def __init__(self, bins: int):
+        self.bins = bins
+        self.total = 0
+        self._tree = [0] * (bins + 1)
+
+    def _bin(self, score: float) -> int:
+        ratio = (score - SCORE_MIN) / (SCORE_MAX - SCORE_MIN)
+        return min(self.bins - 1, max(0, int(ratio * self.bins)))
+
+    def _add_bin(self, index: int, count: int) -> None:
+        i = index + 1
+        while i <= self.bins:
+            self._tree[i] += count
+            i += i & -i
+        self.total += count
+
+    def _prefix(self, index: int) -> int:
+        """0 ~ index-1 구간의 개수 합"""
+        total = 0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def add(self, score: float, count: int = 1) -> None:
+        self._add_bin(self._bin(score), count)
+
+    def percentile(self, score: float) -> float:
+        """score 이하인 점수의 비율(0~100). 같은 구간 안의 값은 절반만 포함합니다."""
+        if self.total == 0:
+            return 0.0
+        index = self._bin(score)
+        below = self._prefix(index)
+        within = self._prefix(index + 1) - below
+        return 100.0 * (below + within / 2) / self.total
+
+    def counts(self) -> list[int]:
+        prefix = [self._prefix(i) for i in range(self.bins + 1)]
+        return [prefix[i + 1] - prefix[i] for i in range(self.bins)]
+
+    def merge(self, other: "ScoreHistogram") -> None:
+        for index, count in enumerate(other.counts()):
+            if count:
+                self._add_bin(index, count)
+
+    def to_bytes(self) -> bytes:
+        return array("q", self.counts()).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, bins: int) -> "ScoreHistogram":
+        histogram = cls(bins)
+        counts = array("q")
+        counts.frombytes(data)
+        if len(counts) != bins:
+            # 구간 수 설정이 바뀐 경우: 기존 구간의 가운데 점수가 속한 새 구간으로 옮겨 개수를 보존합니다.
+            logger.warning("Sketch bin count changed (%s -> %s); rebinning", len(counts), bins)
+            old_bins = len(counts)
+            for index, count in enumerate(counts):
+                if count:
+                    histogram._add_bin(min(bins - 1, int((index + 0.5) * bins / old_bins)), count)
+            return histogram
+        for index, count in enumerate(counts):
+            if count:
+                histogram._add_bin(index, count)
+        return histogram
+
+
+class PercentileStore:
+    """
+    스코프("all", "day:YYYY-MM-DD")별 스케치를 메모리에 유지합니다.
+    - view: DB에 저장된 값(다른 워커의 기록 포함) + 이 워커의 미저장 변경분. 조회는 이것만 읽습니다.
+    - pending: 이 워커에서 아직 DB에 저장하지 않은 (관측 시각, 날짜, 점수) 목록.
+      저장 주기(sketch_flush_every / sketch_flush_seconds)마다 비워지므로 작게 유지됩니다.
+    """
+
+    def __init__(self, bins: int | None = None, keep_days: int = 2):
+        self.bins = bins or settings.sketch_bins
+        self.keep_days = keep_days
+        self._view: dict[str, ScoreHistogram] = {}
+        self._pending: list[tuple[datetime, date, float]] = []
+        self._loaded: set[str] = set()
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def _histogram(self, table: dict[str, ScoreHistogram], scope: str) -> ScoreHistogram:
+        histogram = table.get(scope)
+        if histogram is None:
+            histogram = table[scope] = ScoreHistogram(self.bins)
+        return histogram
+
+    def add(self, score: float, day: date | None = None, at: datetime | None = None) -> None:
+        """
+        새 점수를 전체/당일(UTC) 스케치에 반영합니다. (DB 접근 없음)
+        at은 기록을 저장하기 전에 잰 시각입니다. 재구성(rebuild_from_records)보다 먼저 관측한 점수는
+        재구성이 기록에서 이미 셌으므로 저장할 때 버립니다.
+        """
+        at = _as_utc(at) if at is not None else datetime.now(timezone.utc)
+        day = day or at.date()
+        with self._lock:
+            self._pending.append((at, day, score))
+            for scope in (SCOPE_ALL, day_scope(day)):
+                self._histogram(self._view, scope).add(score)
+
+    def _deltas(self, pending: list[tuple[datetime, date, float]]) -> dict[str, ScoreHistogram]:
+        deltas: dict[str, ScoreHistogram] = {}
+        for _, day, score in pending:
+            for scope in (SCOPE_ALL, day_scope(day)):
+                self._histogram(deltas, scope).add(score)
+        return deltas
+
+    def percentile(self, scope: str, score: float) -> tuple[float, int]:
+        """scope 분포에서 score의 백분위와 표본 수를 반환합니다."""
+        with self._lock:
+            histogram = self._view.get(scope)
+            if histogram is None:
+                return 0.0, 0
+            return histogram.percentile(score), histogram.total
+
+    def is_flush_due(self) -> bool:
+        return (
+            len(self._pending) >= settings.sketch_flush_every
+            or time.monotonic() - self._last_flush >= settings.sketch_flush_seconds
+        )
+
+    def ensure_loaded(self, db: Session, scopes: list[str]) -> None:
+        """이 워커에서 아직 한 번도 읽지 않은 스코프만 DB에서 읽어옵니다."""
+        missing = [scope for scope in scopes if scope not in self._loaded]
+        if missing:
+            self.load(db, missing)
+
+    def load(self, db: Session, scopes: list[str]) -> None:
+        """DB에 저장된 스케치에 미저장 변경분을 더해 view를 새로 만듭니다."""
+        rows = db.execute(
+            select(models.FatigueScoreSketch).where(models.FatigueScoreSketch.scope.in_(scopes))
+        ).scalars()
+        stored = {row.scope: ScoreHistogram.from_bytes(row.counts, self.bins) for row in rows}
+        with self._lock:
+            deltas = self._deltas(self._pending)
+            for scope in scopes:
+                view = stored.get(scope) or ScoreHistogram(self.bins)
+                pending = deltas.get(scope)
+                if pending is not None:
+                    view.merge(pending)
+                self._view[scope] = view
+                self._loaded.add(scope)
+
+    def flush(self, db: Session, today: date | None = None) -> None:
+        """
+        이 워커의 변경분을 DB의 스케치에 더해 저장하고, 합쳐진 값을 다시 읽어옵니다.
+        모든 스코프를 한 트랜잭션에서 행 잠금(SELECT ... FOR UPDATE)으로 갱신하므로
+        여러 워커가 동시에 저장해도 개수가 유실되지 않고, 저장에 실패하면 변경분을 되돌려 다음에 다시 저장합니다.
+        """
+        today = today or datetime.now(timezone.utc).date()
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                self._last_flush = time.monotonic()
+
+            try:
+                self._merge_into_db(db, pending)
+            except Exception:
+                db.rollback()
+                self._restore_pending(pending)
+                raise
+
+            self._evict_old_days(today)
+            self.load(db, sorted(set(self._view) | {SCOPE_ALL, day_scope(today)}))
+
+    def _merge_into_db(self, db: Session, pending: list[tuple[datetime, date, float]], retry: bool = True) -> None:
+        if not pending:
+            return
+        sketch = models.FatigueScoreSketch
+        # 스코프 순서대로 잠가 워커끼리 서로 다른 순서로 잠그다 교착되지 않게 합니다.
+        # (재구성 중에는 테이블 잠금 때문에 여기서 기다리므로, 아래에서 읽는 재구성 시각은 항상 최신입니다)
+        rows = {
+            row.scope: row
+            for row in db.execute(
+                select(sketch).where(sketch.scope.in_(self._deltas(pending))).order_by(sketch.scope).with_for_update()
+            ).scalars()
+        }
+        rebuilt_at = db.scalar(select(sketch.updated_at).where(sketch.scope == REBUILT_SCOPE))
+        if rebuilt_at is not None:
+            rebuilt_at = _as_utc(rebuilt_at)
+            kept = [entry for entry in pending if entry[0] >= rebuilt_at]
+            if len(kept) != len(pending):
+                logger.info("Dropped %s sketch updates already counted by the rebuild", len(pending) - len(kept))
+            pending = kept
+        for scope, delta in self._deltas(pending).items():
+            row = rows.get(scope)
+            if row is None:
+                db.add(sketch(scope=scope, counts=delta.to_bytes(), total=delta.total))
+            else:
+                merged = ScoreHistogram.from_bytes(row.counts, self.bins)
+                merged.merge(delta)
+                row.counts = merged.to_bytes()
+                row.total = merged.total
+        try:
+            db.commit()
+        except IntegrityError:
+            # 다른 워커가 같은 스코프 행을 먼저 만든 경우: 한 번 더 시도해 그 행에 더합니다.
+            db.rollback()
+            if not retry:
+                raise
+            self._merge_into_db(db, pending, retry=False)
+
+    def _restore_pending(self, pending: list[tuple[datetime, date, float]]) -> None:
+        """저장하지 못한 변경분을 그 사이 쌓인 변경분 앞에 되돌려 놓습니다. (view에는 이미 반영되어 있음)"""
+        with self._lock:
+            self._pending = pending + self._pending
+
+    def _evict_old_days(self, today: date) -> None:
+        """메모리에는 최근 keep_days 일의 일별 스케치만 남깁니다."""
+        keep = {day_scope(date.fromordinal(today.toordinal() - offset)) for offset in range(self.keep_days)}
+        with self._lock:
+            for scope in [s for s in self._view if s.startswith("day:") and s not in keep]:
+                del self._view[scope]
+                self._loaded.discard(scope)
+
+
+def prune_day_sketches(db: Session, before: date) -> int:
+    """before 이전 날짜의 일별 스케치 행을 지웁니다. (보존 작업에서 같은 트랜잭션으로 호출)"""
+    sketch = models.FatigueScoreSketch
+    # "day:YYYY-MM-DD"는 문자열 순서가 날짜 순서와 같습니다.
+    return db.execute(
+        delete(sketch).where(sketch.scope.startswith("day:"), sketch.scope < day_scope(before)),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+
+
+store = PercentileStore()
+
+
+def flush_if_due(force: bool = False) -> None:
+    """요청 처리 후 백그라운드 작업으로 호출합니다. 저장 시점이 되었을 때만 DB에 접근합니다."""
+    if not (force or store.is_flush_due()):
+        return
+    db = database.SessionLocal()
+    try:
+        store.flush(db)
+    except Exception:
+        logger.exception("Failed to flush fatigue score sketch")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def rebuild_from_records(db: Session, bins: int | None = None, clock=_utc_now) -> int:
+    """
+    기존 기록 전체를 한 번 읽어 스케치를 다시 만듭니다. (최초 도입 시 1회 실행)
+    Postgres에서는 스케치 테이블을 잠가, 끝날 때까지 워커의 저장이 기다리게 합니다.
+    재구성 시각은 기록을 읽기 시작한 뒤에 재므로, 그보다 늦게 관측된 점수는 이번에 읽은 기록에 없습니다.
+    """
+    bins = bins or settings.sketch_bins
+    record = models.EyeFatigueRecord
+    sketch_table = models.FatigueScoreSketch.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"LOCK TABLE {sketch_table.name} IN EXCLUSIVE MODE"))
+    sketches: dict[str, ScoreHistogram] = {}
+    result = db.execute(
+        select(record.fatigue_score, record.created_at).where(record.fatigue_score.is_not(None)),
+        execution_options={"yield_per": settings.export_chunk_size},
+    )
+    rebuilt_at = clock()
+    for score, created_at in result:
+        # 일별 스코프는 세션 시간대가 아니라 UTC 날짜로 나눕니다. (PercentileStore.add와 같은 기준)
+        for scope in (SCOPE_ALL, day_scope(_as_utc(created_at).date())):
+            sketch = sketches.get(scope)
+            if sketch is None:
+                sketch = sketches[scope] = ScoreHistogram(bins)
+            sketch.add(score)
+
+    db.query(models.FatigueScoreSketch).delete()
+    for scope, sketch in sketches.items():
+        db.add(models.FatigueScoreSketch(scope=scope, counts=sketch.to_bytes(), total=sketch.total))
+    db.add(models.FatigueScoreSketch(scope=REBUILT_SCOPE, counts=b"", total=0, updated_at=rebuilt_at))
+    db.commit()
+    return sketches[SCOPE_ALL].total if SCOPE_ALL in sketches else 0
+
+
+if __name__ == "__main__":
+    from .main import app  # noqa: F401  (테이블 생성)
+
+    session = database.SessionLocal()
+    try:
+        print(f"Rebuilt sketches from {rebuild_from_records(session)} records")
+    finally:
+        session.close()
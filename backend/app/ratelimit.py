@@ -0,0 +1,248 @@
+# app/ratelimit.py
+"""
+요청 속도 제한(rate limiting)과 과부하 시 요청 차단(load shedding).
+
+라우터와 DB에 닿기 전에 미들웨어에서 처리합니다.
+- 동시 처리 중인 요청이 max_concurrent_requests를 넘으면 503 + Retry-After
+- 토큰 버킷으로 사용자(JWT sub)별 / IP별 / 로그인·회원가입 IP별 요청 속도를 제한하고, 넘으면 429 + Retry-After
+
+버킷 저장소는 교체할 수 있습니다.
+- MemoryBucketStore: 워커 프로세스 안에서만 공유 (기본값)
+- RedisBucketStore: rate_limit_redis_url을 설정하면 여러 워커가 Redis의 같은 버킷을 Lua 스크립트로 원자적으로 갱신
+"""
+
+import logging
+import math
+import threading
+import time
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+
+from .config import settings
+from .database import token_subject
+
+logger = logging.getLogger(__name__)
+
+AUTH_PATHS = ("/api/auth/login", "/api/auth/register")
+
+
+class BucketRule:
+    """초당 rate 개씩 채워지고 최대 burst 개까지 쌓이는 토큰 버킷 규칙"""
+
+    __slots__ = ("name", "rate", "burst")
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+
+
+class MemoryBucketStore:
+    """프로세스 메모리에 버킷을 보관합니다. 여러 RateLimiter가 같은 인스턴스를 공유할 수 있습니다."""
+
+    def __init__(self, clock=time.monotonic, max_keys: int = 100_000):
+        self.clock = clock
+        self.max_keys = max_keys
+        # 키 -> (남은 토큰, 갱신 시각, 버킷이 다시 가득 차는 시각)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, burst: int, cost: int = 1) -> tuple[bool, float]:
+        """토큰을 cost 개 꺼냅니다. (허용 여부, 허용되지 않았다면 다시 시도할 수 있을 때까지의 초)"""
+        now = self.clock()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (burst, now, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens = min(burst, tokens - cost)
+            if len(self._buckets) >= self.max_keys and key not in self._buckets:
+                self._evict_full(now)
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    async def refund(self, key: str, rate: float, burst: int, cost: int = 1) -> None:
+        """take()로 꺼낸 토큰을 돌려놓습니다. (뒤의 버킷에서 거절된 요청)"""
+        await self.take(key, rate, burst, -cost)
+
+    def _evict_full(self, now: float) -> None:
+        """이미 가득 찬(= 처음 만든 것과 같은) 버킷을 지웁니다."""
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+
+
+# KEYS[1] = 버킷 키, ARGV = rate, burst, cost (음수면 토큰을 돌려놓음)
+# Redis 서버 시각(TIME)을 사용하므로 워커 간 시계 차이의 영향을 받지 않습니다.
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = math.min(burst, tokens - cost)
+    allowed = 1
+else
+    retry = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(retry)}
+"""
+
+
+class RedisBucketStore:
+    """
+    여러 워커가 공유하는 Redis 버킷 저장소.
+    Redis에 연결할 수 없으면 요청을 막지 않고 워커 메모리 버킷(fallback)으로 계속 제한합니다.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:", fallback: MemoryBucketStore | None = None):
+        import redis.asyncio as redis  # 선택 의존성: Redis 저장소를 쓸 때만 필요합니다.
+
+        self.prefix = prefix
+        self.fallback = fallback or MemoryBucketStore()
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_TAKE_SCRIPT)
+        self._error_logged_at = 0.0
+
+    async def take(self, key: str, rate: float, burst: int, cost: int = 1) -> tuple[bool, float]:
+        try:
+            allowed, retry = await self._script(keys=[self.prefix + key], args=[rate, burst, cost])
+        except Exception:
+            now = time.monotonic()
+            if now - self._error_logged_at > 60:
+                logger.exception("Rate limit store unavailable; using per-worker buckets")
+                self._error_logged_at = now
+            return await self.fallback.take(key, rate, burst, cost)
+        return bool(allowed), float(retry)
+
+    async def refund(self, key: str, rate: float, burst: int, cost: int = 1) -> None:
+        await self.take(key, rate, burst, -cost)
+
+
+class RateLimiter:
+    """요청마다 해당하는 버킷에서 토큰을 꺼내고, 동시 처리 요청 수를 셉니다."""
+
+    def __init__(self, store, user_rule: BucketRule, ip_rule: BucketRule, auth_rule: BucketRule,
+                 max_concurrent: int = 0):
+        self.store = store
+        self.user_rule = user_rule
+        self.ip_rule = ip_rule
+        self.auth_rule = auth_rule
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+
+    def rules_for(self, request: Request) -> list[tuple[BucketRule, str]]:
+        """요청에 적용할 (규칙, 버킷 키) 목록"""
+        ip = client_ip(request)
+        rules = []
+        if request.url.path in AUTH_PATHS:
+            rules.append((self.auth_rule, f"auth:{ip}"))
+        subject = token_subject(request)
+        if subject is not None:
+            rules.append((self.user_rule, f"user:{subject}"))
+        rules.append((self.ip_rule, f"ip:{ip}"))
+        return rules
+
+    async def check(self, request: Request) -> float | None:
+        """
+        허용되면 None, 제한에 걸리면 Retry-After로 보낼 초를 반환합니다.
+        뒤의 버킷에서 거절되면 앞에서 꺼낸 토큰은 돌려놓습니다. (거절된 요청이 사용자 한도를 쓰지 않도록)
+        """
+        taken = []
+        for rule, key in self.rules_for(request):
+            if rule.rate <= 0:
+                continue
+            allowed, retry_after = await self.store.take(key, rule.rate, rule.burst)
+            if not allowed:
+                logger.warning("Rate limited %s (%s)", key, rule.name)
+                for taken_rule, taken_key in taken:
+                    await self.store.refund(taken_key, taken_rule.rate, taken_rule.burst)
+                return retry_after
+            taken.append((rule, key))
+        return None
+
+
+def client_ip(request: Request) -> str:
+    """클라이언트 IP. 프록시 뒤(trust_forwarded_for)에서는 X-Forwarded-For의 첫 번째 주소를 사용합니다."""
+    if settings.trust_forwarded_for:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def build_limiter(store=None) -> RateLimiter:
+    """설정값으로 RateLimiter를 만듭니다. store가 없으면 설정에 따라 Redis 또는 메모리 저장소를 사용합니다."""
+    if store is None:
+        store = RedisBucketStore(settings.rate_limit_redis_url) if settings.rate_limit_redis_url else MemoryBucketStore()
+    return RateLimiter(
+        store,
+        user_rule=BucketRule("user", settings.rate_limit_user_per_second, settings.rate_limit_user_burst),
+        ip_rule=BucketRule("ip", settings.rate_limit_ip_per_second, settings.rate_limit_ip_burst),
+        auth_rule=BucketRule("auth", settings.rate_limit_auth_per_second, settings.rate_limit_auth_burst),
+        max_concurrent=settings.max_concurrent_requests,
+    )
+
+
+limiter = build_limiter()
+
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class RateLimitMiddleware:
+    """
+    /api 요청을 과부하 차단(503)과 속도 제한(429)으로 먼저 걸러냅니다.
+    순수 ASGI 미들웨어로 두어, 스트리밍 응답(/export 등)도 본문을 다 보낼 때까지 처리 중으로 셉니다.
+    CORS preflight(OPTIONS)는 제한하지 않습니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.rate_limit_enabled
+            or not scope["path"].startswith("/api/")
+            or scope["method"] == "OPTIONS"
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        current = limiter
+        if current.max_concurrent and current.in_flight >= current.max_concurrent:
+            logger.warning("Shedding load: %s requests in flight", current.in_flight)
+            response = _reject(
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "서버가 혼잡합니다. 잠시 후 다시 시도하세요.",
+                settings.shed_retry_after_seconds,
+            )
+            await response(scope, receive, send)
+            return
+
+        retry_after = await current.check(Request(scope))
+        if retry_after is not None:
+            response = _reject(status.HTTP_429_TOO_MANY_REQUESTS, "요청이 너무 많습니다. 잠시 후 다시 시도하세요.", retry_after)
+            await response(scope, receive, send)
+            return
+
+        # 미들웨어는 이벤트 루프 스레드에서만 실행되므로 잠금 없이 셉니다.
+        current.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current.in_flight -= 1
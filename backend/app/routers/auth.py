@@ -16,34 +16,34 @@ router = APIRouter(
 
 @router.post("/register", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
 def create_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
-    logger.info(f"회원가입 요청 받음: {user.email}") # 로그 추가
+    logger.debug("회원가입 요청 받음: %s", user.email)
 
     db_user = db.query(models.User).filter(models.User.email == user.email).first()
     if db_user:
-        logger.warning(f"이미 존재하는 이메일: {user.email}") # 로그 추가
+        logger.warning("이미 존재하는 이메일: %s", user.email)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
     if len(user.password) < 8:
-        logger.warning(f"비밀번호 길이 부족: {user.email}") # 로그 추가
+        logger.warning("비밀번호 길이 부족: %s", user.email)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Password must be at least 8 characters")
 
     hashed_password = security.get_password_hash(user.password)
     new_user = models.User(email=user.email, name=user.name, hashed_password=hashed_password)
     
-    logger.info(f"DB에 사용자 추가 시도: {user.email}") # 로그 추가
     db.add(new_user)
     
     # 👇 4. db.commit() 부분을 try...except로 감싸고 로그 추가
     try:
         db.commit() # 👈 여기가 문제일 가능성!
-        logger.info(f"DB 커밋 성공: {user.email}") # 커밋 성공 로그
-    except Exception as e:
-        logger.error(f"DB 커밋 실패: {user.email}, 오류: {e}") # 커밋 실패 로그!
+        logger.debug("DB 커밋 성공: %s", user.email)
+    except Exception:
+        logger.exception("DB 커밋 실패: %s", user.email)
         db.rollback() # 오류 발생 시 변경사항 되돌리기
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database commit failed")
 
     db.refresh(new_user)
-    logger.info(f"회원가입 성공 및 응답: {user.email}") # 로그 추가
+    database.read_router.mark_write(new_user.email)
+    logger.info("회원가입 성공: %s", user.email)
     return new_user
 
 @router.post("/login", response_model=schemas.Token)
@@ -1,60 +1,91 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime, timezone
+from functools import partial
+from typing import List, Literal
 
 # database, schemas, models, security를 정확히 임포트합니다.
-from .. import database, schemas, models, security
+from .. import database, ingest, schemas, models, security, percentiles
+from ..body_formats import CompactRoute
+from ..config import settings
+from ..export import MEDIA_TYPES, iter_record_chunks, stream_export
+from ..partitions import recent_cutoff
+from ..responses import FastJSONResponse, record_rows_to_dicts, select_record_rows
 
 router = APIRouter(
     prefix="/api/eye-fatigue",  # 👈 '/api/fatigue' -> '/api/eye-fatigue'로 수정!
-    tags=['Fatigue']
+    tags=['Fatigue'],
+    route_class=CompactRoute,  # JSON/MessagePack 본문과 gzip/zstd 압축 지원
 )
 
 @router.post("/", response_model=schemas.Record, summary="눈 피로도 기록 생성")
 def create_fatigue_record(
     data: schemas.FatigueDataInput, # AI 연동 전 임시 입력 스키마
+    response: Response,
+    background_tasks: BackgroundTasks,
+    idempotency_key: str | None = Header(default=None, max_length=100),
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(security.get_current_user)
 ):
     """
-    (AI 연동 전 임시)
-    현재 로그인된 사용자의 눈 피로도 데이터를 계산하고 저장합니다.
+    현재 로그인된 사용자의 눈 피로도 데이터를 저장합니다.
+    Idempotency-Key 헤더(또는 본문의 idempotency_key / window_start)를 보내면,
+    같은 키로 다시 보낸 요청은 새로 저장하지 않고 처음 저장된 기록을 반환합니다.
     """
-    # 임시 계산 로직 (AI 연동 시 변경 필요)
-    # fatigue_score = data.blink_speed * 0.5 + data.iris_dilation * 0.3
-
-    # seed.py와 유사하게 status 임시 생성
-    # status_text = "양호함 😊" if fatigue_score < 3.5 else "주의 필요 😐"
-
-    db_record = models.EyeFatigueRecord(
-        user_id=current_user.id,
-        
-        fatigue_score=data.health_score,  # AI의 health_score -> DB의 fatigue_score
-        status=data.status,             # AI의 status -> DB의 status
-        blink_speed=data.bpm,           # AI의 bpm -> DB의 blink_speed
-        
-        # AI가 보내는 max_stable_gaze_time을 eye_movement_pattern 칸에 저장
-        eye_movement_pattern=f"Gaze_Time: {data.max_stable_gaze_time}",
-        
-        # AI가 안 보내는 값 (기본값 0.0으로 채움)
-        iris_dilation=0.0
-    )   
-    db.add(db_record)
-    db.commit()
-    db.refresh(db_record) # DB에서 생성된 id, created_at 등을 포함하여 반환
-    return db_record
+    observed_at = datetime.now(timezone.utc)  # 저장 전에 잰 시각 (스케치 재구성과 겹치지 않게 판별)
+    record, created = ingest.ingest_one(db, current_user.id, data, idempotency_key)
+    database.read_router.mark_write(current_user.email)
+    if not created:
+        if record is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="이미 처리된 요청입니다.")
+        response.headers["Idempotent-Replayed"] = "true"
+        return record
 
-@router.get("/result", response_model=schemas.FatigueResult, summary="최근 내 진단 결과 조회")
-def get_my_latest_fatigue_result(
+    # 백분위 스케치 갱신 (메모리), DB 저장은 응답 후 주기적으로
+    percentiles.store.add(data.health_score, at=observed_at)
+    background_tasks.add_task(percentiles.flush_if_due)
+    return record
+
+@router.post("/bulk", response_model=schemas.BulkIngestResult, summary="눈 피로도 기록 여러 건 저장")
+def create_fatigue_records_bulk(
+    items: List[schemas.FatigueDataInput],
+    background_tasks: BackgroundTasks,
     db: Session = Depends(database.get_db),
     current_user: models.User = Depends(security.get_current_user)
+):
+    """
+    밀린 기록(backlog)을 한 번에 저장합니다.
+    idempotency_key / window_start가 이미 저장된 항목은 건너뛰므로, 전체를 다시 보내도 안전합니다.
+    """
+    observed_at = datetime.now(timezone.utc)
+    created, duplicates = ingest.ingest_many(db, current_user.id, items)
+    database.read_router.mark_write(current_user.email)
+    for _, score in created:
+        percentiles.store.add(score, at=observed_at)
+    background_tasks.add_task(percentiles.flush_if_due)
+    return schemas.BulkIngestResult(
+        created=len(created),
+        duplicates=duplicates,
+        record_ids=[record_id for record_id, _ in created],
+    )
+
+@router.get("/result", response_model=schemas.FatigueResult, summary="최근 내 진단 결과 조회")
+def get_my_latest_fatigue_result(
+    db: Session = Depends(database.get_read_db),
+    current_user: models.User = Depends(security.get_current_user_read)
 ):
     """
     현재 로그인된 사용자의 가장 최근 눈 피로도 진단 결과를 반환합니다.
     """
-    record = db.query(models.EyeFatigueRecord).filter(
+    query = db.query(models.EyeFatigueRecord).filter(
         models.EyeFatigueRecord.user_id == current_user.id
-    ).order_by(models.EyeFatigueRecord.created_at.desc()).first()
+    ).order_by(models.EyeFatigueRecord.created_at.desc())
+
+    # 최근 파티션부터 확인하고, 없을 때만 전체 기간을 조회합니다.
+    record = query.filter(models.EyeFatigueRecord.created_at >= recent_cutoff()).first()
+    if not record:
+        record = query.first()
 
     if not record:
         raise HTTPException(status_code=404, detail="진단 기록을 찾을 수 없습니다.")
@@ -71,36 +102,102 @@ def get_my_latest_fatigue_result(
         created_at=record.created_at
     )
 
+@router.get("/percentile", response_model=schemas.PercentileResult, summary="내 최근 점수의 백분위 조회")
+def get_my_score_percentile(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(database.get_read_db),
+    current_user: models.User = Depends(security.get_current_user_read)
+):
+    """
+    가장 최근 진단 점수가 전체 사용자 / 오늘 기록 중 몇 번째 백분위인지 반환합니다.
+    기록 테이블을 훑지 않고, 서버가 유지하는 점수 분포 스케치로 계산합니다.
+    """
+    record = db.query(models.EyeFatigueRecord).filter(
+        models.EyeFatigueRecord.user_id == current_user.id,
+        models.EyeFatigueRecord.fatigue_score.is_not(None),
+    ).order_by(models.EyeFatigueRecord.created_at.desc()).first()
+
+    if not record:
+        raise HTTPException(status_code=404, detail="진단 기록을 찾을 수 없습니다.")
+
+    today_scope = percentiles.day_scope(datetime.now(timezone.utc).date())
+    percentiles.store.ensure_loaded(db, [percentiles.SCOPE_ALL, today_scope])
+    percentile_all, size_all = percentiles.store.percentile(percentiles.SCOPE_ALL, record.fatigue_score)
+    percentile_today, size_today = percentiles.store.percentile(today_scope, record.fatigue_score)
+    background_tasks.add_task(percentiles.flush_if_due)
+
+    return schemas.PercentileResult(
+        fatigue_score=record.fatigue_score,
+        created_at=record.created_at,
+        percentile_all=round(percentile_all, 1),
+        sample_size_all=size_all,
+        percentile_today=round(percentile_today, 1),
+        sample_size_today=size_today,
+    )
+
 @router.get("/history", response_model=List[schemas.Record], summary="내 모든 진단 기록 조회")
 def get_my_fatigue_history(
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(security.get_current_user)
+    db: Session = Depends(database.get_read_db),
+    current_user: models.User = Depends(security.get_current_user_read)
 ):
     """
     현재 로그인된 사용자의 모든 과거 눈 피로도 진단 기록을 시간순으로 반환합니다.
     """
-    records = db.query(models.EyeFatigueRecord).filter(
-        models.EyeFatigueRecord.user_id == current_user.id
-    ).order_by(models.EyeFatigueRecord.created_at.desc()).all()
+    # ORM 객체/응답 재검증 없이 컬럼 튜플을 바로 JSON으로 직렬화합니다. (app/responses.py)
+    record = models.EyeFatigueRecord
+    rows = db.execute(
+        select_record_rows().where(record.user_id == current_user.id).order_by(record.created_at.desc())
+    ).all()
+
+    return FastJSONResponse(record_rows_to_dicts(rows))
 
-    return records
+@router.get("/export", summary="진단 기록 스트리밍 내보내기")
+def export_fatigue_records(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    gzip: bool = False,
+    scope: Literal["me", "all"] = "me",
+    current_user: models.User = Depends(security.get_current_user_read)
+):
+    """
+    진단 기록을 NDJSON 또는 CSV로 스트리밍합니다.
+    서버 측 커서로 일정 크기씩 읽어 보내므로 기록 수와 관계없이 메모리 사용량이 일정합니다.
+    scope=all 은 관리자(admin_emails)만 사용할 수 있습니다.
+    """
+    if scope == "all" and current_user.email.lower() not in settings.admin_email_set:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="전체 기록 내보내기 권한이 없습니다.")
+
+    user_id = None if scope == "all" else current_user.id
+    filename = f"eye_fatigue_records.{fmt}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    session_factory = partial(database.read_router.session, current_user.email)
+    chunks = iter_record_chunks(user_id, settings.export_chunk_size, session_factory)
+    return StreamingResponse(
+        stream_export(chunks, fmt, compress=gzip),
+        media_type=MEDIA_TYPES[fmt],
+        headers=headers,
+    )
 
 # 👇 [추가] 프론트엔드가 요청한 '상세 조회 API'
 @router.get("/{record_id}", response_model=schemas.Record, summary="특정 진단 기록 상세 조회")
 def get_specific_record(
     record_id: int,
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(security.get_current_user)
+    db: Session = Depends(database.get_read_db),
+    current_user: models.User = Depends(security.get_current_user_read)
 ):
     """
     id를 기준으로 특정 진단 기록 1개를 조회합니다.
     """
-    record = db.query(models.EyeFatigueRecord).filter(
-        models.EyeFatigueRecord.id == record_id,
-        models.EyeFatigueRecord.user_id == current_user.id # 본인 기록만 조회 권한 확인
+    row = db.execute(
+        select_record_rows().where(
+            models.EyeFatigueRecord.id == record_id,
+            models.EyeFatigueRecord.user_id == current_user.id # 본인 기록만 조회 권한 확인
+        )
     ).first()
 
-    if not record:
+    if not row:
         raise HTTPException(status_code=404, detail="해당 기록을 찾을 수 없거나 권한이 없습니다.")
 
-    return record
\ No newline at end of file
+    return FastJSONResponse(record_rows_to_dicts([row])[0])
\ No newline at end of file
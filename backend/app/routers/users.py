@@ -8,7 +8,7 @@ router = APIRouter(
 )
 
 @router.get("/me", response_model=schemas.UserResponse)
-def read_users_me(current_user: models.User = Depends(security.get_current_user)):
+def read_users_me(current_user: models.User = Depends(security.get_current_user_read)):
     """
     현재 로그인된 사용자의 정보를 반환합니다.
     요청 시 헤더에 "Authorization: Bearer <토큰값>"이 포함되어야 합니다.
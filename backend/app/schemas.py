@@ -1,6 +1,6 @@
 # app/schemas.py
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 
 # --- 사용자 및 인증 관련 스키마 ---
@@ -42,14 +42,14 @@ class FatigueResult(BaseModel):
         from_attributes = True
 
 class Record(BaseModel):
-    """과거 진단 기록 전체를 조회하기 위한 응답 스키마"""
+    """과거 진단 기록 전체를 조회하기 위한 응답 스키마 (DB에서 NULL을 허용하는 컬럼은 None일 수 있습니다)"""
     id: int
     user_id: int
-    fatigue_score: float
-    blink_speed: float
-    iris_dilation: float
-    eye_movement_pattern: str
-    created_at: datetime
+    fatigue_score: float | None = None
+    blink_speed: float | None = None
+    iris_dilation: float | None = None
+    eye_movement_pattern: str | None = None
+    created_at: datetime | None = None
     
     # 👇 "status" 필드 추가
     status: str | None = None  
@@ -63,3 +63,22 @@ class FatigueDataInput(BaseModel):
     max_stable_gaze_time: float
     health_score: float
     status: str
+
+    # 재전송 시 중복 저장을 막기 위한 값 (둘 중 하나를 보내면 같은 기록은 한 번만 저장됩니다)
+    idempotency_key: str | None = Field(default=None, max_length=100)
+    window_start: datetime | None = None
+
+class BulkIngestResult(BaseModel):
+    """여러 기록을 한 번에 저장한 결과"""
+    created: int
+    duplicates: int
+    record_ids: list[int]
+
+class PercentileResult(BaseModel):
+    """내 최근 점수가 전체/오늘 사용자 중 몇 번째 백분위인지 보여주는 응답 스키마"""
+    fatigue_score: float
+    created_at: datetime
+    percentile_all: float
+    sample_size_all: int
+    percentile_today: float
+    sample_size_today: int
@@ -1,7 +1,7 @@
 # app/security.py
 
 from datetime import datetime, timedelta
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -33,24 +33,45 @@ def create_access_token(data: dict) -> str:
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)) -> models.User:
-    """
-    요청 헤더의 토큰을 검증하고, 해당 토큰의 사용자 정보를 반환합니다.
-    """
-    credentials_exception = HTTPException(
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _load_user(db: Session, email: str | None) -> models.User:
+    """토큰의 sub(이메일)로 사용자를 찾습니다. 없으면 401을 반환합니다."""
+    if email is None:
+        raise _credentials_exception()
+    user = db.query(models.User).filter(models.User.email == email).first()
+    if user is None:
+        raise _credentials_exception()
+    return user
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)) -> models.User:
+    """
+    요청 헤더의 토큰을 검증하고, 해당 토큰의 사용자 정보를 반환합니다.
+    """
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+        raise _credentials_exception()
+    return _load_user(db, payload.get("sub"))
+
+
+def get_current_user_read(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(database.get_read_db),
+) -> models.User:
+    """
+    get_current_user와 같지만 사용자 조회를 읽기 복제본(get_read_db)에서 합니다.
+    조회(GET) 라우트에서 사용하면 엔드포인트와 같은 조회용 세션을 공유합니다.
+    토큰은 get_read_db가 라우팅하면서 검증한 결과(token_subject)를 그대로 씁니다.
+    (token은 Authorization 헤더가 없을 때 401을 돌려주기 위해 받습니다.)
+    """
+    return _load_user(db, database.token_subject(request))
@@ -0,0 +1,97 @@
+# benchmarks/bench_payload_formats.py
+"""
+진단 기록 bulk 업로드 본문의 크기와 서버 측 해석 CPU 시간을 형식/압축별로 비교합니다.
+서버 해석 = 압축 해제 + 디코딩(JSON / MessagePack) + FatigueDataInput 검증
+
+    cd backend
+    python -m benchmarks.bench_payload_formats --batch 1 60 3600
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import msgpack
+import zstandard
+from pydantic import TypeAdapter
+
+from app.body_formats import decompress
+from app.schemas import FatigueDataInput
+
+ITEMS = TypeAdapter(list[FatigueDataInput])
+LIMIT = 1 << 30
+
+ENCODERS = {
+    "json": lambda items: json.dumps(items, ensure_ascii=False, default=str).encode("utf-8"),
+    "msgpack": lambda items: msgpack.packb(items, datetime=True),
+}
+DECODERS = {
+    "json": json.loads,
+    "msgpack": lambda body: msgpack.unpackb(body, timestamp=3),
+}
+COMPRESSORS = {
+    "identity": lambda body: body,
+    "gzip": gzip.compress,
+    "zstd": lambda body: zstandard.ZstdCompressor().compress(body),
+}
+
+
+def generate_items(count, rng):
+    """1분 간격의 분석 결과 (eye_tracker가 보내는 형식)"""
+    start = datetime(2025, 10, 1, tzinfo=timezone.utc)
+    statuses = ["양호함 😊", "주의 필요 😐", "매우 나쁨 😵"]
+    return [
+        {
+            "bpm": rng.randint(3, 30),
+            "max_stable_gaze_time": round(rng.uniform(0, 60), 2),
+            "health_score": round(rng.uniform(0, 100), 2),
+            "status": rng.choice(statuses),
+            "window_start": start + timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+
+def parse(body, fmt, encoding):
+    return ITEMS.validate_python(DECODERS[fmt](decompress(body, encoding, LIMIT)))
+
+
+def time_parse(body, fmt, encoding, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        parse(body, fmt, encoding)
+    return (time.process_time() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 60, 1440])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for batch in args.batch:
+        items = generate_items(batch, rng)
+        repeat = max(5, args.repeat * 60 // max(batch, 60))
+        print(f"batch={batch:,} records (repeat={repeat})")
+        print(f"{'format':>8} {'encoding':>9} {'bytes':>9} {'ratio':>6} {'parse us':>9} {'us/record':>10}")
+        baseline = None
+        for fmt, encode in ENCODERS.items():
+            for encoding, compress in COMPRESSORS.items():
+                body = compress(encode(items))
+                baseline = baseline or len(body)
+                parse_us = time_parse(body, fmt, encoding, repeat)
+                print(
+                    f"{fmt:>8} {encoding:>9} {len(body):>9,} {len(body) / baseline:>6.2f} "
+                    f"{parse_us:>9.1f} {parse_us / batch:>10.2f}"
+                )
+        print()
+    print("(ratio = 크기 / json identity 크기, parse = 압축 해제 + 디코딩 + 검증 CPU 시간)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_percentiles.py
+"""
+피로도 점수 백분위 스케치(ScoreHistogram)의 정확도와 속도를 정확한 계산과 비교합니다.
+
+    cd backend
+    python -m benchmarks.bench_percentiles --records 1000000
+"""
+
+import argparse
+import bisect
+import random
+import time
+
+from app.percentiles import ScoreHistogram
+
+
+def exact_percentile(sorted_scores, score):
+    below = bisect.bisect_left(sorted_scores, score)
+    equal = bisect.bisect_right(sorted_scores, score) - below
+    return 100.0 * (below + equal / 2) / len(sorted_scores)
+
+
+def scan_percentile(scores, score):
+    """읽기 시점에 전체 기록을 훑는 방식 (현재 방식에 해당)"""
+    below = equal = 0
+    for value in scores:
+        if value < score:
+            below += 1
+        elif value == score:
+            equal += 1
+    return 100.0 * (below + equal / 2) / len(scores)
+
+
+def generate_scores(count, rng):
+    """양호/주의/나쁨 사용자가 섞인 0~100 점수 분포"""
+    scores = []
+    for _ in range(count):
+        center = rng.choice((80, 55, 25))
+        scores.append(round(min(100.0, max(0.0, rng.gauss(center, 12))), 1))
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--bins", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    scores = generate_scores(args.records, rng)
+    queries = [rng.choice(scores) for _ in range(args.queries)]
+    sorted_scores = sorted(scores)
+    exact = [exact_percentile(sorted_scores, q) for q in queries]
+
+    start = time.perf_counter()
+    for q in queries[:20]:
+        scan_percentile(scores, q)
+    scan_us = (time.perf_counter() - start) / 20 * 1e6
+    print(f"records={args.records:,} queries={args.queries:,}")
+    print(f"exact full scan: {scan_us:,.0f} us/query")
+    print()
+    print(f"{'bins':>6} {'update us':>10} {'query us':>9} {'max err':>8} {'mean err':>9} {'size KB':>8}")
+
+    for bins in args.bins:
+        histogram = ScoreHistogram(bins)
+        start = time.perf_counter()
+        for score in scores:
+            histogram.add(score)
+        update_us = (time.perf_counter() - start) / len(scores) * 1e6
+
+        start = time.perf_counter()
+        estimates = [histogram.percentile(q) for q in queries]
+        query_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+        errors = [abs(a - b) for a, b in zip(estimates, exact)]
+        print(
+            f"{bins:>6} {update_us:>10.2f} {query_us:>9.2f} {max(errors):>8.3f} "
+            f"{sum(errors) / len(errors):>9.4f} {len(histogram.to_bytes()) / 1024:>8.1f}"
+        )
+    print("\n(err = |sketch percentile - exact percentile|, percentile points)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/bench_record_serialization.py
+"""
+/history 응답을 만드는 비용을 기존 경로와 빠른 경로(app/responses.py)로 비교합니다. (기록 10k건당)
+
+- 기존: ORM 엔티티 조회 -> List[Record] from_attributes 검증 -> mode="json" 직렬화 -> json.dumps
+  (FastAPI가 response_model로 응답을 만들 때와 같은 단계)
+- 빠른 경로: 컬럼 튜플 조회 -> dict -> orjson.dumps
+
+    cd backend
+    python -m benchmarks.bench_record_serialization --records 10000
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app import models, schemas
+from app.database import Base
+from app.responses import FastJSONResponse, record_rows_to_dicts, select_record_rows
+
+RECORDS = TypeAdapter(List[schemas.Record])
+
+
+def populate(session, count, rng):
+    session.add(models.User(id=1, email="bench@example.com", name="bench", hashed_password="x"))
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    session.execute(
+        models.EyeFatigueRecord.__table__.insert(),
+        [
+            {
+                "user_id": 1,
+                "fatigue_score": round(rng.uniform(0, 100), 1),
+                "status": rng.choice(["양호함 😊", "주의 필요 😐", "매우 나쁨 😵"]),
+                "blink_speed": float(rng.randint(3, 30)),
+                "iris_dilation": 0.0,
+                "eye_movement_pattern": f"Gaze_Time: {rng.uniform(0, 60):.2f}",
+                "created_at": start + timedelta(minutes=i),
+            }
+            for i in range(count)
+        ],
+    )
+    session.commit()
+
+
+def current_path(session):
+    record = models.EyeFatigueRecord
+    rows = session.execute(
+        select(record).where(record.user_id == 1).order_by(record.created_at.desc())
+    ).scalars().all()
+    fetched = time.perf_counter()
+    content = RECORDS.dump_python(RECORDS.validate_python(rows, from_attributes=True), mode="json")
+    body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return fetched, body
+
+
+def fast_path(session):
+    record = models.EyeFatigueRecord
+    rows = session.execute(
+        select_record_rows().where(record.user_id == 1).order_by(record.created_at.desc())
+    ).all()
+    fetched = time.perf_counter()
+    body = FastJSONResponse(record_rows_to_dicts(rows)).body
+    return fetched, body
+
+
+def measure(path, session_factory, repeat):
+    fetch = serialize = 0.0
+    body = b""
+    for _ in range(repeat):
+        session = session_factory()
+        start = time.perf_counter()
+        fetched, body = path(session)
+        done = time.perf_counter()
+        session.close()
+        fetch += fetched - start
+        serialize += done - fetched
+    return fetch / repeat, serialize / repeat, body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as session:
+        populate(session, args.records, random.Random(args.seed))
+
+    per_10k = 10_000 / args.records * 1000
+    print(f"records={args.records:,} repeat={args.repeat} (ms per 10k records)")
+    print(f"{'path':>8} {'fetch':>8} {'serialize':>10} {'total':>8} {'bytes':>11}")
+    bodies = {}
+    for name, path in (("current", current_path), ("fast", fast_path)):
+        fetch, serialize, body = measure(path, session_factory, args.repeat)
+        bodies[name] = body
+        print(f"{name:>8} {fetch * per_10k:>8.1f} {serialize * per_10k:>10.1f} "
+              f"{(fetch + serialize) * per_10k:>8.1f} {len(body):>11,}")
+    same = json.loads(bodies["current"]) == json.loads(bodies["fast"])
+    print(f"\nresponses identical: {same}")
+
+
+if __name__ == "__main__":
+    main()
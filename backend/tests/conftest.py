@@ -0,0 +1,35 @@
+# tests/conftest.py
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from app import ratelimit
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiter(monkeypatch):
+    """테스트마다 비어 있는 속도 제한 버킷으로 시작합니다. (모든 요청이 같은 IP에서 오므로)"""
+    monkeypatch.setattr(ratelimit, "limiter", ratelimit.build_limiter(ratelimit.MemoryBucketStore()))
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def register_and_login(client, email=None, password="password123"):
+    """테스트용 사용자를 만들고 인증 헤더를 반환합니다."""
+    email = email or f"user-{uuid.uuid4().hex[:12]}@example.com"
+    client.post(
+        "/api/auth/register",
+        json={"email": email, "password": password, "name": "Test User"},
+    )
+    response = client.post("/api/auth/login", data={"username": email, "password": password})
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def auth_headers(client):
+    return register_and_login(client)
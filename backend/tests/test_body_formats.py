@@ -0,0 +1,165 @@
+# tests/test_body_formats.py
+import gzip
+import json
+
+import msgpack
+import pytest
+import zstandard
+from datetime import datetime, timezone
+
+SAMPLE = {"bpm": 12, "max_stable_gaze_time": 4.5, "health_score": 72.0, "status": "양호함 😊"}
+
+
+def _headers(auth_headers, content_type, encoding=None):
+    headers = {**auth_headers, "Content-Type": content_type}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return headers
+
+
+@pytest.mark.parametrize("encoding, compress", [
+    (None, lambda data: data),
+    ("gzip", gzip.compress),
+    ("zstd", lambda data: zstandard.ZstdCompressor().compress(data)),
+])
+def test_msgpack_upload(client, auth_headers, encoding, compress):
+    """MessagePack 본문을 압축 여부와 관계없이 JSON과 같게 처리합니다."""
+    body = compress(msgpack.packb(SAMPLE))
+    response = client.post("/api/eye-fatigue/", content=body,
+                           headers=_headers(auth_headers, "application/msgpack", encoding))
+    assert response.status_code == 200
+    assert response.json()["status"] == SAMPLE["status"]
+    assert response.json()["blink_speed"] == 12
+
+
+def test_gzip_json_bulk_upload(client, auth_headers):
+    """gzip으로 압축한 JSON bulk 업로드"""
+    items = [{**SAMPLE, "bpm": i} for i in range(50)]
+    body = gzip.compress(json.dumps(items).encode("utf-8"))
+    response = client.post("/api/eye-fatigue/bulk", content=body,
+                           headers=_headers(auth_headers, "application/json", "gzip"))
+    assert response.status_code == 200
+    assert response.json()["created"] == 50
+
+
+def test_msgpack_timestamp_window_start(client, auth_headers):
+    """MessagePack Timestamp 확장 타입도 window_start(datetime)로 해석됩니다."""
+    window = datetime(2025, 10, 16, 21, 38, tzinfo=timezone.utc)
+    body = msgpack.packb({**SAMPLE, "window_start": window}, datetime=True)
+    headers = _headers(auth_headers, "application/msgpack")
+    first = client.post("/api/eye-fatigue/", content=body, headers=headers)
+    retry = client.post("/api/eye-fatigue/", content=body, headers=headers)
+    assert first.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+
+
+def test_unsupported_encoding_is_rejected(client, auth_headers):
+    response = client.post("/api/eye-fatigue/", content=msgpack.packb(SAMPLE),
+                           headers=_headers(auth_headers, "application/msgpack", "br"))
+    assert response.status_code == 415
+
+
+def test_corrupt_body_is_bad_request(client, auth_headers):
+    response = client.post("/api/eye-fatigue/", content=b"\xc1\xc1\xc1",
+                           headers=_headers(auth_headers, "application/msgpack", None))
+    assert response.status_code == 400
+
+
+def test_decompressed_size_is_limited(client, auth_headers, monkeypatch):
+    """압축 해제 크기 제한을 넘는 본문은 413으로 거절합니다."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "max_decompressed_body_bytes", 1024)
+    body = gzip.compress(json.dumps([SAMPLE] * 100).encode("utf-8"))
+    response = client.post("/api/eye-fatigue/bulk", content=body,
+                           headers=_headers(auth_headers, "application/json", "gzip"))
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("encoding, body", [
+    ("gzip", gzip.compress(json.dumps(SAMPLE).encode("utf-8"))[:-8]),  # 잘린 본문
+    ("gzip", gzip.compress(json.dumps(SAMPLE).encode("utf-8")) + b"junk"),  # 뒤에 붙은 데이터
+    ("gzip", b"not gzip at all"),
+    ("zstd", zstandard.ZstdCompressor().compress(json.dumps(SAMPLE).encode("utf-8"))[:-4]),
+])
+def test_truncated_or_corrupt_compressed_body_is_bad_request(client, auth_headers, encoding, body):
+    """잘리거나 손상된 압축 본문은 400으로 거절합니다."""
+    response = client.post("/api/eye-fatigue/", content=body,
+                           headers=_headers(auth_headers, "application/json", encoding))
+    assert response.status_code == 400
+
+
+def test_uncompressed_size_is_limited(client, auth_headers, monkeypatch):
+    """압축하지 않은 본문에도 같은 크기 제한을 적용합니다."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "max_decompressed_body_bytes", 1024)
+    response = client.post("/api/eye-fatigue/bulk", content=json.dumps([SAMPLE] * 100).encode("utf-8"),
+                           headers=_headers(auth_headers, "application/json"))
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("encoding, compress", [
+    ("gzip", gzip.compress),
+    ("zstd", lambda data: zstandard.ZstdCompressor().compress(data)),
+])
+def test_decoder_stops_at_limit_while_decompressing(encoding, compress):
+    """압축 폭탄은 끝까지 풀지 않고, 허용량을 조금 넘는 시점에 거절합니다."""
+    from fastapi import HTTPException
+
+    from app.body_formats import BodyDecoder
+
+    bomb = compress(b"\0" * (64 * 1024 * 1024))
+    decoder = BodyDecoder(encoding, 1024)
+    with pytest.raises(HTTPException) as error:
+        for start in range(0, len(bomb), 4096):
+            decoder.feed(bomb[start:start + 4096])
+    assert error.value.status_code == 413
+    assert decoder.size < 1024 + 512 * 1024
+
+
+@pytest.mark.parametrize("encoding, compress", [
+    ("gzip", gzip.compress),
+    ("zstd", lambda data: zstandard.ZstdCompressor().compress(data)),
+])
+def test_decoder_handles_body_split_into_chunks(encoding, compress):
+    from app.body_formats import BodyDecoder
+
+    data = json.dumps([SAMPLE] * 200).encode("utf-8")
+    body = compress(data)
+    decoder = BodyDecoder(encoding, len(data))
+    parts = [decoder.feed(body[start:start + 7]) for start in range(0, len(body), 7)]
+    decoder.finish()
+    assert b"".join(parts) == data
+
+
+def test_large_content_length_is_rejected_before_reading(monkeypatch):
+    """Content-Length가 제한을 넘으면 본문을 읽지 않고 413으로 거절합니다."""
+    import asyncio
+
+    from fastapi import HTTPException
+
+    from app.body_formats import CompactRequest
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "max_decompressed_body_bytes", 1024)
+
+    async def receive():
+        raise AssertionError("본문을 읽으면 안 됩니다.")
+
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": [(b"content-length", b"4096")]}
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(CompactRequest(scope, receive).body())
+    assert error.value.status_code == 413
+
+
+def test_chunked_body_without_content_length_is_limited(client, auth_headers, monkeypatch):
+    """Content-Length 없이(chunked) 보낸 본문도 받는 동안 크기를 세어 거절합니다."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "max_decompressed_body_bytes", 1024)
+    body = gzip.compress(json.dumps([SAMPLE] * 100).encode("utf-8"), compresslevel=0)
+    chunks = iter([body[start:start + 256] for start in range(0, len(body), 256)])
+    response = client.post("/api/eye-fatigue/bulk", content=chunks,
+                           headers=_headers(auth_headers, "application/json", "gzip"))
+    assert response.status_code == 413
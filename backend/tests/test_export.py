@@ -0,0 +1,77 @@
+# tests/test_export.py
+import csv
+import gzip
+import io
+import json
+
+from app.config import settings
+from app.export import stream_export
+from conftest import register_and_login
+
+SAMPLE = {"bpm": 12, "max_stable_gaze_time": 4.5, "health_score": 72.0, "status": "양호함 😊"}
+
+
+def _post_records(client, headers, count):
+    for i in range(count):
+        response = client.post("/api/eye-fatigue/", json={**SAMPLE, "bpm": i}, headers=headers)
+        assert response.status_code == 200
+
+
+def test_export_ndjson(client, auth_headers):
+    """NDJSON 내보내기는 본인 기록만 한 줄에 하나씩 반환합니다."""
+    _post_records(client, auth_headers, 3)
+    response = client.get("/api/eye-fatigue/export", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["blink_speed"] for row in rows] == [0, 1, 2]
+    assert len({row["user_id"] for row in rows}) == 1
+    assert rows[0]["status"] == "양호함 😊"
+
+
+def test_export_csv_gzip(client, auth_headers):
+    """CSV + gzip 내보내기는 헤더 행을 포함한 압축 스트림을 반환합니다."""
+    _post_records(client, auth_headers, 2)
+    response = client.get(
+        "/api/eye-fatigue/export",
+        params={"format": "csv", "gzip": "true"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0][0] == "id"
+    assert len(rows) == 3
+
+
+def test_export_all_requires_admin(client, auth_headers):
+    """관리자가 아니면 전체 기록 내보내기가 거부됩니다."""
+    response = client.get("/api/eye-fatigue/export", params={"scope": "all"}, headers=auth_headers)
+    assert response.status_code == 403
+
+
+def test_export_all_for_admin(client, monkeypatch):
+    """관리자는 모든 사용자의 기록을 내보낼 수 있습니다."""
+    admin_email = "admin-export@example.com"
+    monkeypatch.setattr(settings, "admin_emails", admin_email)
+    admin_headers = register_and_login(client, email=admin_email)
+    user_ids = set()
+    for _ in range(2):
+        user_headers = register_and_login(client)
+        _post_records(client, user_headers, 1)
+        user_ids.add(client.get("/api/users/me", headers=user_headers).json()["id"])
+
+    response = client.get("/api/eye-fatigue/export", params={"scope": "all"}, headers=admin_headers)
+    assert response.status_code == 200
+    exported = {json.loads(line)["user_id"] for line in response.text.splitlines()}
+    assert user_ids <= exported
+
+
+def test_stream_export_gzip_chunks_decompress():
+    """chunk 단위로 압축된 스트림을 이어 붙이면 하나의 gzip 파일이 됩니다."""
+    chunks = iter([[(1, 1, 50.0, "ok", 10.0, 0.0, "p", None)]] * 3)
+    body = b"".join(stream_export(chunks, "ndjson", compress=True))
+    lines = gzip.decompress(body).decode("utf-8").splitlines()
+    assert len(lines) == 3
@@ -0,0 +1,105 @@
+# tests/test_idempotency.py
+import uuid
+
+SAMPLE = {"bpm": 12, "max_stable_gaze_time": 4.5, "health_score": 72.0, "status": "양호함 😊"}
+
+
+def _history_size(client, headers):
+    return len(client.get("/api/eye-fatigue/history", headers=headers).json())
+
+
+def test_retry_with_idempotency_header_returns_same_record(client, auth_headers):
+    """같은 Idempotency-Key로 다시 보내면 새로 저장하지 않고 처음 기록을 돌려줍니다."""
+    headers = {**auth_headers, "Idempotency-Key": uuid.uuid4().hex}
+    first = client.post("/api/eye-fatigue/", json=SAMPLE, headers=headers)
+    retry = client.post("/api/eye-fatigue/", json=SAMPLE, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert _history_size(client, auth_headers) == 1
+
+
+def test_window_start_is_natural_key(client, auth_headers):
+    """idempotency_key가 없으면 window_start가 중복 판별 키가 됩니다."""
+    body = {**SAMPLE, "window_start": "2025-10-16T21:38:00+00:00"}
+    first = client.post("/api/eye-fatigue/", json=body, headers=auth_headers)
+    second = client.post("/api/eye-fatigue/", json=body, headers=auth_headers)
+    assert second.json()["id"] == first.json()["id"]
+
+    other = client.post("/api/eye-fatigue/", json={**body, "window_start": "2025-10-16T21:39:00+00:00"},
+                        headers=auth_headers)
+    assert other.json()["id"] != first.json()["id"]
+    assert _history_size(client, auth_headers) == 2
+
+
+def test_keys_are_scoped_per_user(client, auth_headers):
+    """같은 키라도 사용자가 다르면 각각 저장됩니다."""
+    from conftest import register_and_login
+
+    key = uuid.uuid4().hex
+    other_headers = register_and_login(client)
+    mine = client.post("/api/eye-fatigue/", json={**SAMPLE, "idempotency_key": key}, headers=auth_headers)
+    theirs = client.post("/api/eye-fatigue/", json={**SAMPLE, "idempotency_key": key}, headers=other_headers)
+    assert mine.json()["id"] != theirs.json()["id"]
+
+
+def test_bulk_skips_duplicates(client, auth_headers):
+    """bulk 저장은 이미 저장된 키와 요청 안에서 반복된 키를 건너뜁니다."""
+    items = [{**SAMPLE, "idempotency_key": f"k{i}"} for i in range(3)]
+    items.append({**SAMPLE, "idempotency_key": "k0"})
+    items.append(SAMPLE)  # 키가 없는 항목은 항상 저장
+
+    first = client.post("/api/eye-fatigue/bulk", json=items, headers=auth_headers).json()
+    assert first["created"] == 4
+    assert first["duplicates"] == 1
+    assert len(first["record_ids"]) == 4
+
+    replay = client.post("/api/eye-fatigue/bulk", json=items[:3], headers=auth_headers).json()
+    assert replay == {"created": 0, "duplicates": 3, "record_ids": []}
+    assert _history_size(client, auth_headers) == 4
+
+
+def test_window_start_key_ignores_timezone(client, auth_headers):
+    """같은 시각을 다른 시간대로 보내도 같은 기록으로 판별합니다."""
+    utc = client.post("/api/eye-fatigue/", json={**SAMPLE, "window_start": "2025-10-16T12:00:00+00:00"},
+                      headers=auth_headers)
+    seoul = client.post("/api/eye-fatigue/", json={**SAMPLE, "window_start": "2025-10-16T21:00:00+09:00"},
+                        headers=auth_headers)
+    assert seoul.json()["id"] == utc.json()["id"]
+
+
+def test_bulk_record_ids_follow_request_order(client, auth_headers):
+    """키가 있는 항목과 없는 항목이 섞여 있어도 record_ids는 요청 순서를 따릅니다."""
+    items = [
+        {**SAMPLE, "health_score": 10.0},
+        {**SAMPLE, "health_score": 20.0, "idempotency_key": uuid.uuid4().hex},
+        {**SAMPLE, "health_score": 30.0},
+        {**SAMPLE, "health_score": 40.0, "idempotency_key": uuid.uuid4().hex},
+    ]
+    record_ids = client.post("/api/eye-fatigue/bulk", json=items, headers=auth_headers).json()["record_ids"]
+    scores = [
+        client.get(f"/api/eye-fatigue/{record_id}", headers=auth_headers).json()["fatigue_score"]
+        for record_id in record_ids
+    ]
+    assert scores == [10.0, 20.0, 30.0, 40.0]
+
+
+def test_client_keys_do_not_collide_with_window_keys(client, auth_headers):
+    """클라이언트 키가 서버의 window: 키와 같은 문자열이어도 다른 기록으로 저장됩니다."""
+    window = "2025-10-16T12:00:00+00:00"
+    by_window = client.post("/api/eye-fatigue/", json={**SAMPLE, "window_start": window}, headers=auth_headers)
+    by_client = client.post("/api/eye-fatigue/", json={**SAMPLE, "idempotency_key": f"window:{window}"},
+                            headers=auth_headers)
+    assert by_client.json()["id"] != by_window.json()["id"]
+    assert "Idempotent-Replayed" not in by_client.headers
+
+
+def test_longest_client_key_still_dedupes(client, auth_headers):
+    """접두사를 붙이면 키 컬럼보다 길어지는 100자 키도 같은 키로 다시 보내면 중복으로 판별합니다."""
+    headers = {**auth_headers, "Idempotency-Key": "k" * 100}
+    first = client.post("/api/eye-fatigue/", json=SAMPLE, headers=headers)
+    retry = client.post("/api/eye-fatigue/", json=SAMPLE, headers=headers)
+    assert retry.json()["id"] == first.json()["id"]
+    other = client.post("/api/eye-fatigue/", json=SAMPLE, headers={**auth_headers, "Idempotency-Key": "k" * 99})
+    assert other.json()["id"] != first.json()["id"]
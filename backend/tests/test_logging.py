@@ -0,0 +1,92 @@
+# tests/test_logging.py
+import logging
+import logging.handlers
+
+from app.logging_config import (
+    UVICORN_LOGGERS,
+    RateLimitFilter,
+    RequestIdFilter,
+    SamplingFilter,
+    request_id_var,
+    setup_logging,
+)
+
+
+def _record(level=logging.INFO, msg="event %s"):
+    return logging.LogRecord("app.test", level, __file__, 1, msg, ("x",), None)
+
+
+def test_root_logger_uses_queue_handler(client):
+    """요청 스레드는 큐 핸들러에만 로그를 넣습니다."""
+    handlers = logging.getLogger().handlers
+    assert any(isinstance(h, logging.handlers.QueueHandler) for h in handlers)
+
+
+def test_uvicorn_loggers_go_through_queue():
+    """uvicorn이 달아 둔 동기 핸들러를 떼고 루트의 큐 핸들러로 전달합니다."""
+    access = logging.getLogger("uvicorn.access")
+    access.addHandler(logging.StreamHandler())
+    access.propagate = False
+    setup_logging()
+    for name in UVICORN_LOGGERS:
+        assert logging.getLogger(name).handlers == []
+        assert logging.getLogger(name).propagate
+
+
+def test_sampling_filter_keeps_warnings():
+    """샘플링 비율이 0이어도 WARNING 이상은 항상 남습니다."""
+    sampler = SamplingFilter(0.0)
+    assert not sampler.filter(_record(logging.INFO))
+    assert sampler.filter(_record(logging.WARNING))
+    assert SamplingFilter(1.0).filter(_record(logging.INFO))
+
+
+def test_rate_limit_filter_refills_over_time():
+    """같은 메시지 템플릿은 burst 이후 토큰이 다시 찰 때까지 버려집니다."""
+    now = [0.0]
+    limiter = RateLimitFilter(per_second=1.0, burst=2, clock=lambda: now[0])
+    assert [limiter.filter(_record()) for _ in range(3)] == [True, True, False]
+    assert limiter.filter(_record(msg="other %s"))
+    now[0] = 1.0
+    assert limiter.filter(_record())
+
+
+def test_rate_limit_filter_bounds_buckets():
+    """메시지 템플릿이 계속 달라져도 버킷 수는 max_keys를 넘지 않습니다."""
+    now = [0.0]
+    limiter = RateLimitFilter(per_second=1.0, burst=2, clock=lambda: now[0], max_keys=10)
+    for i in range(100):
+        assert limiter.filter(_record(msg=f"user {i}"))
+    assert len(limiter._buckets) <= 10
+
+
+def test_rate_limit_filter_exempt_logger():
+    """exempt 로거는 제한하지 않습니다."""
+    limiter = RateLimitFilter(per_second=1.0, burst=1, clock=lambda: 0.0, exempt=("app.test",))
+    assert all(limiter.filter(_record()) for _ in range(5))
+
+
+def test_request_id_filter_reads_context():
+    """로그 레코드에 현재 요청 ID가 붙습니다."""
+    token = request_id_var.set("abc123")
+    try:
+        record = _record()
+        RequestIdFilter().filter(record)
+        assert record.request_id == "abc123"
+    finally:
+        request_id_var.reset(token)
+
+
+def test_request_id_header_round_trip(client):
+    """클라이언트가 보낸 X-Request-ID를 그대로 돌려주고, 없으면 새로 만듭니다."""
+    response = client.get("/", headers={"X-Request-ID": "req-1"})
+    assert response.headers["X-Request-ID"] == "req-1"
+    assert client.get("/").headers["X-Request-ID"]
+
+
+def test_invalid_request_id_is_replaced(client):
+    """너무 길거나 허용하지 않는 문자가 든 X-Request-ID는 새 ID로 바꿉니다."""
+    for value in ("x" * 200, "bad id\twith spaces"):
+        returned = client.get("/", headers={"X-Request-ID": value}).headers["X-Request-ID"]
+        assert returned != value
+        assert len(returned) == 32
@@ -0,0 +1,173 @@
+# tests/test_percentiles.py
+import bisect
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import database, models
+from app.percentiles import (
+    SCOPE_ALL, PercentileStore, ScoreHistogram, day_scope, prune_day_sketches, rebuild_from_records, store,
+)
+
+SAMPLE = {"bpm": 12, "max_stable_gaze_time": 4.5, "status": "양호함 😊"}
+
+
+def _exact_percentile(sorted_scores, score):
+    below = bisect.bisect_left(sorted_scores, score)
+    equal = bisect.bisect_right(sorted_scores, score) - below
+    return 100.0 * (below + equal / 2) / len(sorted_scores)
+
+
+def test_histogram_error_is_bounded():
+    """스케치 백분위는 정확한 값과 한 구간 비율 이내로 일치합니다."""
+    rng = random.Random(7)
+    scores = [min(100.0, max(0.0, rng.gauss(60, 15))) for _ in range(5000)]
+    histogram = ScoreHistogram(1000)
+    for score in scores:
+        histogram.add(score)
+
+    scores.sort()
+    for query in (0.0, 12.3, 45.0, 60.0, 77.7, 100.0):
+        lo = bisect.bisect_left(scores, int(query * 10) / 10)
+        hi = bisect.bisect_left(scores, int(query * 10) / 10 + 0.1)
+        bound = 100.0 * (hi - lo) / len(scores) / 2 + 1e-9
+        assert abs(histogram.percentile(query) - _exact_percentile(scores, query)) <= bound + 100.0 / len(scores)
+
+
+def test_histogram_round_trips_bytes():
+    histogram = ScoreHistogram(100)
+    for score in (1.0, 50.0, 50.0, 99.9):
+        histogram.add(score)
+    restored = ScoreHistogram.from_bytes(histogram.to_bytes(), 100)
+    assert restored.counts() == histogram.counts()
+    assert restored.total == 4
+
+
+@pytest.fixture
+def sketch_db(tmp_path):
+    """공유 테스트 DB의 "all" 스케치를 건드리지 않도록 별도 SQLite 파일을 사용합니다."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'sketch.db'}")
+    database.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+
+def test_store_flush_merges_into_database(sketch_db):
+    """두 워커의 변경분이 DB에서 합쳐지고, 다시 읽으면 모두 반영됩니다."""
+    today = date(2001, 1, 1)
+    scope = day_scope(today)
+    first, second = PercentileStore(bins=100), PercentileStore(bins=100)
+    first.add(20.0, day=today)
+    second.add(80.0, day=today)
+    second.add(90.0, day=today)
+
+    first.flush(sketch_db, today=today)
+    second.flush(sketch_db, today=today)
+    first.load(sketch_db, [SCOPE_ALL, scope])
+
+    percentile, size = first.percentile(scope, 85.0)
+    assert size == 3
+    assert round(percentile, 1) == 66.7
+    assert first.percentile(SCOPE_ALL, 85.0)[1] == 3
+
+
+def test_failed_flush_keeps_pending_changes(sketch_db, monkeypatch):
+    """DB 저장에 실패하면 변경분을 되돌려 두었다가 다음 저장에 함께 반영합니다."""
+    today = date(2001, 1, 1)
+    store_ = PercentileStore(bins=100)
+    store_.add(30.0, day=today)
+
+    def broken_commit():
+        raise OperationalError("COMMIT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(sketch_db, "commit", broken_commit)
+    with pytest.raises(OperationalError):
+        store_.flush(sketch_db, today=today)
+    monkeypatch.undo()
+    assert sketch_db.query(models.FatigueScoreSketch).count() == 0
+
+    store_.add(70.0, day=today)
+    store_.flush(sketch_db, today=today)
+    rows = {row.scope: row.total for row in sketch_db.query(models.FatigueScoreSketch)}
+    assert rows == {SCOPE_ALL: 2, day_scope(today): 2}
+
+
+def test_bin_count_change_rebins_stored_counts(sketch_db):
+    """구간 수 설정이 바뀌어도 저장된 개수를 버리지 않고 새 구간으로 옮겨 합칩니다."""
+    today = date(2001, 1, 1)
+    old = PercentileStore(bins=1000)
+    for score in (10.0, 10.05, 90.0):
+        old.add(score, day=today)
+    old.flush(sketch_db, today=today)
+
+    new = PercentileStore(bins=100)
+    new.add(50.0, day=today)
+    new.flush(sketch_db, today=today)
+    assert new.percentile(SCOPE_ALL, 10.0) == (25.0, 4)
+    row = sketch_db.get(models.FatigueScoreSketch, SCOPE_ALL)
+    assert ScoreHistogram.from_bytes(row.counts, 100).counts()[10] == 2
+
+
+def test_prune_day_sketches(sketch_db):
+    """기준일 이전의 일별 스케치 행만 지웁니다."""
+    for scope in (SCOPE_ALL, day_scope(date(2001, 1, 1)), day_scope(date(2001, 2, 1))):
+        sketch_db.add(models.FatigueScoreSketch(scope=scope, counts=b"", total=0))
+    sketch_db.commit()
+    assert prune_day_sketches(sketch_db, date(2001, 1, 15)) == 1
+    sketch_db.commit()
+    assert {row.scope for row in sketch_db.query(models.FatigueScoreSketch)} == {
+        SCOPE_ALL, day_scope(date(2001, 2, 1)),
+    }
+
+
+def test_percentile_endpoint(client, auth_headers):
+    """최근 점수의 백분위를 전체/오늘 기준으로 반환합니다."""
+    assert client.get("/api/eye-fatigue/percentile", headers=auth_headers).status_code == 404
+
+    before = store.percentile(SCOPE_ALL, 0.0)[1]
+    client.post("/api/eye-fatigue/", json={**SAMPLE, "health_score": 100.0}, headers=auth_headers)
+    response = client.get("/api/eye-fatigue/percentile", headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["fatigue_score"] == 100.0
+    assert body["sample_size_all"] >= before + 1
+    assert body["sample_size_today"] >= 1
+    assert 0.0 < body["percentile_all"] <= 100.0
+
+
+def test_day_scope_uses_utc_date():
+    """시간대가 있는 시각은 UTC 날짜의 일별 스케치에 들어갑니다. (재구성도 같은 기준을 사용)"""
+    store_ = PercentileStore(bins=100)
+    # 서울 시각 2001-01-02 08:00 = UTC 2001-01-01 23:00
+    store_.add(50.0, at=datetime(2001, 1, 2, 8, 0, tzinfo=timezone(timedelta(hours=9))))
+    assert store_.percentile(day_scope(date(2001, 1, 1)), 50.0)[1] == 1
+    assert store_.percentile(day_scope(date(2001, 1, 2)), 50.0)[1] == 0
+
+
+def test_rebuild_supersedes_pending_changes(sketch_db):
+    """재구성 전에 관측한 미저장 변경분은 재구성이 이미 셌으므로, 저장할 때 다시 더하지 않습니다."""
+    today = date(2001, 1, 1)
+    rebuilt_at = datetime(2001, 1, 1, 12, 0, tzinfo=timezone.utc)
+    user = models.User(name="Sketch", email="sketch@example.com", hashed_password="x")
+    sketch_db.add(user)
+    sketch_db.commit()
+    sketch_db.add(models.EyeFatigueRecord(user_id=user.id, fatigue_score=40.0,
+                                          created_at=rebuilt_at - timedelta(minutes=5)))
+    sketch_db.commit()
+
+    worker = PercentileStore(bins=100)
+    worker.add(40.0, at=rebuilt_at - timedelta(minutes=5))  # 재구성에 포함된 기록
+    rebuild_from_records(sketch_db, bins=100, clock=lambda: rebuilt_at)
+    worker.add(60.0, at=rebuilt_at + timedelta(minutes=1))  # 재구성 뒤에 들어온 기록
+    worker.flush(sketch_db, today=today)
+
+    rows = {row.scope: row.total for row in sketch_db.query(models.FatigueScoreSketch)}
+    assert rows[SCOPE_ALL] == 2
+    assert rows[day_scope(today)] == 2
+    assert worker.percentile(SCOPE_ALL, 50.0) == (50.0, 2)
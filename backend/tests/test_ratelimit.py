@@ -0,0 +1,176 @@
+# tests/test_ratelimit.py
+import asyncio
+
+import pytest
+
+from app import ratelimit
+from app.ratelimit import BucketRule, MemoryBucketStore, RateLimiter
+from conftest import register_and_login
+
+SAMPLE = {"bpm": 12, "max_stable_gaze_time": 4.5, "health_score": 72.0, "status": "양호함 😊"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _limiter(store, user=(1.0, 3), ip=(100.0, 100), auth=(100.0, 100), max_concurrent=0):
+    return RateLimiter(
+        store,
+        user_rule=BucketRule("user", *user),
+        ip_rule=BucketRule("ip", *ip),
+        auth_rule=BucketRule("auth", *auth),
+        max_concurrent=max_concurrent,
+    )
+
+
+def test_memory_bucket_refills_over_time():
+    clock = FakeClock()
+    store = MemoryBucketStore(clock=clock)
+    take = lambda: asyncio.run(store.take("k", rate=2.0, burst=2))
+    assert [take()[0] for _ in range(3)] == [True, True, False]
+    assert take()[1] == pytest.approx(0.5)
+    clock.now += 0.5
+    assert take()[0]
+
+
+def test_user_limit_returns_429_with_retry_after(client, monkeypatch):
+    """같은 토큰으로 burst를 넘겨 보내면 429와 Retry-After를 받고, 다른 사용자는 영향을 받지 않습니다."""
+    clock = FakeClock()
+    headers = register_and_login(client)
+    other = register_and_login(client)
+    monkeypatch.setattr(ratelimit, "limiter", _limiter(MemoryBucketStore(clock=clock), user=(0.5, 3)))
+
+    codes = [client.post("/api/eye-fatigue/", json=SAMPLE, headers=headers).status_code for _ in range(4)]
+    assert codes == [200, 200, 200, 429]
+    response = client.get("/api/eye-fatigue/history", headers=headers)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+    assert "X-Request-ID" in response.headers
+    assert client.get("/api/eye-fatigue/history", headers=other).status_code == 200
+
+    clock.now += 2
+    assert client.get("/api/eye-fatigue/history", headers=headers).status_code == 200
+
+
+def test_login_is_limited_per_ip(client, monkeypatch):
+    monkeypatch.setattr(ratelimit, "limiter", _limiter(MemoryBucketStore(clock=FakeClock()), auth=(0.1, 2)))
+    form = {"username": "nobody@example.com", "password": "wrong-password"}
+    codes = [client.post("/api/auth/login", data=form).status_code for _ in range(3)]
+    assert codes == [401, 401, 429]
+    assert client.get("/").status_code == 200  # /api 밖의 경로는 제한하지 않습니다.
+
+
+def test_shared_store_limits_across_workers(client, monkeypatch):
+    """두 워커(RateLimiter)가 같은 저장소를 쓰면 버킷도 함께 씁니다. (Redis 저장소 대신 공유 메모리 저장소)"""
+    store = MemoryBucketStore(clock=FakeClock())
+    headers = register_and_login(client)
+    worker_a, worker_b = _limiter(store, user=(0.1, 2)), _limiter(store, user=(0.1, 2))
+
+    codes = []
+    for worker in (worker_a, worker_b, worker_a):
+        monkeypatch.setattr(ratelimit, "limiter", worker)
+        codes.append(client.get("/api/users/me", headers=headers).status_code)
+    assert codes == [200, 200, 429]
+
+
+def test_overload_is_shed_with_503(client, auth_headers, monkeypatch):
+    """동시 처리 요청 수가 한도에 도달하면 DB에 닿기 전에 503으로 거절합니다."""
+    limiter = _limiter(MemoryBucketStore(), max_concurrent=2)
+    monkeypatch.setattr(ratelimit, "limiter", limiter)
+    limiter.in_flight = 2
+    response = client.get("/api/eye-fatigue/history", headers=auth_headers)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    limiter.in_flight = 1
+    assert client.get("/api/eye-fatigue/history", headers=auth_headers).status_code == 200
+    assert limiter.in_flight == 1
+
+
+def test_rejected_request_does_not_spend_earlier_tokens(client, monkeypatch):
+    """IP 버킷에서 거절되면 먼저 꺼낸 사용자 토큰은 돌려놓습니다."""
+    store = MemoryBucketStore(clock=FakeClock())
+    headers = register_and_login(client)
+    limiter = _limiter(store, user=(0.1, 2), ip=(0.1, 1))
+    monkeypatch.setattr(ratelimit, "limiter", limiter)
+
+    codes = [client.get("/api/users/me", headers=headers).status_code for _ in range(3)]
+    assert codes == [200, 429, 429]
+    tokens = {key: bucket[0] for key, bucket in store._buckets.items()}
+    assert [value for key, value in tokens.items() if key.startswith("user:")] == [1.0]
+
+
+def test_cors_headers_on_rejection_and_preflight_not_limited(client, auth_headers, monkeypatch):
+    """CORS가 가장 바깥에 있어 429에도 CORS 헤더가 붙고, preflight는 제한하지 않습니다."""
+    monkeypatch.setattr(ratelimit, "limiter", _limiter(MemoryBucketStore(clock=FakeClock()), user=(0.1, 1)))
+    origin = {"Origin": "http://localhost:3000"}
+    assert client.get("/api/users/me", headers={**auth_headers, **origin}).status_code == 200
+    rejected = client.get("/api/users/me", headers={**auth_headers, **origin})
+    assert rejected.status_code == 429
+    assert rejected.headers["access-control-allow-origin"] == "http://localhost:3000"
+
+    preflight = {**origin, "Access-Control-Request-Method": "GET", "Access-Control-Request-Headers": "authorization"}
+    for _ in range(5):
+        assert client.options("/api/users/me", headers=preflight).status_code == 200
+
+
+def test_streaming_response_counts_as_in_flight(monkeypatch):
+    """스트리밍 응답은 본문을 다 보낼 때까지 처리 중으로 셉니다."""
+    limiter = _limiter(MemoryBucketStore(), max_concurrent=10)
+    monkeypatch.setattr(ratelimit, "limiter", limiter)
+    seen = []
+
+    async def streaming_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        for _ in range(3):
+            seen.append(limiter.in_flight)
+            await send({"type": "http.response.body", "body": b"chunk", "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/api/eye-fatigue/export", "headers": [],
+             "query_string": b"", "client": ("127.0.0.1", 1234)}
+    asyncio.run(ratelimit.RateLimitMiddleware(streaming_app)(scope, receive, send))
+    assert seen == [1, 1, 1]
+    assert limiter.in_flight == 0
+
+
+def test_redis_store_runs_lua_against_shared_server(monkeypatch):
+    """Redis 저장소의 Lua 스크립트를 로컬 가짜 Redis 서버에서 실행합니다. (두 워커가 같은 버킷을 공유)"""
+    pytest.importorskip("lupa")  # fakeredis가 Lua 스크립트를 실행하는 데 필요
+    import fakeredis
+    import redis.asyncio
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.asyncio, "from_url", lambda url: fakeredis.FakeAsyncRedis(server=server))
+
+    async def scenario():
+        worker_a = ratelimit.RedisBucketStore("redis://shared")
+        worker_b = ratelimit.RedisBucketStore("redis://shared")
+        results = [await worker.take("user:a", rate=0.01, burst=2) for worker in (worker_a, worker_b, worker_a)]
+        await worker_b.refund("user:a", rate=0.01, burst=2)
+        after_refund = await worker_a.take("user:a", rate=0.01, burst=2)
+        for _ in range(5):  # 토큰을 돌려놓아도 burst를 넘지 않습니다.
+            await worker_a.refund("user:b", rate=0.01, burst=2)
+        capped = [(await worker_b.take("user:b", rate=0.01, burst=2))[0] for _ in range(3)]
+
+        server.connected = False  # Redis 장애: 워커 메모리 버킷으로 계속 제한합니다.
+        fallback = [(await worker_a.take("user:c", rate=0.01, burst=1))[0] for _ in range(2)]
+        return results, after_refund, capped, fallback
+
+    results, after_refund, capped, fallback = asyncio.run(scenario())
+    assert [allowed for allowed, _ in results] == [True, True, False]
+    assert results[2][1] == pytest.approx(100.0, rel=0.01)
+    assert after_refund[0] is True
+    assert capped == [True, True, False]
+    assert fallback == [True, False]
@@ -0,0 +1,136 @@
+# tests/test_read_replica.py
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database, models
+from app.config import settings
+from conftest import register_and_login
+
+SAMPLE = {"bpm": 12, "max_stable_gaze_time": 4.5, "health_score": 72.0, "status": "양호함 😊"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch):
+    """두 번째 SQLite 파일을 복제본 대신 사용합니다. (복제가 전혀 되지 않은, 아주 늦은 복제본)"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    database.Base.metadata.create_all(bind=engine)
+    clock = FakeClock()
+    router = database.ReadRouter(sessionmaker(bind=engine, class_=database.ReplicaSession), clock=clock)
+    monkeypatch.setattr(database, "read_router", router)
+    yield router, engine, clock
+    engine.dispose()
+
+
+def _copy_user_to(engine, email):
+    """기본 DB의 사용자 행을 복제본에 복사합니다. (복제가 따라잡은 상황)"""
+    primary = database.SessionLocal()
+    try:
+        user = primary.query(models.User).filter(models.User.email == email).one()
+        columns = {c.name: getattr(user, c.name) for c in models.User.__table__.columns}
+    finally:
+        primary.close()
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert().values(**columns))
+
+
+def test_reads_after_own_write_use_primary(client, replica):
+    """가입/기록 직후에는 복제본에 아직 없어도 기본 DB에서 읽습니다."""
+    _, _, clock = replica
+    headers = register_and_login(client)
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+
+    client.post("/api/eye-fatigue/", json=SAMPLE, headers=headers)
+    assert len(client.get("/api/eye-fatigue/history", headers=headers).json()) == 1
+
+    clock.now += settings.read_your_writes_seconds + 1
+    # 복제본에는 사용자가 없으므로 이제는 인증에 실패합니다. (= 조회가 복제본으로 갔음)
+    assert client.get("/api/users/me", headers=headers).status_code == 401
+
+
+def test_reads_go_to_replica(client, replica):
+    """쓰기가 없던 사용자의 조회는 복제본에서 처리합니다."""
+    _, engine, clock = replica
+    email = "replica-reader@example.com"
+    headers = register_and_login(client, email=email)
+    _copy_user_to(engine, email)
+    client.post("/api/eye-fatigue/", json=SAMPLE, headers=headers)
+    clock.now += settings.read_your_writes_seconds + 1
+
+    response = client.get("/api/users/me", headers=headers)
+    assert response.status_code == 200
+    # 기록은 복제본에 아직 복제되지 않았습니다.
+    assert client.get("/api/eye-fatigue/history", headers=headers).json() == []
+    assert client.get("/api/eye-fatigue/result", headers=headers).status_code == 404
+
+
+def test_unhealthy_replica_falls_back_to_primary(client, tmp_path, monkeypatch):
+    """복제본에 연결할 수 없으면 기본 DB로 처리하고, 일정 시간 동안 복제본을 건너뜁니다."""
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    clock = FakeClock()
+    router = database.ReadRouter(sessionmaker(bind=broken), clock=clock)
+    monkeypatch.setattr(database, "read_router", router)
+
+    headers = register_and_login(client)
+    clock.now += settings.read_your_writes_seconds + 1
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+    assert not router.replica_available()
+
+    clock.now += settings.replica_retry_seconds
+    assert router.replica_available()
+
+
+def test_replica_failure_after_connect_falls_back_to_primary(client, tmp_path, monkeypatch):
+    """연결은 되었지만 조회 중에 복제본이 실패하면 같은 조회를 기본 DB에서 다시 실행합니다."""
+    empty = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")  # 테이블이 없어 조회가 OperationalError
+    clock = FakeClock()
+    router = database.ReadRouter(sessionmaker(bind=empty, class_=database.ReplicaSession), clock=clock)
+    monkeypatch.setattr(database, "read_router", router)
+
+    headers = register_and_login(client)
+    client.post("/api/eye-fatigue/", json=SAMPLE, headers=headers)
+    clock.now += settings.read_your_writes_seconds + 1
+    assert router.replica_available()
+
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+    assert len(client.get("/api/eye-fatigue/history", headers=headers).json()) == 1
+    assert not router.replica_available()
+    empty.dispose()
+
+
+def test_write_marks_are_shared_between_workers(monkeypatch):
+    """Redis 저장소를 쓰면 다른 워커에서 쓴 사용자도 기본 DB에서 읽습니다."""
+    import fakeredis
+    import redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis, "from_url", lambda url: fakeredis.FakeRedis(server=server))
+    replica = sessionmaker(class_=database.ReplicaSession)
+    worker_a = database.ReadRouter(replica, marks=database.RedisWriteMarks("redis://shared"))
+    worker_b = database.ReadRouter(replica, marks=database.RedisWriteMarks("redis://shared"))
+
+    worker_a.mark_write("writer@example.com")
+    assert worker_b.recently_wrote("writer@example.com")
+    assert not worker_b.recently_wrote("other@example.com")
+
+    server.connected = False  # Redis 장애: 안전하게 기본 DB에서 읽습니다.
+    assert worker_b.recently_wrote("other@example.com")
+
+
+def test_token_is_decoded_once_per_request(client, monkeypatch):
+    """미들웨어, 세션 라우팅, 사용자 조회가 한 번 검증한 토큰 결과를 함께 씁니다."""
+    headers = register_and_login(client)
+    calls = []
+    original = database.jwt.decode
+    monkeypatch.setattr(database.jwt, "decode", lambda *args, **kwargs: calls.append(1) or original(*args, **kwargs))
+
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+    assert len(calls) == 1
@@ -0,0 +1,70 @@
+# tests/test_responses.py
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import database, models, schemas
+from app.responses import RECORD_FIELDS, FastJSONResponse, record_rows_to_dicts
+
+SAMPLE = {"bpm": 12, "max_stable_gaze_time": 4.5, "health_score": 72.0, "status": "양호함 😊"}
+
+
+def _expected(record_ids):
+    """기존 경로(ORM 객체 -> response_model 검증 -> JSON)로 만든 응답"""
+    db = database.SessionLocal()
+    try:
+        records = [db.get(models.EyeFatigueRecord, record_id) for record_id in record_ids]
+        return TypeAdapter(List[schemas.Record]).dump_python(
+            TypeAdapter(List[schemas.Record]).validate_python(records, from_attributes=True), mode="json"
+        )
+    finally:
+        db.close()
+
+
+def test_history_matches_schema_serialization(client, auth_headers):
+    """빠른 직렬화 경로의 /history 응답은 response_model로 만든 응답과 같습니다."""
+    for i in range(3):
+        client.post("/api/eye-fatigue/", json={**SAMPLE, "bpm": i}, headers=auth_headers)
+    response = client.get("/api/eye-fatigue/history", headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body == _expected([row["id"] for row in body])
+    assert list(body[0]) == list(schemas.Record.model_fields)
+
+
+def test_record_detail_matches_schema_serialization(client, auth_headers):
+    record_id = client.post("/api/eye-fatigue/", json=SAMPLE, headers=auth_headers).json()["id"]
+    response = client.get(f"/api/eye-fatigue/{record_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == _expected([record_id])[0]
+    assert client.get("/api/eye-fatigue/999999999", headers=auth_headers).status_code == 404
+
+
+def test_rows_with_null_fields_are_returned_as_null(client, auth_headers):
+    """NULL이 있는 기존 기록도 조회에서 빠지지 않고, 스키마 경로와 같이 null로 내보냅니다."""
+    valid_id = client.post("/api/eye-fatigue/", json=SAMPLE, headers=auth_headers).json()["id"]
+    user_id = client.get("/api/users/me", headers=auth_headers).json()["id"]
+    db = database.SessionLocal()
+    try:
+        legacy = models.EyeFatigueRecord(user_id=user_id, fatigue_score=None, blink_speed=None, status="x")
+        db.add(legacy)
+        db.commit()
+        legacy_id = legacy.id
+    finally:
+        db.close()
+
+    body = client.get("/api/eye-fatigue/history", headers=auth_headers).json()
+    assert sorted(row["id"] for row in body) == sorted([valid_id, legacy_id])
+    detail = client.get(f"/api/eye-fatigue/{legacy_id}", headers=auth_headers)
+    assert detail.status_code == 200
+    assert detail.json() == _expected([legacy_id])[0]
+    assert detail.json()["fatigue_score"] is None and detail.json()["iris_dilation"] is None
+
+
+def test_integer_values_in_float_columns_serialize_as_floats():
+    """DB가 Float 컬럼 값을 정수로 돌려줘도, 응답 바이트는 스키마 경로와 같이 12.0으로 씁니다."""
+    row = {"id": 1, "user_id": 2, "fatigue_score": 12, "blink_speed": 3, "iris_dilation": 0,
+           "eye_movement_pattern": "x", "created_at": None, "status": "x"}
+    body = FastJSONResponse(record_rows_to_dicts([tuple(row[name] for name in RECORD_FIELDS)])[0]).body
+    assert body == schemas.Record(**row).model_dump_json().encode("utf-8")
@@ -0,0 +1,115 @@
+# tests/test_retention.py
+import uuid
+from datetime import date, datetime, timezone
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app import database, models
+from app.main import app  # noqa: F401  (테이블 생성)
+from app.partitions import add_months, month_start, partitioned_table, prepare_database, run_retention
+
+
+def _make_user(db):
+    user = models.User(name="Retention", email=f"ret-{uuid.uuid4().hex[:12]}@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_month_helpers():
+    """월 경계 계산이 연도를 넘어가도 올바른지 확인합니다."""
+    start = month_start(datetime(2025, 1, 15, 12, 30, tzinfo=timezone.utc))
+    assert start == datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert add_months(start, -1) == datetime(2024, 12, 1, tzinfo=timezone.utc)
+    assert add_months(start, 13) == datetime(2026, 2, 1, tzinfo=timezone.utc)
+
+
+def test_prepare_database_is_noop_on_sqlite():
+    """SQLite에서는 파티션 없이 일반 테이블을 그대로 사용합니다."""
+    assert prepare_database(database.engine) is False
+
+
+def test_retention_downsamples_and_deletes_old_records():
+    """보존 기간이 지난 기록은 일별 요약으로 바뀌고 원본은 삭제됩니다."""
+    db = database.SessionLocal()
+    try:
+        user = _make_user(db)
+        old_day = datetime(2020, 3, 5, 9, 0, tzinfo=timezone.utc)
+        for score in (40.0, 60.0):
+            db.add(models.EyeFatigueRecord(user_id=user.id, fatigue_score=score, blink_speed=10, created_at=old_day))
+        db.add(models.EyeFatigueRecord(user_id=user.id, fatigue_score=90.0, blink_speed=20,
+                                       created_at=datetime(2020, 6, 1, 9, 0, tzinfo=timezone.utc)))
+        db.commit()
+
+        result = run_retention(db, now=datetime(2020, 7, 10, tzinfo=timezone.utc), retention_months=3)
+        assert result["cutoff"].startswith("2020-04-01")
+
+        remaining = db.query(models.EyeFatigueRecord).filter(models.EyeFatigueRecord.user_id == user.id).all()
+        assert [r.fatigue_score for r in remaining] == [90.0]
+
+        summary = db.query(models.EyeFatigueDailySummary).filter(
+            models.EyeFatigueDailySummary.user_id == user.id
+        ).one()
+        assert summary.day == date(2020, 3, 5)
+        assert summary.record_count == 2
+        assert summary.avg_fatigue_score == 50.0
+        assert summary.max_fatigue_score == 60.0
+
+        # 다시 실행해도 같은 기록을 두 번 요약하지 않습니다.
+        run_retention(db, now=datetime(2020, 7, 10, tzinfo=timezone.utc), retention_months=3)
+        assert db.query(models.EyeFatigueDailySummary).filter(
+            models.EyeFatigueDailySummary.user_id == user.id
+        ).count() == 1
+    finally:
+        db.close()
+
+
+def test_retention_merges_late_records_into_existing_summary():
+    """이미 요약된 날짜에 기록이 더 들어오면 같은 요약 줄에 합쳐집니다. (user_id, day 유니크)"""
+    db = database.SessionLocal()
+    try:
+        user = _make_user(db)
+        old_day = datetime(2020, 3, 5, 9, 0, tzinfo=timezone.utc)
+        now = datetime(2020, 7, 10, tzinfo=timezone.utc)
+        db.add(models.EyeFatigueRecord(user_id=user.id, fatigue_score=40.0, blink_speed=10, created_at=old_day))
+        db.commit()
+        run_retention(db, now=now, retention_months=3)
+
+        for score in (70.0, 100.0):
+            db.add(models.EyeFatigueRecord(user_id=user.id, fatigue_score=score, blink_speed=20, created_at=old_day))
+        db.commit()
+        run_retention(db, now=now, retention_months=3)
+
+        summary = db.query(models.EyeFatigueDailySummary).filter(
+            models.EyeFatigueDailySummary.user_id == user.id
+        ).one()
+        assert summary.record_count == 3
+        assert summary.avg_fatigue_score == 70.0
+        assert summary.min_fatigue_score == 40.0
+        assert summary.max_fatigue_score == 100.0
+        assert summary.avg_blink_speed == 50.0 / 3
+    finally:
+        db.close()
+
+
+def test_partitioned_table_ddl_puts_created_at_in_primary_key():
+    """파티션 부모 DDL은 문자열 치환 없이 만들며, created_at이 PK에 포함되고 id는 SERIAL로 남습니다."""
+    ddl = str(CreateTable(partitioned_table()).compile(dialect=postgresql.dialect()))
+    assert "id SERIAL NOT NULL" in ddl
+    assert "PRIMARY KEY (id, created_at)" in ddl
+    assert ddl.rstrip().endswith("PARTITION BY RANGE (created_at)")
+
+
+def test_prepare_database_adds_new_index_to_existing_table(tmp_path):
+    """이미 있던 기록 테이블에는 create_all이 인덱스를 만들지 않으므로 prepare_database가 만듭니다."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_eye_fatigue_records_user_created"))
+
+    assert prepare_database(engine) is False
+    indexes = {index["name"] for index in inspect(engine).get_indexes("eye_fatigue_records")}
+    assert "ix_eye_fatigue_records_user_created" in indexes
+    engine.dispose()